@@ -1,9 +1,37 @@
-from fastapi import APIRouter, BackgroundTasks
-from services.updater import refresh_challenge_db_task
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from services.refresh_scheduler import refresh_scheduler
+from services.metrics import registry
+from services.profiling import profile_store
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.post("/refresh-db")
-def refresh_database(background_tasks: BackgroundTasks):
-    background_tasks.add_task(refresh_challenge_db_task)
-    return {"status": "Database refresh task started."}
+async def refresh_database():
+    """Starts a database refresh, or joins the one already running."""
+    run, started = refresh_scheduler.trigger("manual")
+    status = "Database refresh task started." if started else "Database refresh already running."
+    return {"status": status, "run": run.as_dict()}
+
+@router.get("/refresh-db/status")
+def refresh_status():
+    """Returns the state of the refresh scheduler, the current run and the recent runs."""
+    return refresh_scheduler.status()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Returns process metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/profiles")
+def list_profiles():
+    """Lists the recorded request profiles (newest first) without their function statistics."""
+    return profile_store.list()
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """Returns one recorded request profile including its hottest functions."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return JSONResponse(content={"error": f"Profile '{profile_id}' not found"}, status_code=404)
+    return profile
@@ -1,19 +1,21 @@
 from fastapi import APIRouter
 from services.filters import get_count, get_list
-from services.graph_ld import add_ld_metadata
+from services.graph_ld import aget_ld_snapshot, add_ld_metadata
 
 router = APIRouter(prefix="/authors", tags=["authors"])
 
 @router.get("/")
-def list_authors():
+async def list_authors():
+    snapshot = await aget_ld_snapshot()
     data = {}
-    add_ld_metadata(data)
-    data["authors"] = get_list("author", subfield="name", lowercase=False)
+    add_ld_metadata(data, snapshot=snapshot)
+    data["authors"] = get_list("author", subfield="name", lowercase=False, snapshot=snapshot)
     return data
 
 @router.get("/count")
-def count_authors():
+async def count_authors():
+    snapshot = await aget_ld_snapshot()
     data = {}
-    add_ld_metadata(data)
-    data["authors"] = get_count("author", subfield="name", lowercase=False)
+    add_ld_metadata(data, snapshot=snapshot)
+    data["authors"] = get_count("author", subfield="name", lowercase=False, snapshot=snapshot)
     return data
@@ -0,0 +1,102 @@
+# Bedingte GET-Requests (ETag / Last-Modified / 304) auf Basis der Graph-Version
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Response
+from config import CACHE_CONTROL
+from services.graph_store import graph_store
+from services.profiling import phase
+
+# Router, deren GET-Antworten nur von der Graph-Version und den Parametern abhängen
+CONDITIONAL_PREFIXES = ("/graph", "/exercises", "/authors", "/keywords")
+
+
+def graph_etag(version: str, path: str, query: str):
+    """Strong ETag of one GET resource for one graph version."""
+    params = "&".join(sorted(query.split("&"))) if query else ""
+    digest = hashlib.sha256(f"{version}|{path}|{params}".encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str):
+    """
+    True if the If-None-Match header contains the ETag or one of its encoded variants.
+    '*' is not handled here: it only matches an existing resource (see matches_any).
+    """
+    base = etag.strip('"')
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == base or tag.startswith(base + "-"):
+            return True
+    return False
+
+
+def matches_any(if_none_match: str):
+    """True if the If-None-Match header is (or contains) '*'."""
+    return any(tag.strip() == "*" for tag in if_none_match.split(","))
+
+
+def last_modified(generated_at: str):
+    """Converts the database's 'generatedAt' into a datetime (seconds precision) or None."""
+    if not generated_at:
+        return None
+    try:
+        dt = datetime.fromisoformat(generated_at.rstrip("Z"))
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def not_modified_since(if_modified_since: str, modified: datetime):
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified <= since
+
+
+async def conditional_get_middleware(request, call_next):
+    if request.method != "GET" or not request.url.path.startswith(CONDITIONAL_PREFIXES):
+        return await call_next(request)
+    try:
+        with phase("load"):
+            snapshot = await graph_store.aget()
+    except (FileNotFoundError, ValueError):
+        return await call_next(request)
+
+    etag = graph_etag(snapshot.version, request.url.path, request.url.query)
+    modified = last_modified(snapshot.data.get("generatedAt"))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+    # If-None-Match hat Vorrang vor If-Modified-Since (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            # ein ETag wird nur mit 200 ausgeliefert: die Ressource existiert
+            return Response(status_code=304, headers=dict(headers, Vary="Accept-Encoding"))
+        deferred = matches_any(if_none_match)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        deferred = bool(if_modified_since and modified and not_modified_since(if_modified_since, modified))
+
+    response = await call_next(request)
+    if deferred and response.status_code == 200:
+        # '*' und If-Modified-Since erst nach dem Handler auswerten: nur eine vorhandene
+        # Ressource passt, 400/404/422 bleiben erhalten
+        return Response(status_code=304, headers=dict(headers, Vary="Accept-Encoding"))
+    if response.status_code == 200:
+        encoding = response.headers.get("content-encoding")
+        if encoding:
+            # komprimierte Repräsentation bekommt ein eigenes (starkes) ETag
+            headers["ETag"] = etag[:-1] + f'-{encoding}"'
+        for key, value in headers.items():
+            response.headers.setdefault(key, value)
+    return response
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Query
+from typing import List
+from fastapi import APIRouter, Query, Request
 from fastapi.responses import JSONResponse
-from services.exporter import export_graph
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from config import BATCH_MAX_IDS
+from services.exporter import Page, export_graph, export_graph_cached, stream_graph
 import services.graph_ld
 
 
@@ -11,97 +15,106 @@ router = APIRouter(prefix="/exercises", tags=["exercises"])
 # LIST EXERCISES (with filters)
 # ---------------------------------------------------------
 @router.get("/")
-def list_exercises(
+async def list_exercises(
+    request: Request,
     author: str = None,
     keyword: str = None,
     topic: str = None,
     match: str = Query("exact", enum=["exact", "partial"]),
-    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml"])
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"]),
+    stream: bool = False,
+    limit: int = Query(None, ge=1),
+    cursor: str = None
 ):
     """
     List exercises with optional filters.
     JSON-LD is always the primary source.
+    With stream=true the result is sent chunked while it is encoded (not cached).
+    With limit the exercises are returned in pages ordered by @id; the
+    X-Next-Cursor header holds the cursor of the next page.
     """
 
-    # 1. Primärdatenbank laden
-    ld_data = services.graph_ld.get_ld_graph()
-    filtered = {"@graph": []}
-
-    # 2. Filterfunktion
-    def matches(ex):
-        # AUTHOR
-        if author:
-            authors = ex.get("author", [])
-            names = [a.get("name", "").lower() for a in authors]
-            if match == "exact" and author.lower() not in names:
-                return False
-            if match == "partial" and not any(author.lower() in n for n in names):
-                return False
-
-        # KEYWORD
-        if keyword:
-            kws = [k.lower() for k in ex.get("keywords", [])]
-            if match == "exact" and keyword.lower() not in kws:
-                return False
-            if match == "partial" and not any(keyword.lower() in k for k in kws):
-                return False
-
-        # TOPIC (teaches)
-        if topic:
-            teaches = ex.get("teaches", "")
-            teaches_list = teaches if isinstance(teaches, list) else [teaches]
-            teaches_list = [t.lower() for t in teaches_list]
-            if not any(topic.lower() in t for t in teaches_list):
-                return False
-
-        return True
-
-    # 3. Filter anwenden
-    for ex in ld_data["@graph"]:
-        if matches(ex):
-            filtered["@graph"].append(ex)
-
-    # 4. Ausgabe
-    return export_graph(filtered, format)
+    # 1. Filter über die invertierten Indizes der aktuellen Graph-Version
+    def filtered():
+        if limit is None and cursor is None:
+            return {"@graph": services.graph_ld.get_ld_exercises_filtered(author, keyword, topic, match)}
+        data, next_cursor = services.graph_ld.get_ld_exercises_page(author, keyword, topic, match, limit, cursor)
+        return data if isinstance(data, JSONResponse) else Page(data, next_cursor)
+
+    # 2. Ausgabe (gecacht pro Graph-Version, Filter und Seite)
+    if stream:
+        result = await run_in_threadpool(filtered)
+        if isinstance(result, JSONResponse):
+            return result
+        if isinstance(result, Page):
+            return stream_graph(result.data, format, result.headers)
+        return stream_graph(result, format)
+    params = {"author": author, "keyword": keyword, "topic": topic, "match": match, "limit": limit, "cursor": cursor}
+    return await export_graph_cached(request, "exercises", params, filtered, format)
 
 
 # ---------------------------------------------------------
 # START NODES
 # ---------------------------------------------------------
 @router.get("/start-nodes")
-def get_start_nodes(format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml"])):
+async def get_start_nodes(request: Request, format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])):
     """Return exercises with no dependencies."""
 
-    data = services.graph_ld.get_ld_start_nodes()
-    if isinstance(data, JSONResponse):
-        return data
-    return export_graph(data, format)
+    return await export_graph_cached(request, "start-nodes", {}, services.graph_ld.get_ld_start_nodes, format)
 
 
 # ---------------------------------------------------------
 # END NODES
 # ---------------------------------------------------------
 @router.get("/end-nodes")
-def get_end_nodes(format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml"])):
+async def get_end_nodes(request: Request, format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])):
     """Return exercises with no outgoing edges."""
 
-    data = services.graph_ld.get_ld_end_nodes()
-    if isinstance(data, JSONResponse):
-        return data
-    return export_graph(data, format)
+    return await export_graph_cached(request, "end-nodes", {}, services.graph_ld.get_ld_end_nodes, format)
+
+
+# ---------------------------------------------------------
+# BATCH LOOKUP
+# ---------------------------------------------------------
+class BatchRequest(BaseModel):
+    ids: List[str]
+
+
+@router.post("/batch")
+async def get_exercises_batch(
+    body: BatchRequest,
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])
+):
+    """
+    Returns many exercises in one round-trip, in request order.
+    Unknown ids do not fail the batch: they are listed under 'missing' (in NDJSON as a
+    final {"missing": [...]} line), their number in the X-Missing-Count header.
+    """
+    if len(body.ids) > BATCH_MAX_IDS:
+        return JSONResponse(content={"error": f"At most {BATCH_MAX_IDS} ids per batch"}, status_code=400)
+    snapshot = await services.graph_ld.aget_ld_snapshot()
+
+    def batch():
+        data, missing = services.graph_ld.get_ld_exercises_batch(body.ids, snapshot)
+        response = export_graph(data, format)
+        response.headers["X-Missing-Count"] = str(len(missing))
+        return response
+
+    return await run_in_threadpool(batch)
 
 
 # ---------------------------------------------------------
 # SINGLE EXERCISE
 # ---------------------------------------------------------
 @router.get("/{uuid}")
-def get_exercise(uuid: str, format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml"])):
+async def get_exercise(uuid: str, format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])):
     """Returns a graph with one single exercise node."""
-    node = services.graph_ld.get_ld_exercise_node(uuid)
+    snapshot = await services.graph_ld.aget_ld_snapshot()
+    node = services.graph_ld.get_ld_exercise_node(uuid, snapshot)
     if isinstance(node, JSONResponse):
         return node
 
-    ld = services.graph_ld.init_ld_graph()
+    ld = services.graph_ld.init_ld_graph(snapshot)
     ld["@graph"].append(node)
 
     return export_graph(ld, format)
@@ -111,10 +124,51 @@ def get_exercise(uuid: str, format: str = Query("jsonld", enum=["jsonld", "nodel
 # PATH TO EXERCISE
 # ---------------------------------------------------------
 @router.get("/{uuid}/path")
-def get_path_to_exercise(uuid: str, format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml"])):
+def get_path_to_exercise(
+    uuid: str,
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"]),
+    stream: bool = False
+):
     """Return dependency path to exercise."""
     data = services.graph_ld.get_ld_path_to_exercise(uuid)
     if isinstance(data, JSONResponse):
         return data
+    if stream:
+        return stream_graph(data, format)
     return export_graph(data, format)
-    
\ No newline at end of file
+    
+
+# ---------------------------------------------------------
+# DEPENDENTS (what does this exercise unlock)
+# ---------------------------------------------------------
+@router.get("/{uuid}/dependents")
+async def get_dependents(
+    request: Request,
+    uuid: str,
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])
+):
+    """Return exercises depending directly on the exercise."""
+
+    def dependents():
+        return services.graph_ld.get_ld_dependents(uuid)
+
+    return await export_graph_cached(request, "dependents", {"uuid": uuid}, dependents, format)
+
+
+# ---------------------------------------------------------
+# DESCENDANTS
+# ---------------------------------------------------------
+@router.get("/{uuid}/descendants")
+async def get_descendants(
+    request: Request,
+    uuid: str,
+    depth: int = Query(None, ge=1),
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])
+):
+    """Return all exercises (transitively) depending on the exercise, optionally limited to `depth` steps."""
+
+    def descendants():
+        return services.graph_ld.get_ld_descendants(uuid, depth)
+
+    params = {"uuid": uuid, "depth": depth}
+    return await export_graph_cached(request, "descendants", params, descendants, format)
@@ -1,23 +1,59 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from fastapi.responses import JSONResponse
 
-from services.graph_ld import get_ld_graph, add_ld_metadata
-from services.filters import get_count, get_list
-from services.exporter import export_graph
+from services.graph_ld import get_ld_graph, get_ld_subgraph, aget_ld_snapshot, add_ld_metadata
+from services.filters import get_statistics as get_graph_statistics, get_analysis as get_graph_analysis
+from services.exporter import export_graph_cached, stream_graph
 
 router = APIRouter(prefix="/graph", tags=["graph"])
 
 @router.get("/")
-def get_whole_graph(format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml"])):
-    return export_graph(get_ld_graph(), format)
+async def get_whole_graph(
+    request: Request,
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"]),
+    stream: bool = False
+):
+    if stream:
+        return stream_graph((await aget_ld_snapshot()).data, format)
+    return await export_graph_cached(request, "graph", {}, get_ld_graph, format)
+
+@router.get("/subgraph")
+async def get_subgraph(
+    request: Request,
+    root: str = None,
+    keyword: str = None,
+    match: str = Query("exact", enum=["exact", "partial"]),
+    up: int = Query(1, ge=0),
+    down: int = Query(1, ge=0),
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])
+):
+    """
+    Returns the neighbourhood of an exercise (root) and/or of all exercises with a
+    keyword: prerequisites up to `up` steps above, dependents up to `down` steps below.
+    """
+    if root is None and keyword is None:
+        return JSONResponse(content={"error": "root or keyword is required"}, status_code=400)
+
+    def subgraph():
+        return get_ld_subgraph(root, keyword, match, up, down)
+
+    params = {"root": root, "keyword": keyword, "match": match, "up": up, "down": down}
+    return await export_graph_cached(request, "subgraph", params, subgraph, format)
 
 @router.get("/statistics")
-def get_statistics():
+async def get_statistics():
+    snapshot = await aget_ld_snapshot()
     stats = {}
-    add_ld_metadata(stats)
+    add_ld_metadata(stats, snapshot=snapshot)
     stats["@type"] = "Statistics"
-    stats["keywordCountDistinct"] = len(get_list("keywords"))
-    stats["keywordCountTotal"] = sum(get_count("keywords").values())
-    wholeGraph = get_ld_graph()
-    stats["nodeCount"] = len(wholeGraph["@graph"])
+    stats.update(get_graph_statistics(snapshot))
     return stats
+
+@router.get("/analysis")
+async def get_analysis():
+    snapshot = await aget_ld_snapshot()
+    analysis = {}
+    add_ld_metadata(analysis, snapshot=snapshot)
+    analysis["@type"] = "Analysis"
+    analysis.update(get_graph_analysis(snapshot))
+    return analysis
@@ -1,19 +1,21 @@
 from fastapi import APIRouter
 from services.filters import get_count, get_list
-from services.graph_ld import add_ld_metadata
+from services.graph_ld import aget_ld_snapshot, add_ld_metadata
 
 router = APIRouter(prefix="/keywords", tags=["keywords"])
 
 @router.get("/")
-def list_keywords():
+async def list_keywords():
+    snapshot = await aget_ld_snapshot()
     data = {}
-    add_ld_metadata(data)
-    data["keywords"] = get_list("keywords")
+    add_ld_metadata(data, snapshot=snapshot)
+    data["keywords"] = get_list("keywords", snapshot=snapshot)
     return data
 
 @router.get("/count")
-def count_keywords():
+async def count_keywords():
+    snapshot = await aget_ld_snapshot()
     data = {}
-    add_ld_metadata(data)
-    data["keywords"] = get_count("keywords")
+    add_ld_metadata(data, snapshot=snapshot)
+    data["keywords"] = get_count("keywords", snapshot=snapshot)
     return data
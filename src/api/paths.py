@@ -0,0 +1,38 @@
+from typing import List
+from fastapi import APIRouter, Query, Request
+from pydantic import BaseModel
+from services.exporter import export_graph_cached
+import services.graph_ld
+
+
+router = APIRouter(prefix="/paths", tags=["paths"])
+
+
+class PathRequest(BaseModel):
+    targets: List[str]
+    completed: List[str] = []
+
+
+# ---------------------------------------------------------
+# LEARNING PLAN FOR SEVERAL TARGETS
+# ---------------------------------------------------------
+@router.post("")
+async def plan_learning_path(
+    request: Request,
+    body: PathRequest,
+    format: str = Query("jsonld", enum=["jsonld", "nodelink", "yaml", "ndjson"])
+):
+    """
+    Returns the exercises still to learn for all targets, in topological order
+    (prerequisites first), choosing the alternative with the fewest remaining
+    exercises for every oneOf group. Completed exercises are left out.
+    """
+    targets = tuple(dict.fromkeys(body.targets))
+    completed = tuple(sorted(set(body.completed)))
+
+    def plan():
+        return services.graph_ld.get_ld_learning_plan(targets, completed)
+
+    # gecacht pro Graph-Version, Ziele und abgeschlossenen Übungen
+    params = {"targets": targets, "completed": completed}
+    return await export_graph_cached(request, "paths", params, plan, format)
@@ -0,0 +1,241 @@
+# Benchmark der API-Endpunkte über synthetische Graphen
+#
+#   cd src && python -m benchmarks.run --sizes 100,1000,10000 --requests 50
+#   python -m benchmarks.run --save-baseline        # aktuelle Werte als Baseline speichern
+#   python -m benchmarks.run --tolerance 0.3         # Exit-Code 1 bei Regression
+
+import os, sys, tempfile
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pflicht-Umgebungsvariablen aus config.py vorbelegen (wie in den Tests)
+os.environ.setdefault("TEMPLATE_DIR", SRC_DIR)
+os.environ.setdefault("GITHUB_ORG", "STEMgraph-benchmark")
+os.environ.setdefault("GITHUB_PAT", "benchmark-token")
+os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "stemgraph-benchmark-logs"))
+sys.path.insert(0, SRC_DIR)
+
+import argparse, asyncio, json, platform, time, tracemalloc
+from datetime import datetime
+import httpx
+
+from benchmarks.synthetic import generate_challenges, build_ld_database, exercise_id
+from services.export_cache import export_cache
+from services.graph_store import graph_store
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_SIZES = (100, 1000, 10000)
+
+# Unterschiede unterhalb dieser Schwelle gelten als Messrauschen
+MIN_REGRESSION_MS = 0.5
+MIN_REGRESSION_MB = 1.0
+
+
+def endpoints(size: int, deep_chain: int):
+    """Benchmarked requests per graph size: name -> URL (covers every read router)."""
+    deepest = exercise_id(min(deep_chain, size) - 1)
+    last = exercise_id(size - 1)
+    return {
+        "graph.jsonld": "/graph/?format=jsonld",
+        "graph.nodelink": "/graph/?format=nodelink",
+        "graph.yaml": "/graph/?format=yaml",
+        "graph.statistics": "/graph/statistics",
+        "graph.subgraph": f"/graph/subgraph?root={deepest}&up=3&down=3",
+        "exercises.keyword": "/exercises/?keyword=Keyword%201",
+        "exercises.partial": "/exercises/?keyword=word%201&match=partial",
+        "exercises.page": "/exercises/?limit=100",
+        "exercises.author": "/exercises/?author=Author%202&format=nodelink",
+        "exercises.start_nodes": "/exercises/start-nodes",
+        "exercises.end_nodes": "/exercises/end-nodes",
+        "exercises.single": f"/exercises/{last}",
+        "exercises.path_deep": f"/exercises/{deepest}/path",
+        "exercises.path_last": f"/exercises/{last}/path?format=nodelink",
+        "exercises.dependents": f"/exercises/{exercise_id(0)}/dependents",
+        "exercises.descendants": f"/exercises/{exercise_id(0)}/descendants",
+        "authors.list": "/authors/",
+        "authors.count": "/authors/count",
+        "keywords.list": "/keywords/",
+        "keywords.count": "/keywords/count",
+    }
+
+
+def percentile(sorted_values, p: float):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+async def measure(client, url: str, requests: int, concurrency: int, cold: bool):
+    """Sends `requests` GETs with `concurrency` in flight, returns latency statistics in ms."""
+    if cold:
+        export_cache.clear()
+    start = time.perf_counter()
+    response = await client.get(url)
+    cold_ms = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            if cold:
+                export_cache.clear()
+            t = time.perf_counter()
+            await client.get(url)
+            latencies.append((time.perf_counter() - t) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "cold_ms": round(cold_ms, 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "rps": round(requests / elapsed, 1) if elapsed else None,
+        "bytes": len(response.content),
+    }
+
+
+async def run_size(app, size: int, args, workdir: str):
+    """Publishes a synthetic graph of `size` nodes and benchmarks all endpoints on it."""
+    db = build_ld_database(generate_challenges(size, seed=args.seed, deep_chain=args.deep_chain))
+    graph_store.path = os.path.join(workdir, f'ld-database-{size}.json')
+    graph_store.publish(db)
+    export_cache.clear()
+    urls = endpoints(size, args.deep_chain)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Spitzenspeicher: Laden von Platte plus je ein Request pro Endpunkt (getrennt von den
+        # Latenzmessungen, da tracemalloc die Ausführung verlangsamt)
+        graph_store.clear()
+        tracemalloc.start()
+        graph_store.get()
+        for url in urls.values():
+            await client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        graph_store.clear()
+        export_cache.clear()
+        start = time.perf_counter()
+        graph_store.get()
+        load_ms = (time.perf_counter() - start) * 1000
+
+        results = {}
+        for name, url in urls.items():
+            results[name] = await measure(client, url, args.requests, args.concurrency, args.cold)
+    return {
+        "load_ms": round(load_ms, 3),
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+        "endpoints": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """Returns a list of regressions of `results` against `baseline` (relative tolerance)."""
+    def worse(current, base, min_abs):
+        return current > base * (1 + tolerance) and current - base > min_abs
+
+    regressions = []
+    for size, current in results.get("sizes", {}).items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        if worse(current["peak_memory_mb"], base["peak_memory_mb"], MIN_REGRESSION_MB):
+            regressions.append(f"{size} nodes: peak memory {base['peak_memory_mb']} -> {current['peak_memory_mb']} MB")
+        if worse(current["load_ms"], base["load_ms"], MIN_REGRESSION_MS):
+            regressions.append(f"{size} nodes: load {base['load_ms']} -> {current['load_ms']} ms")
+        for name, stats in current["endpoints"].items():
+            base_stats = base["endpoints"].get(name)
+            if base_stats is None:
+                continue
+            for key in ("cold_ms", "p50_ms", "p95_ms"):
+                if worse(stats[key], base_stats[key], MIN_REGRESSION_MS):
+                    regressions.append(f"{size} nodes: {name} {key} {base_stats[key]} -> {stats[key]}")
+    return regressions
+
+
+def print_report(results: dict):
+    for size, data in results["sizes"].items():
+        print(f"\n== {size} nodes: load {data['load_ms']:.1f} ms, peak memory {data['peak_memory_mb']:.1f} MB")
+        print(f"{'endpoint':<24}{'cold ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'bytes':>12}")
+        for name, s in data["endpoints"].items():
+            print(f"{name:<24}{s['cold_ms']:>10.2f}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}"
+                  f"{s['p99_ms']:>10.2f}{s['rps']:>10.1f}{s['bytes']:>12}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the STEMgraph API on synthetic graphs.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated node counts (e.g. 100,1000,100000)")
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight")
+    parser.add_argument("--cold", action="store_true", help="clear the export cache before every request")
+    parser.add_argument("--deep-chain", type=int, default=500, help="length of the longest dependency chain")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--output", help="write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from main import app
+
+    original_path = graph_store.path
+    results = {
+        "meta": {
+            "created": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cold": args.cold,
+        },
+        "sizes": {},
+    }
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for size in (int(s) for s in args.sizes.split(",")):
+                results["sizes"][str(size)] = asyncio.run(run_size(app, size, args, workdir))
+    finally:
+        graph_store.path = original_path
+        graph_store.clear()
+        export_cache.clear()
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}, run with --save-baseline first")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against baseline (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print("  " + line)
+        return 1
+    print(f"\nNo regressions against baseline (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
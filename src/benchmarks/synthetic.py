@@ -0,0 +1,67 @@
+# Synthetische JSON-LD Graphen beliebiger Größe für Benchmarks
+
+import os, random, uuid
+from services.graph_ld import transform_challenge_metadata_to_ld, load_ld_context, add_ld_metadata
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTEXT_FILE = os.path.join(SRC_DIR, 'ld-context.json')
+
+# fester Namespace, damit gleiche Parameter gleiche IDs ergeben
+ID_NAMESPACE = uuid.UUID('6f1c2a4e-9b1d-4c3e-8a57-0d2b5e7f9a10')
+
+
+def exercise_id(i: int):
+    return str(uuid.uuid5(ID_NAMESPACE, str(i)))
+
+
+def generate_challenges(size: int, seed: int = 0, chain_length: int = 20, deep_chain: int = 500,
+                        oneof_ratio: float = 0.1, cross_ratio: float = 0.2):
+    """
+    Generates `size` challenge metadata records (format of the README metadata).
+    - the first `deep_chain` exercises form one long dependency chain
+    - the rest is split into chains of `chain_length`
+    - `oneof_ratio` of the dependent exercises use {"oneOf": [...]} alternatives
+    - `cross_ratio` of the exercises get an extra dependency on an earlier exercise
+    Dependencies always point to earlier exercises, so the graph is acyclic.
+    """
+    rng = random.Random(seed)
+    authors = [f"Author {i}" for i in range(max(3, int(size ** 0.5)))]
+    keywords = [f"Keyword {i}" for i in range(max(5, size // 10))]
+    deep_chain = min(deep_chain, size)
+
+    challenges = []
+    for i in range(size):
+        if i < deep_chain:
+            prev = i - 1 if i > 0 else None
+        else:
+            prev = i - 1 if (i - deep_chain) % chain_length else None
+        depends_on = []
+        if prev is not None:
+            if i > 1 and rng.random() < oneof_ratio:
+                depends_on.append({"oneOf": [exercise_id(prev), exercise_id(rng.randrange(prev))]})
+            else:
+                depends_on.append(exercise_id(prev))
+        if i > 1 and rng.random() < cross_ratio:
+            extra = exercise_id(rng.randrange(i - 1))
+            if extra not in depends_on:
+                depends_on.append(extra)
+
+        challenge = {
+            "id": exercise_id(i),
+            "teaches": f"Topic {i}",
+            "author": rng.sample(authors, rng.choice((1, 1, 2))),
+            "keywords": rng.sample(keywords, rng.randint(1, min(4, len(keywords)))),
+            "first_used": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        }
+        if depends_on:
+            challenge["depends_on"] = depends_on
+        challenges.append(challenge)
+    return challenges
+
+
+def build_ld_database(challenges):
+    """Builds the JSON-LD database the same way createdb_jsonld does."""
+    db_jsonld = {"@context": load_ld_context(CONTEXT_FILE)}
+    add_ld_metadata(db_jsonld, "2024-01-01T00:00:00Z")
+    db_jsonld["@graph"] = [transform_challenge_metadata_to_ld(c) for c in challenges]
+    return db_jsonld
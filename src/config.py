@@ -7,6 +7,15 @@ import os
 # GitHub API
 GITHUB_ORG = os.environ['GITHUB_ORG']
 GITHUB_PAT = os.environ['GITHUB_PAT']
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+
+# Updater
+UPDATER_WORKERS = int(os.environ.get('UPDATER_WORKERS', '8'))
+UPDATER_MAX_RETRIES = int(os.environ.get('UPDATER_MAX_RETRIES', '5'))
+UPDATER_INCREMENTAL = os.environ.get('UPDATER_INCREMENTAL', 'true').lower() == 'true'
+REFRESH_INTERVAL_S = float(os.environ.get('REFRESH_INTERVAL_S', '3600'))  # 0 = nur manuell
+REFRESH_HISTORY = int(os.environ.get('REFRESH_HISTORY', '10'))
+REFRESH_PROGRESS_INTERVAL_S = float(os.environ.get('REFRESH_PROGRESS_INTERVAL_S', '1'))
 
 # Directories
 STORAGE_DIR = os.environ.get('STORAGE_DIR', '/graph-db/repos')
@@ -19,6 +28,34 @@ LOG_DB_PATH = os.environ.get('LOG_DB_PATH', os.path.join(LOG_DIR, 'log.db'))
 LOG_CONSOLE = os.environ.get('LOG_CONSOLE', 'false').lower() == 'true'
 MAX_LOG_SIZE_MB = int(os.environ.get('MAX_LOG_SIZE_MB', '50'))
 MAX_LOG_AGE_DAYS = int(os.environ.get('MAX_LOG_AGE_DAYS', '30'))
+LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE', '100'))
+LOG_FLUSH_INTERVAL_MS = int(os.environ.get('LOG_FLUSH_INTERVAL_MS', '500'))
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_QUEUE_OVERFLOW = os.environ.get('LOG_QUEUE_OVERFLOW', 'drop').lower()  # 'drop' | 'block'
+LOG_RETENTION_INTERVAL_S = int(os.environ.get('LOG_RETENTION_INTERVAL_S', '3600'))
+LOG_RETENTION_CHUNK = int(os.environ.get('LOG_RETENTION_CHUNK', '5000'))
+LOG_RETENTION_MIN_ROWS = int(os.environ.get('LOG_RETENTION_MIN_ROWS', '1000'))
+
+# Graph-Datenbank
+LD_BINARY_SNAPSHOT = os.environ.get('LD_BINARY_SNAPSHOT', 'true').lower() == 'true'
+GRAPH_KEEP_VERSIONS = int(os.environ.get('GRAPH_KEEP_VERSIONS', '2'))
+GRAPH_WATCH_INTERVAL_S = float(os.environ.get('GRAPH_WATCH_INTERVAL_S', '1'))  # 0 = nur bei Requests prüfen
+BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', '5000'))  # max. UUIDs pro POST /exercises/batch
+GRAPH_CLOSURE_MAX_NODES = int(os.environ.get('GRAPH_CLOSURE_MAX_NODES', '20000'))  # 0 = keine transitive Hülle
+
+# Export-Cache
+EXPORT_CACHE_MAX_MB = int(os.environ.get('EXPORT_CACHE_MAX_MB', '64'))
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+# HTTP-Caching
+CACHE_CONTROL = os.environ.get('CACHE_CONTROL', 'no-cache')
+
+# Profiling
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() == 'true'
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')  # Wert des X-Profile Headers, leer = nur Sampling
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '1'))
+PROFILE_HISTORY = int(os.environ.get('PROFILE_HISTORY', '50'))
 
 # ============================================================
 # Derived Paths (berechnete Pfade)
@@ -28,6 +65,8 @@ METADATA_FILE = os.path.join(STORAGE_DIR, 'metadata.json')
 LD_CONTEXT_TEMPLATE = os.path.join(TEMPLATE_DIR, 'ld-context.json')
 LD_METADATA_TEMPLATE = os.path.join(TEMPLATE_DIR, 'ld-metadata.json')
 LD_DATABASE = os.path.join(DATABASE_DIR, 'ld-database.json')
+REFRESH_LOCK_FILE = os.path.join(DATABASE_DIR, 'refresh.lock')
+REFRESH_STATUS_FILE = os.path.join(DATABASE_DIR, 'refresh-status.json')
 
 # Aliases für Rückwärtskompatibilität
 ORG = GITHUB_ORG
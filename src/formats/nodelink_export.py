@@ -8,15 +8,12 @@ class NodeLinkExporter(GraphExporter):
         Konvertiert eine JSON-LD Datenstruktur in Node-Link-Format.
         Erwartet ein dict mit '@graph': [...]
         """
+        return {"nodes": list(self.iter_nodes(ld_data)), "links": list(self.iter_links(ld_data))}
 
-        nl = {"nodes": [], "links": []}
-
-        if "@graph" not in ld_data:
-            return nl
-
-        # 1. Nodes erzeugen
-        for ex in ld_data["@graph"]:
-            node = {
+    def iter_nodes(self, ld_data: dict):
+        """Erzeugt die Node-Link Knoten einzeln (für Streaming-Exporte)."""
+        for ex in ld_data.get("@graph", []):
+            yield {
                 "id": ex.get("@id"),
                 "type": ex.get("@type", "Exercise"),
                 "teaches": ex.get("teaches"),
@@ -24,21 +21,19 @@ class NodeLinkExporter(GraphExporter):
                 "keywords": ex.get("keywords"),
                 "publishedAt": ex.get("publishedAt")
             }
-            nl["nodes"].append(node)
 
-        # 2. Links erzeugen
-        for ex in ld_data["@graph"]:
+    def iter_links(self, ld_data: dict):
+        """Erzeugt die Kanten einzeln (für Streaming-Exporte)."""
+        for ex in ld_data.get("@graph", []):
             target = ex.get("@id")
             deps = ex.get("dependsOn", [])
 
             for dep in deps:
                 # einfacher String
                 if isinstance(dep, str):
-                    nl["links"].append({"source": dep, "target": target})
+                    yield {"source": dep, "target": target}
 
                 # oneOf-Alternative
                 elif isinstance(dep, dict) and dep.get("oneOf"):
                     for alt in dep["oneOf"]:
-                        nl["links"].append({"source": alt, "target": target})
-
-        return nl
+                        yield {"source": alt, "target": target}
@@ -1,10 +1,65 @@
 import yaml
 from formats.base_export import GraphExporter
 
+# libyaml-Beschleunigung, falls verfügbar
+try:
+    from yaml import CSafeDumper as Dumper
+except ImportError:
+    from yaml import SafeDumper as Dumper
+
+# Schlüsselzeile der Knotenliste; die Einträge folgen ohne Einrückung (wie bei yaml.dump)
+GRAPH_KEY_LINE = "'@graph':\n"
+
+
+def dump(data) -> str:
+    return yaml.dump(data, Dumper=Dumper, allow_unicode=True, default_flow_style=False)
+
+
+class FragmentCache:
+    """
+    YAML fragments of the nodes of one graph version, keyed by '@id'.
+    Only the graph's own node objects are cached (checked by identity),
+    request-specific node copies are dumped every time.
+    """
+
+    def __init__(self, by_id: dict):
+        self.by_id = by_id
+        self._fragments = {}
+
+    def get(self, node):
+        ex_id = node.get("@id")
+        if self.by_id.get(ex_id) is not node:
+            return dump([node])
+        fragment = self._fragments.get(ex_id)
+        if fragment is None:
+            fragment = self._fragments[ex_id] = dump([node])
+        return fragment
+
+
 class YamlExporter(GraphExporter):
 
+    def __init__(self, fragments: FragmentCache = None):
+        self.fragments = fragments
+
     def from_ld(self, ld_data):
         """
         Konvertiert JSON-LD Daten in YAML-Format.
         """
-        return yaml.dump(ld_data, allow_unicode=True, default_flow_style=False)
+        return "".join(self.iter_ld(ld_data))
+
+    def iter_ld(self, ld_data):
+        """
+        Erzeugt das YAML-Dokument stückweise, '@graph' Knoten für Knoten.
+        Das Ergebnis ist identisch zu einem yaml.dump des ganzen Dokuments.
+        """
+        if not isinstance(ld_data, dict) or not isinstance(ld_data.get("@graph"), list) or not ld_data["@graph"]:
+            yield dump(ld_data)
+            return
+        # yaml.dump sortiert die Schlüssel
+        for key in sorted(ld_data):
+            if key != "@graph":
+                yield dump({key: ld_data[key]})
+                continue
+            yield GRAPH_KEY_LINE
+            for node in ld_data[key]:
+                yield self.fragments.get(node) if self.fragments else dump([node])
@@ -1,12 +1,20 @@
 import sqlite3
 import os
+import threading
+import logging
 from datetime import datetime, timedelta
-from config import LOG_DB_PATH, MAX_LOG_SIZE_MB, MAX_LOG_AGE_DAYS
+from config import (LOG_DB_PATH, MAX_LOG_SIZE_MB, MAX_LOG_AGE_DAYS,
+                    LOG_RETENTION_INTERVAL_S, LOG_RETENTION_CHUNK, LOG_RETENTION_MIN_ROWS)
+
+logger = logging.getLogger("logging")
+
+# Größenziel beim Aufräumen, damit nicht jeder Lauf erneut rotieren muss
+SIZE_TARGET_RATIO = 0.9
 
 
 def get_connection():
     os.makedirs(os.path.dirname(LOG_DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(LOG_DB_PATH)
+    conn = sqlite3.connect(LOG_DB_PATH, timeout=30)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -14,6 +22,13 @@ def get_connection():
 def init_log_db():
     conn = get_connection()
     cur = conn.cursor()
+    # freigegebene Seiten sollen per incremental_vacuum an das Dateisystem zurückgehen;
+    # bestehende Datenbanken werden dafür einmalig per VACUUM umgestellt
+    if cur.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cur.execute("VACUUM")
+    # WAL: Schreiber (Log-Writer-Thread) blockiert keine Leser
+    cur.execute("PRAGMA journal_mode=WAL")
     cur.execute("""
         CREATE TABLE IF NOT EXISTS logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -24,25 +39,102 @@ def init_log_db():
             details TEXT
         )
     """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)")
     conn.commit()
     conn.close()
 
 
-def rotate_logs():
-    # 1. Größe prüfen
-    if os.path.exists(LOG_DB_PATH):
-        size_mb = os.path.getsize(LOG_DB_PATH) / (1024 * 1024)
-        if size_mb > MAX_LOG_SIZE_MB:
-            conn = get_connection()
-            cur = conn.cursor()
-            cur.execute("DELETE FROM logs WHERE id IN (SELECT id FROM logs ORDER BY id LIMIT 1000)")
-            conn.commit()
-            conn.close()
+def used_bytes(cur):
+    """Bytes occupied by live pages (file size without free pages)."""
+    page_size = cur.execute("PRAGMA page_size").fetchone()[0]
+    page_count = cur.execute("PRAGMA page_count").fetchone()[0]
+    free = cur.execute("PRAGMA freelist_count").fetchone()[0]
+    return (page_count - free) * page_size
+
+
+def delete_chunk(cur, where: str = "ORDER BY id", params: tuple = (), limit: int = LOG_RETENTION_CHUNK):
+    """Deletes up to `limit` matching rows (default: the oldest), returns the number deleted."""
+    cur.execute(
+        f"DELETE FROM logs WHERE id IN (SELECT id FROM logs {where} LIMIT ?)",
+        params + (limit,)
+    )
+    return cur.rowcount
 
-    # 2. Alter prüfen
-    cutoff = datetime.utcnow() - timedelta(days=MAX_LOG_AGE_DAYS)
+
+def rotate_logs():
+    """
+    Enforces MAX_LOG_AGE_DAYS and MAX_LOG_SIZE_MB.
+    Rows are deleted oldest first in chunks of LOG_RETENTION_CHUNK (one short transaction each,
+    so the log writer is never blocked for long) until the size target is met; the newest
+    LOG_RETENTION_MIN_ROWS rows are always kept. Freed pages are returned to the file system.
+    """
     conn = get_connection()
     cur = conn.cursor()
-    cur.execute("DELETE FROM logs WHERE timestamp < ?", (cutoff.isoformat() + "Z",))
-    conn.commit()
+    deleted = 0
+
+    # 1. Alter prüfen (ohne ORDER BY, damit idx_logs_timestamp genutzt wird)
+    cutoff = (datetime.utcnow() - timedelta(days=MAX_LOG_AGE_DAYS)).isoformat() + "Z"
+    while True:
+        n = delete_chunk(cur, "WHERE timestamp < ?", (cutoff,))
+        conn.commit()
+        deleted += n
+        if n < LOG_RETENTION_CHUNK:
+            break
+
+    # 2. Größe prüfen
+    target = MAX_LOG_SIZE_MB * 1024 * 1024 * SIZE_TARGET_RATIO
+    size = used_bytes(cur)
+    if size > MAX_LOG_SIZE_MB * 1024 * 1024:
+        while size > target:
+            rows = cur.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+            removable = rows - LOG_RETENTION_MIN_ROWS
+            if removable <= 0:
+                break
+            # Anteil schätzen, der für das Ziel gelöscht werden muss
+            estimate = int(rows * (1 - target / size)) + 1
+            n = delete_chunk(cur, limit=max(1, min(estimate, removable, LOG_RETENTION_CHUNK)))
+            conn.commit()
+            deleted += n
+            if n == 0:
+                break
+            size = used_bytes(cur)
+
+    # 3. Speicher freigeben
+    if deleted:
+        # das Pragma gibt pro Schritt eine Seite frei; executescript arbeitet alle Schritte ab
+        conn.executescript("PRAGMA incremental_vacuum;")
+        cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info("Log retention finished", {"deleted": deleted, "size_bytes": used_bytes(cur)})
     conn.close()
+    return deleted
+
+
+class RetentionJob:
+    """Runs rotate_logs() periodically in a background thread."""
+
+    def __init__(self, interval_s: float = LOG_RETENTION_INTERVAL_S):
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                rotate_logs()
+            except Exception as e:
+                logger.error("Log retention failed", {"error": str(e)})
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="log-retention", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+retention_job = RetentionJob()
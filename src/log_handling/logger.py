@@ -21,3 +21,12 @@ def init_logger():
         )
         console_handler.setFormatter(formatter)
         logger.addHandler(console_handler)
+
+
+def shutdown_logger():
+    """Flushes and closes all handlers (writes queued SQLite log records)."""
+    logger = logging.getLogger()
+    for handler in list(logger.handlers):
+        handler.flush()
+        handler.close()
+        logger.removeHandler(handler)
@@ -1,5 +1,7 @@
 import time
 import logging
+from services.metrics import REQUEST_DURATION
+from services.exporter import MEDIA_TYPES
 
 logger = logging.getLogger("api")
 
@@ -18,4 +20,17 @@ async def logging_middleware(request, call_next):
         }
     )
 
+    # Route-Template statt konkretem Pfad und nur bekannte Formate, damit die Label-Menge begrenzt bleibt
+    route = request.scope.get("route")
+    format = request.query_params.get("format", "")
+    if format and format not in MEDIA_TYPES:
+        format = "other"
+    REQUEST_DURATION.observe(
+        duration / 1000,
+        method=request.method,
+        route=route.path if route is not None else "unmatched",
+        format=format,
+        status=str(response.status_code)
+    )
+
     return response
@@ -1,24 +1,54 @@
 import logging
 import json
+import queue
 import sqlite3
+import sys
+import threading
+import time
 from datetime import datetime
 from log_handling.log_db import LOG_DB_PATH
+from config import LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL_MS, LOG_QUEUE_SIZE, LOG_QUEUE_OVERFLOW
+
+# Steuer-Nachrichten für den Writer-Thread
+_FLUSH = object()
+_STOP = object()
+
+INSERT_SQL = """
+    INSERT INTO logs (timestamp, level, component, message, details)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
 
 class SQLiteHandler(logging.Handler):
-    def __init__(self):
+    """
+    Non-blocking handler: emit() only enqueues the formatted row, a dedicated
+    writer thread inserts batches with executemany and commits every
+    `batch_size` rows or `flush_interval_ms`. When the queue is full, records
+    are dropped (overflow='drop', counted and reported) or the caller waits
+    (overflow='block').
+    """
+
+    def __init__(self, batch_size=LOG_BATCH_SIZE, flush_interval_ms=LOG_FLUSH_INTERVAL_MS,
+                 queue_size=LOG_QUEUE_SIZE, overflow=LOG_QUEUE_OVERFLOW):
         super().__init__()
-        self.conn = None
+        self.db_path = LOG_DB_PATH
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.overflow = overflow
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="sqlite-log-writer", daemon=True)
+        self._writer.start()
 
-    def _get_connection(self):
-        if self.conn is None:
-            self.conn = sqlite3.connect(LOG_DB_PATH, check_same_thread=False)
-        return self.conn
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
 
     def emit(self, record):
         try:
-            conn = self._get_connection()
-            cur = conn.cursor()
-
             # Konvertiere timestamp zu ISO-String
             timestamp = datetime.utcfromtimestamp(record.created).isoformat() + "Z"
 
@@ -26,23 +56,78 @@ class SQLiteHandler(logging.Handler):
             if isinstance(record.args, dict):
                 details = json.dumps(record.args)
 
-            cur.execute("""
-                INSERT INTO logs (timestamp, level, component, message, details)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                timestamp,
-                record.levelname,
-                record.name,
-                record.getMessage(),
-                details
-            ))
+            row = (timestamp, record.levelname, record.name, record.getMessage(), details)
+        except Exception:
+            self.handleError(record)
+            return
+
+        if self.overflow == "block":
+            self.queue.put(row)
+            return
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
 
+    def _take_dropped(self):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def _write(self, conn, batch):
+        dropped = self._take_dropped()
+        if dropped:
+            timestamp = datetime.utcnow().isoformat() + "Z"
+            batch.append((timestamp, "WARNING", "logging", "Log records dropped (queue full)",
+                          json.dumps({"dropped": dropped})))
+        if not batch:
+            return
+        try:
+            conn.executemany(INSERT_SQL, batch)
             conn.commit()
         except Exception as e:
-            self.handleError(record)
+            # Logging darf die Anwendung nicht stören
+            # wie logging.Handler.handleError nach stderr, nie nach stdout
+            sys.stderr.write(f"SQLiteHandler: failed to write {len(batch)} log records: {e}\n")
+
+    def _run(self):
+        conn = self._connect()
+        batch, pending, deadline = [], 0, None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+                pending += 1
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+
+            # Batch schreiben: voll, Intervall abgelaufen, flush oder stop
+            self._write(conn, batch)
+            for _ in range(pending):
+                self.queue.task_done()
+            batch, pending, deadline = [], 0, None
+            if item is _FLUSH or item is _STOP:
+                self.queue.task_done()
+            if item is _STOP:
+                conn.close()
+                return
+
+    def flush(self):
+        """Blocks until all queued records are committed."""
+        if self._writer.is_alive():
+            self.queue.put(_FLUSH)
+            self.queue.join()
 
     def close(self):
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        if self._writer.is_alive():
+            self.queue.put(_STOP)
+            self._writer.join()
         super().close()
@@ -1,11 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from log_handling.log_db import init_log_db, rotate_logs
-from log_handling.logger import init_logger
+from log_handling.log_db import init_log_db, rotate_logs, retention_job
+from log_handling.logger import init_logger, shutdown_logger
 from log_handling.logging_middleware import logging_middleware
 
-from api import exercises, authors, keywords, graph, admin
+from api import exercises, authors, keywords, graph, paths, admin
+from api.conditional import conditional_get_middleware
+from services.profiling import timing_middleware
+from services.graph_ld import get_ld_snapshot
+from services.graph_store import reload_watcher
+from services.refresh_scheduler import refresh_scheduler
 
 # Logging initialisieren
 init_log_db()
@@ -15,16 +20,55 @@ init_logger()
 # API Objekt initialisieren
 app = FastAPI()
 
-# Middleware registrieren
+# Middleware registrieren (zuletzt registriert = äußerste)
+app.middleware("http")(conditional_get_middleware)
+app.middleware("http")(timing_middleware)
 app.middleware("http")(logging_middleware)
 app.add_middleware(
     CORSMiddleware, 
     allow_origins=["http://46.225.104.187/"], 
     allow_credentials=True, 
     allow_methods=["*"], 
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Missing-Count"]
 )
 
+@app.on_event("startup")
+def load_graph():
+    """Loads the JSON-LD database into memory once at startup."""
+    try:
+        get_ld_snapshot()
+    except (FileNotFoundError, ValueError):
+        # Datenbank existiert erst nach dem ersten Refresh, Fehler sind bereits geloggt
+        pass
+
+@app.on_event("startup")
+def watch_graph():
+    """Picks up database versions published by other workers in the background."""
+    reload_watcher.start()
+
+@app.on_event("startup")
+async def schedule_refresh():
+    """Refreshes the database periodically (REFRESH_INTERVAL_S)."""
+    refresh_scheduler.start()
+
+@app.on_event("startup")
+def start_log_retention():
+    """Prunes the log database periodically."""
+    retention_job.start()
+
+@app.on_event("shutdown")
+async def stop_refresh():
+    """Stops the refresh schedule and cancels a running refresh."""
+    await refresh_scheduler.stop()
+
+@app.on_event("shutdown")
+def flush_logs():
+    """Writes all queued log records before the process exits."""
+    reload_watcher.stop()
+    retention_job.stop()
+    shutdown_logger()
+
 @app.get("/")
 def read_root():
     """Returns a greeting."""
@@ -35,4 +79,5 @@ app.include_router(graph.router)
 app.include_router(exercises.router)
 app.include_router(authors.router)
 app.include_router(keywords.router)
+app.include_router(paths.router)
 app.include_router(admin.router)
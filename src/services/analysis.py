@@ -0,0 +1,158 @@
+# Strukturanalyse einer Graph-Version (beim Build berechnet, als Sidecar gespeichert)
+#
+# - Zyklen: stark zusammenhängende Komponenten (Tarjan, iterativ)
+# - hängende Referenzen und unerwartete dependsOn-Einträge
+# - Tiefe pro Übung (längste Voraussetzungskette darunter) und längste Kette
+# - schwach zusammenhängende Komponenten (Union-Find)
+# Alles in linearer Zeit in Knoten + Kanten.
+
+from services.graph_index import dependency_ids
+
+
+def known_dependencies(index):
+    """Returns exercise id -> referenced ids that exist in the graph."""
+    by_id = index.by_id
+    return {ex_id: [dep for dep in index.depends_on.get(ex_id, ()) if dep in by_id] for ex_id in by_id}
+
+
+def strongly_connected_components(index, deps: dict = None):
+    """
+    Tarjan's algorithm without recursion. Returns the components in dependency
+    order: every component comes after all components it depends on.
+    """
+    deps = deps if deps is not None else known_dependencies(index)
+    number, low = {}, {}
+    stack, on_stack, components = [], set(), []
+
+    def visit(ex_id):
+        number[ex_id] = low[ex_id] = len(number)
+        stack.append(ex_id)
+        on_stack.add(ex_id)
+        return ex_id, iter(deps[ex_id])
+
+    for root in index.by_id:
+        if root in number:
+            continue
+        work = [visit(root)]
+        while work:
+            ex_id, pending = work[-1]
+            for dep in pending:
+                if dep not in number:
+                    work.append(visit(dep))
+                    break
+                if dep in on_stack:
+                    low[ex_id] = min(low[ex_id], number[dep])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[ex_id])
+                if low[ex_id] == number[ex_id]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == ex_id:
+                            break
+                    components.append(component)
+    return components
+
+
+def weak_components(index, deps: dict = None):
+    """Returns exercise id -> component number (components numbered by first appearance)."""
+    deps = deps if deps is not None else known_dependencies(index)
+    parent = {ex_id: ex_id for ex_id in index.by_id}
+
+    def find(ex_id):
+        root = ex_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[ex_id] != root:
+            parent[ex_id], ex_id = root, parent[ex_id]
+        return root
+
+    for ex_id, ex_deps in deps.items():
+        for dep in ex_deps:
+            a, b = find(ex_id), find(dep)
+            if a != b:
+                parent[b] = a
+
+    numbers, component = {}, {}
+    for ex_id in index.by_id:
+        component[ex_id] = numbers.setdefault(find(ex_id), len(numbers))
+    return component
+
+
+def analyze_graph(index, version: str):
+    """
+    Runs the structural analysis of one graph version.
+    `index` is the GraphIndex of the graph version identified by `version`.
+    """
+    deps = known_dependencies(index)
+    cycles, order, depth, longest_dep = [], [], {}, {}
+    for component in strongly_connected_components(index, deps):
+        if len(component) == 1 and component[0] not in deps[component[0]]:
+            ex_id = component[0]
+            order.append(ex_id)
+            best, best_dep = 0, None
+            for dep in deps[ex_id]:
+                if depth[dep] >= best:
+                    best, best_dep = depth[dep] + 1, dep
+            depth[ex_id] = best
+            longest_dep[ex_id] = best_dep
+            continue
+        # Zyklus: alle Mitglieder erhalten dieselbe Tiefe
+        cycles.append(sorted(component))
+        members = set(component)
+        best, best_dep = 0, None
+        for ex_id in component:
+            for dep in deps[ex_id]:
+                if dep not in members and depth[dep] >= best:
+                    best, best_dep = depth[dep] + 1, dep
+        for ex_id in component:
+            depth[ex_id] = best
+            longest_dep[ex_id] = best_dep
+
+    chain = []
+    if depth:
+        cur = max(depth, key=depth.get)
+        while cur is not None:
+            chain.append(cur)
+            cur = longest_dep[cur]
+        chain.reverse()
+
+    dangling, invalid = [], []
+    for ex in index.nodes:
+        for dep in ex.get("dependsOn") or []:
+            ids = dependency_ids(dep)
+            if not ids:
+                invalid.append({"exercise": ex["@id"], "dependency": dep})
+            for dep_id in ids:
+                if dep_id not in index.by_id:
+                    dangling.append({"exercise": ex["@id"], "dependency": dep_id})
+
+    component = weak_components(index, deps)
+    sizes = {}
+    for number in component.values():
+        sizes[number] = sizes.get(number, 0) + 1
+
+    return {
+        "version": version,
+        "order": order,
+        "depth": depth,
+        "component": component,
+        "cycles": cycles,
+        "dangling": dangling,
+        "invalidDependencies": invalid,
+        "longestChain": chain,
+        "statistics": {
+            "maxDepth": max(depth.values(), default=0),
+            "longestChainLength": len(chain),
+            "componentCount": len(sizes),
+            "largestComponentSize": max(sizes.values(), default=0),
+            "cycleCount": len(cycles),
+            "danglingReferenceCount": len(dangling),
+            "invalidDependencyCount": len(invalid),
+        },
+    }
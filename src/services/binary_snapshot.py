@@ -0,0 +1,93 @@
+# Kompakter binärer Snapshot der JSON-LD Datenbank
+#
+# Layout: MAGIC | u32 Header-Länge (little-endian) | Header (JSON) | marshal-Daten
+#
+# Die Daten werden mit marshal (C-Implementierung der Standardbibliothek) abgelegt.
+# Vorher werden alle gleichen Strings auf ein Objekt zusammengelegt; marshal speichert
+# sie dann nur einmal (Referenzen), und nach dem Laden teilen sich wiederholte Werte
+# (ids in dependsOn, Autoren, Keywords) ein Objekt im Speicher.
+# marshal ist nur für Dateien gedacht, die der Dienst selbst schreibt, und nicht
+# zwischen Python-Versionen portabel; der Header vermerkt daher die Version.
+
+import json, marshal, mmap, os, sys
+
+MAGIC = b"STGB"
+FORMAT_VERSION = 1
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def python_tag():
+    return f"{sys.implementation.name}-{sys.version_info[0]}.{sys.version_info[1]}-{marshal.version}"
+
+
+def share_strings(obj, table: dict):
+    """Returns a copy of obj in which equal strings (values and keys) are the same object."""
+    if isinstance(obj, str):
+        return table.setdefault(obj, obj)
+    if isinstance(obj, dict):
+        return {table.setdefault(k, k) if isinstance(k, str) else k: share_strings(v, table) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [share_strings(v, table) for v in obj]
+    return obj
+
+
+def encode_snapshot(data: dict, version: str, stamp=None) -> bytes:
+    """
+    Encodes the JSON-LD database into the binary snapshot format.
+    version/stamp identify the JSON database file the snapshot belongs to.
+    """
+    header = {
+        "format": FORMAT_VERSION,
+        "python": python_tag(),
+        "version": version,
+        "stamp": list(stamp) if stamp else None,
+    }
+    header_raw = json.dumps(header).encode("utf-8")
+    try:
+        payload = marshal.dumps(share_strings(data, {}), marshal.version)
+    except ValueError as e:
+        raise SnapshotFormatError(str(e))
+    return b"".join([MAGIC, len(header_raw).to_bytes(4, "little"), header_raw, payload])
+
+
+def read_header(buf):
+    """Returns (header, position of the payload) of a binary snapshot."""
+    if bytes(buf[:4]) != MAGIC:
+        raise SnapshotFormatError("not a binary graph snapshot")
+    header_len = int.from_bytes(buf[4:8], "little")
+    header = json.loads(bytes(buf[8:8 + header_len]))
+    if header.get("format") != FORMAT_VERSION:
+        raise SnapshotFormatError(f"unsupported snapshot format {header.get('format')}")
+    return header, 8 + header_len
+
+
+def write_snapshot(path: str, data: dict, version: str, stamp=None):
+    """Writes the binary snapshot via temp file and rename."""
+    raw = encode_snapshot(data, version, stamp)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str, stamp=None):
+    """
+    Memory-maps a binary snapshot and decodes it into (data, version).
+    Returns None if the snapshot was written by another Python version or, with
+    stamp, for another JSON database file than the current one.
+    """
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header, pos = read_header(mm)
+            if header.get("python") != python_tag():
+                return None
+            if stamp is not None and header.get("stamp") != list(stamp):
+                return None
+            with memoryview(mm) as view:
+                data = marshal.loads(view[pos:])
+    if not isinstance(data, dict):
+        raise SnapshotFormatError("snapshot does not contain a graph")
+    return data, header["version"]
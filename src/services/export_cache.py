@@ -0,0 +1,124 @@
+# Cache für serialisierte (und komprimierte) Exporte, begrenzt nach Bytes (LRU)
+
+import gzip, threading
+from collections import OrderedDict
+from config import EXPORT_CACHE_MAX_MB, COMPRESSION_MIN_BYTES
+from services.metrics import registry, EXPORT_CACHE_SIZE
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; fehlt es, wird nur gzip angeboten
+    brotli = None
+
+COMPRESSORS = {"gzip": lambda body: gzip.compress(body, compresslevel=6)}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=5)
+
+# Reihenfolge = Präferenz bei gleicher q-Gewichtung
+PREFERRED_ENCODINGS = ["br", "gzip"]
+
+
+class CachedExport:
+    """Serialized export body plus its compressed variants (created on first use)."""
+
+    def __init__(self, body: bytes, media_type: str, headers: dict = None):
+        self.body = body
+        self.media_type = media_type
+        self.headers = headers or {}
+        self.encoded = {}
+
+    @property
+    def size(self):
+        return len(self.body) + sum(len(b) for b in self.encoded.values())
+
+
+class ExportCache:
+    """
+    LRU cache of CachedExport entries bounded by their total size in bytes.
+    Keys contain the graph version, so entries of old versions simply age out.
+    """
+
+    def __init__(self, max_bytes: int = EXPORT_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry: CachedExport):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.size += entry.size
+            self._evict()
+
+    def encoded(self, key, entry: CachedExport, encoding: str):
+        """Returns the body for a content-encoding (None = identity), compressing it once."""
+        if encoding is None:
+            return entry.body
+        body = entry.encoded.get(encoding)
+        if body is not None:
+            return body
+        # außerhalb des Locks komprimieren, andere Requests laufen weiter
+        body = COMPRESSORS[encoding](entry.body)
+        with self._lock:
+            if encoding not in entry.encoded:
+                entry.encoded[encoding] = body
+                if self._entries.get(key) is entry:
+                    self.size += len(body)
+                    self._evict()
+            return entry.encoded[encoding]
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def negotiate_encoding(accept_encoding: str, size: int):
+    """Chooses a supported content-encoding from an Accept-Encoding header (None = identity)."""
+    if not accept_encoding or size < COMPRESSION_MIN_BYTES:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in PREFERRED_ENCODINGS:
+        if encoding not in COMPRESSORS:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+export_cache = ExportCache()
+registry.add_collector(lambda: EXPORT_CACHE_SIZE.set(export_cache.size))
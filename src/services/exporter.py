@@ -1,37 +1,244 @@
-from fastapi.responses import JSONResponse
+import json
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from formats.nodelink_export import NodeLinkExporter
-from formats.yaml_export import YamlExporter
+from formats.yaml_export import YamlExporter, FragmentCache
+from services.export_cache import CachedExport, export_cache, negotiate_encoding
+from starlette.concurrency import run_in_threadpool
+from services.graph_ld import aget_ld_snapshot
+from services.graph_store import graph_store
+from services.metrics import EXPORT_BYTES, EXPORT_CACHE
+from services.profiling import phase
+
+MEDIA_TYPES = {
+    "jsonld": "application/ld+json",
+    "nodelink": "application/json",
+    "yaml": "text/yaml",
+    "ndjson": "application/x-ndjson",
+}
+
+# Berichtsschlüssel neben '@graph' (z.B. fehlende ids), die auch Node-Link und NDJSON übernehmen
+REPORT_KEYS = ("missing", "unresolved")
+
+# Streaming-Antworten werden in Blöcken dieser Größe geschrieben statt Knoten für Knoten
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def encode_json(obj) -> bytes:
+    """Encodes like JSONResponse, so streamed and buffered exports are byte-identical."""
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def iter_json_array(items):
+    yield b"["
+    for i, item in enumerate(items):
+        if i:
+            yield b","
+        yield encode_json(item)
+    yield b"]"
+
+
+def iter_jsonld(ld_data):
+    """Yields the JSON-LD document piecewise, '@graph' node by node."""
+    yield b"{"
+    for i, (key, value) in enumerate(ld_data.items()):
+        if i:
+            yield b","
+        yield encode_json(key) + b":"
+        if key == "@graph":
+            yield from iter_json_array(value)
+        else:
+            yield encode_json(value)
+    yield b"}"
+
+
+def iter_nodelink(ld_data):
+    """Yields the Node-Link document piecewise without building the node and link lists."""
+    exporter = NodeLinkExporter()
+    yield b'{"nodes":'
+    yield from iter_json_array(exporter.iter_nodes(ld_data))
+    yield b',"links":'
+    yield from iter_json_array(exporter.iter_links(ld_data))
+    yield b"}"
+
+
+def iter_ndjson(ld_data):
+    """
+    Yields one JSON-LD node per line (application/x-ndjson), followed by one line
+    with the report keys (e.g. {"missing": [...]}) if the data has any.
+    """
+    for ex in ld_data.get("@graph", []):
+        yield encode_json(ex) + b"\n"
+    report = {key: ld_data[key] for key in REPORT_KEYS if key in ld_data}
+    if report:
+        yield encode_json(report) + b"\n"
+
+
+def iter_yaml(ld_data):
+    """Yields the YAML document node by node, reusing the cached node fragments."""
+    for fragment in YamlExporter(yaml_fragments()).iter_ld(ld_data):
+        yield fragment.encode("utf-8")
+
+
+STREAM_ENCODERS = {
+    "jsonld": iter_jsonld,
+    "nodelink": iter_nodelink,
+    "ndjson": iter_ndjson,
+    "yaml": iter_yaml,
+}
+
+# YAML-Fragmente der Knoten der aktuellen Graph-Version
+_yaml_fragments = None
+
+
+def yaml_fragments():
+    """Returns the YAML fragment cache of the current graph version (None without database)."""
+    global _yaml_fragments
+    try:
+        snapshot = graph_store.get()
+    except (FileNotFoundError, ValueError):
+        return None
+    cache = _yaml_fragments
+    if cache is None or cache.by_id is not snapshot.index.by_id:
+        cache = _yaml_fragments = FragmentCache(snapshot.index.by_id)
+    return cache
+
+
+def chunked(parts, size: int = STREAM_CHUNK_BYTES):
+    """Joins small byte pieces into chunks of at least `size` bytes."""
+    buffer, length = [], 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield b"".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+class Page:
+    """One page of a paginated export: the JSON-LD data plus the cursor of the next page."""
+
+    def __init__(self, data: dict, next_cursor: str = None):
+        self.data = data
+        self.next_cursor = next_cursor
+
+    @property
+    def headers(self):
+        return {"X-Next-Cursor": self.next_cursor} if self.next_cursor else {}
+
+
+def serialize_graph(ld_data, format: str) -> bytes:
+    """
+    Serialisiert JSON-LD Daten im gewünschten Format zu Bytes.
+    ld_data: JSON-LD Datenstruktur (dict)
+    format: 'jsonld' | 'nodelink' | 'yaml' | 'ndjson'
+    """
+    if format in ("ndjson", "yaml"):
+        # zeilen- bzw. knotenweise Formate, direkt als Text (nicht JSON-kodiert)
+        with phase("serialize"):
+            body = b"".join(STREAM_ENCODERS[format](ld_data))
+        EXPORT_BYTES.inc(len(body), format=format)
+        return body
+    with phase("export"):
+        if format == "jsonld":
+            content = ld_data
+        elif format == "nodelink":
+            content = NodeLinkExporter().from_ld(ld_data)
+            content.update((key, ld_data[key]) for key in REPORT_KEYS if key in ld_data)
+        else:
+            raise ValueError(f"Unknown format '{format}'")
+    with phase("serialize"):
+        body = JSONResponse(content=content).body
+    EXPORT_BYTES.inc(len(body), format=format)
+    return body
+
+
+def error_unknown_format(format: str):
+    return JSONResponse(
+        content={"error": f"Unknown format '{format}'"},
+        status_code=400
+    )
 
 
 def export_graph(ld_data, format: str):
     """
     Einheitliche Export-Pipeline für alle Ausgabeformate.
     ld_data: JSON-LD Datenstruktur (dict)
-    format: 'jsonld' | 'nodelink' | 'yaml'
-    """
-
-    if format == "jsonld":
-        return JSONResponse(
-            content=ld_data,
-            media_type="application/ld+json"
-        )
-
-    elif format == "nodelink":
-        nl = NodeLinkExporter().from_ld(ld_data)
-        return JSONResponse(
-            content=nl,
-            media_type="application/json"
-        )
-
-    elif format == "yaml":
-        yaml = YamlExporter().from_ld(ld_data)
-        return JSONResponse(
-            content=yaml,
-            media_type="text/yaml"
-        )
-
-    else:
-        return JSONResponse(
-            content={"error": f"Unknown format '{format}'"},
-            status_code=400
-        )
+    format: 'jsonld' | 'nodelink' | 'yaml' | 'ndjson'
+    """
+    if format not in MEDIA_TYPES:
+        return error_unknown_format(format)
+    return Response(content=serialize_graph(ld_data, format), media_type=MEDIA_TYPES[format])
+
+
+def stream_graph(ld_data, format: str, headers: dict = None):
+    """
+    Wie export_graph, aber die Antwort wird während des Sendens erzeugt (chunked),
+    ohne das ganze Dokument im Speicher zu halten.
+    """
+    if format not in STREAM_ENCODERS:
+        response = export_graph(ld_data, format)
+        response.headers.update(headers or {})
+        return response
+
+    def body():
+        total = 0
+        for chunk in chunked(STREAM_ENCODERS[format](ld_data)):
+            total += len(chunk)
+            yield chunk
+        EXPORT_BYTES.inc(total, format=format)
+
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[format], headers=headers)
+
+
+def build_export(build, format: str):
+    """
+    Runs build() and serializes the result (JSONResponse results are passed through).
+    A Page result keeps its pagination headers with the cached export.
+    """
+    with phase("filter"):
+        ld_data = build()
+    if isinstance(ld_data, JSONResponse):
+        return ld_data
+    headers = None
+    if isinstance(ld_data, Page):
+        ld_data, headers = ld_data.data, ld_data.headers
+    return CachedExport(serialize_graph(ld_data, format), MEDIA_TYPES[format], headers)
+
+
+async def export_graph_cached(request, endpoint: str, params: dict, build, format: str):
+    """
+    Wie export_graph, aber die serialisierten Bytes (inkl. gzip/br-Varianten) werden
+    pro (Graph-Version, Endpoint, Parameter, Format) gecacht.
+    Ein Cache-Treffer wird direkt auf dem Event-Loop beantwortet, nur Aufbau,
+    Serialisierung und Komprimierung laufen im Threadpool.
+    build: Funktion ohne Argumente, die die JSON-LD Daten (oder eine Page) liefert (nur bei
+           Cache-Miss aufgerufen); darf eine JSONResponse (z.B. 404) zurückgeben, diese wird
+           nicht gecacht.
+    """
+    if format not in MEDIA_TYPES:
+        return error_unknown_format(format)
+    key = ((await aget_ld_snapshot()).version, endpoint, tuple(sorted(params.items())), format)
+    entry = export_cache.get(key)
+    EXPORT_CACHE.inc(result="miss" if entry is None else "hit")
+    if entry is None:
+        entry = await run_in_threadpool(build_export, build, format)
+        if isinstance(entry, JSONResponse):
+            return entry
+        export_cache.put(key, entry)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), len(entry.body))
+    headers = dict(entry.headers, Vary="Accept-Encoding")
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    content = entry.body if encoding is None else entry.encoded.get(encoding)
+    if content is None:
+        with phase("compress"):
+            content = await run_in_threadpool(export_cache.encoded, key, entry, encoding)
+    return Response(
+        content=content,
+        media_type=entry.media_type,
+        headers=headers
+    )
@@ -0,0 +1,41 @@
+# Vorberechnete Aggregate (Facetten) einer Graph-Version
+
+from collections import defaultdict
+from services.search_index import field_values
+
+# vorberechnete Zählungen: Name -> (Feld, Subfeld, lowercase)
+FACET_FIELDS = {
+    "keywords": ("keywords", None, True),
+    "authors": ("author", "name", False),
+}
+
+
+def count_values(nodes: list, field: str, subfield: str = None, lowercase: bool = True):
+    """Returns frequency counts of the values of one field over all exercises."""
+    counts = defaultdict(int)
+    for ex in nodes:
+        for value in field_values(ex, field, subfield):
+            if lowercase and isinstance(value, str):
+                value = value.lower()
+            counts[value] += 1
+    return dict(counts)
+
+
+def build_facets(index, version: str):
+    """
+    Computes all aggregates served by /keywords, /authors and /graph/statistics.
+    `index` is the GraphIndex of the graph version identified by `version`.
+    """
+    facets = {"version": version}
+    for name, (field, subfield, lowercase) in FACET_FIELDS.items():
+        facets[name] = count_values(index.nodes, field, subfield, lowercase)
+    facets["statistics"] = {
+        "nodeCount": len(index.nodes),
+        "edgeCount": sum(len(deps) for deps in index.depends_on.values()),
+        "startNodeCount": len(index.start_nodes()),
+        "endNodeCount": len(index.end_nodes()),
+        "keywordCountDistinct": len(facets["keywords"]),
+        "keywordCountTotal": sum(facets["keywords"].values()),
+        "authorCountDistinct": len(facets["authors"]),
+    }
+    return facets
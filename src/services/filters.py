@@ -1,52 +1,47 @@
-from collections import defaultdict
-from services.graph_ld import get_ld_graph
+from services.graph_ld import get_ld_snapshot
+from services.facets import FACET_FIELDS, count_values
 
 # auxiliary functions to get lists and counts of tags
 
-def get_count(field: str, subfield: str = None, lowercase: bool = True):
+# Alle Funktionen nehmen optional den bereits geladenen Snapshot entgegen
+# (sonst wird die aktuelle Version geholt).
+
+def get_facet(field: str, subfield: str = None, lowercase: bool = True, snapshot=None):
+    """Returns the precomputed counts for the field, or None if it is not precomputed."""
+    for name, spec in FACET_FIELDS.items():
+        if spec == (field, subfield, lowercase):
+            return (snapshot or get_ld_snapshot()).facets[name]
+    return None
+
+def get_count(field: str, subfield: str = None, lowercase: bool = True, snapshot=None):
     """
     Returns frequency counts for a given field in the database.
     - field: top-level field in each exercise
     - subfield: optional subfield if field is a dict
     - lowercase: normalize values to lowercase if True
     """
-    counts = defaultdict(int)
-    db = get_ld_graph()
-    for ex in db["@graph"]:
-        if ex.get(field) is not None:
-            field_values = ex[field]
-            if isinstance(field_values, str) or isinstance(field_values, dict):
-                field_values = [field_values]
-            for value in field_values:
-                if isinstance(value, dict) and subfield:
-                    value = value.get(subfield)
-                if value is None:
-                    continue
-                if lowercase and isinstance(value, str):
-                    value = value.lower()
-                counts[value] += 1
+    counts = get_facet(field, subfield, lowercase, snapshot)
+    if counts is None:
+        counts = count_values((snapshot or get_ld_snapshot()).index.nodes, field, subfield, lowercase)
     return dict(counts)
 
-def get_list(field: str, subfield: str = None, lowercase: bool = True):
+def get_list(field: str, subfield: str = None, lowercase: bool = True, snapshot=None):
     """
     Returns a list of unique values for a given field in the database.
     - field: top-level field in each exercise (e.g. "keywords", "author")
     - subfield: optional subfield if field is a dict (e.g. "name")
     - lowercase: normalize values to lowercase if True
     """
-    values = set()
-    db = get_ld_graph()
-    for ex in db["@graph"]:
-        if ex.get(field) is not None:
-            field_values = ex[field]
-            if isinstance(field_values, str) or isinstance(field_values, dict):
-                field_values = [field_values]
-            for value in field_values:
-                if isinstance(value, dict) and subfield:
-                    value = value.get(subfield)
-                if value is None:
-                    continue
-                if lowercase and isinstance(value, str):
-                    value = value.lower()
-                values.add(value)
-    return sorted(list(values))
+    return sorted(get_count(field, subfield, lowercase, snapshot))
+
+def get_statistics(snapshot=None):
+    """Returns the precomputed graph statistics (facets and structural analysis) of the current version."""
+    snapshot = snapshot or get_ld_snapshot()
+    stats = dict(snapshot.facets["statistics"])
+    stats.update(snapshot.analysis["statistics"])
+    return stats
+
+def get_analysis(snapshot=None):
+    """Returns the findings of the structural analysis of the current version (without per-node data)."""
+    analysis = (snapshot or get_ld_snapshot()).analysis
+    return {key: analysis[key] for key in ("cycles", "dangling", "invalidDependencies", "longestChain")}
@@ -0,0 +1,103 @@
+# Asynchroner GitHub REST Client mit Connection-Pooling und Rate-Limit-Behandlung
+
+import asyncio, time, logging
+import httpx
+from config import GITHUB_API_URL, UPDATER_WORKERS, UPDATER_MAX_RETRIES
+from services.metrics import UPDATER_API_CALLS, RATE_LIMIT_REMAINING
+
+logger = logging.getLogger("updater")
+
+# ab dieser Anzahl verbleibender Requests wird gedrosselt
+RATE_LIMIT_LOW_WATERMARK = 50
+
+# Sekunden pro Request (Verbindungsaufbau, Lesen)
+REQUEST_TIMEOUT = 30
+
+
+class GitHubClient:
+    """
+    GitHub API client on the event loop (httpx.AsyncClient with one keep-alive pool
+    shared by all concurrent requests). Honours `Retry-After` and
+    `X-RateLimit-Remaining` / `X-RateLimit-Reset`: when the limit is exhausted all
+    requests pause until the reset, when it runs low requests are spread over the
+    remaining window.
+    """
+
+    def __init__(self, token: str, base_url: str = GITHUB_API_URL, pool_size: int = UPDATER_WORKERS,
+                 max_retries: int = UPDATER_MAX_RETRIES):
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.client = httpx.AsyncClient(
+            headers={
+                'Authorization': f'token {token}',
+                'Accept': 'application/vnd.github.v3+json',
+            },
+            limits=httpx.Limits(max_connections=max(pool_size, 1), max_keepalive_connections=max(pool_size, 1)),
+            timeout=REQUEST_TIMEOUT,
+        )
+        self.calls = 0
+        self.not_modified = 0
+        self.rate_limit_remaining = None
+        self._not_before = 0.0
+
+    def url(self, path: str):
+        return path if path.startswith('http') else self.base_url + path
+
+    async def _wait_turn(self):
+        delay = self._not_before - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _pause_until(self, timestamp: float):
+        self._not_before = max(self._not_before, timestamp)
+
+    def _update_rate_limit(self, r):
+        remaining = r.headers.get('X-RateLimit-Remaining')
+        reset = r.headers.get('X-RateLimit-Reset')
+        if remaining is None:
+            return
+        remaining = int(remaining)
+        self.rate_limit_remaining = remaining
+        RATE_LIMIT_REMAINING.set(remaining)
+        if reset is None or remaining >= RATE_LIMIT_LOW_WATERMARK:
+            return
+        window = max(float(reset) - time.time(), 0)
+        if remaining == 0:
+            self._pause_until(float(reset))
+        else:
+            # restliche Requests gleichmäßig über das Fenster verteilen
+            self._pause_until(time.time() + window / remaining)
+
+    def _retry_delay(self, r, attempt: int):
+        """Returns the seconds to wait before retrying, or None if the response is final."""
+        if r.is_success:
+            return None
+        retry_after = r.headers.get('Retry-After')
+        if retry_after is not None:
+            return float(retry_after)
+        if r.status_code in (403, 429) and r.headers.get('X-RateLimit-Remaining') == '0':
+            reset = float(r.headers.get('X-RateLimit-Reset', time.time()))
+            return max(reset - time.time(), 0)
+        if r.status_code == 429 or r.status_code >= 500:
+            return min(2 ** attempt, 60)
+        return None
+
+    async def get(self, path: str, headers: dict = None):
+        """GET with shared throttling and retries on rate limits / server errors."""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_turn()
+            r = await self.client.get(self.url(path), headers=headers)
+            self.calls += 1
+            if r.status_code == 304:
+                self.not_modified += 1
+            UPDATER_API_CALLS.inc(status=str(r.status_code))
+            self._update_rate_limit(r)
+            delay = self._retry_delay(r, attempt)
+            if delay is None or attempt == self.max_retries:
+                return r
+            logger.warning("GitHub request throttled", {"url": str(r.url), "status": r.status_code, "retry_in_s": delay})
+            self._pause_until(time.time() + delay)
+        return r
+
+    async def close(self):
+        await self.client.aclose()
@@ -0,0 +1,102 @@
+# Vorberechnete Indizes über einer Version der JSON-LD Datenbank
+# (unerwartete dependsOn-Einträge meldet die Analyse beim Build, siehe analysis.py)
+
+
+def dependency_ids(dep):
+    """Returns the exercise ids referenced by one `dependsOn` entry (plain id, @id or oneOf)."""
+    if isinstance(dep, str):
+        return [dep]
+    ids = []
+    if isinstance(dep, dict):
+        if dep.get("@id"):
+            ids.append(dep["@id"])
+        if dep.get("oneOf"):
+            ids.extend(alt for alt in dep["oneOf"] if isinstance(alt, str))
+    return ids
+
+
+class GraphIndex:
+    """
+    Id index and adjacency lists of one graph version.
+    - by_id: exercise id -> node
+    - depends_on: exercise id -> referenced ids (oneOf alternatives expanded)
+    - dependents: exercise id -> ids of exercises depending on it
+    """
+
+    def __init__(self, graph: dict):
+        self.nodes = graph.get("@graph", [])
+        self.by_id = {}
+        self.depends_on = {}
+        self.dependents = {}
+
+        for ex in self.nodes:
+            # bei doppelten ids gewinnt (wie bisher) der erste Eintrag
+            self.by_id.setdefault(ex["@id"], ex)
+
+        for ex in self.nodes:
+            ex_id = ex["@id"]
+            if ex_id in self.depends_on:
+                continue
+            targets = []
+            for dep in ex.get("dependsOn") or []:
+                for dep_id in dependency_ids(dep):
+                    if dep_id not in targets:
+                        targets.append(dep_id)
+                        self.dependents.setdefault(dep_id, []).append(ex_id)
+            self.depends_on[ex_id] = targets
+
+    def get(self, uuid: str):
+        """Returns the node with the given id or None."""
+        return self.by_id.get(uuid)
+
+    def ancestors(self, uuid: str):
+        """
+        Returns the node and all nodes it (transitively) depends on, in depth-first
+        pre-order. Unknown ids are skipped. Iterative, so chain depth is unbounded.
+        """
+        result = []
+        visited = set()
+        stack = [uuid]
+        while stack:
+            cur = stack.pop()
+            if cur in visited:
+                continue
+            visited.add(cur)
+            node = self.by_id.get(cur)
+            if node is None:
+                continue
+            result.append(node)
+            stack.extend(reversed(self.depends_on.get(cur, [])))
+        return result
+
+    def neighbourhood(self, seeds, up: int = 0, down: int = 0):
+        """
+        Returns the ids of the seeds plus all exercises at most `up` dependency steps
+        above them (prerequisites) and `down` steps below them (dependents).
+        Unknown ids are skipped.
+        """
+        found = dict.fromkeys(seed for seed in seeds if seed in self.by_id)
+        start = list(found)
+        for edges, depth in ((self.depends_on, up), (self.dependents, down)):
+            seen = set(start)
+            level = start
+            for _ in range(depth):
+                next_level = []
+                for ex_id in level:
+                    for other in edges.get(ex_id, ()):
+                        if other not in seen and other in self.by_id:
+                            seen.add(other)
+                            next_level.append(other)
+                if not next_level:
+                    break
+                level = next_level
+                found.update(dict.fromkeys(next_level))
+        return list(found)
+
+    def start_nodes(self):
+        """Returns all nodes without dependencies."""
+        return [ex for ex in self.nodes if not ex.get("dependsOn")]
+
+    def end_nodes(self):
+        """Returns all nodes no other exercise depends on."""
+        return [ex for ex in self.nodes if ex["@id"] not in self.dependents]
@@ -3,42 +3,60 @@
 from fastapi import status
 from fastapi.responses import JSONResponse
 from datetime import datetime
+from functools import lru_cache
 import json, os, logging
-from config import STORAGE_DIR, LD_DATABASE, LD_CONTEXT_TEMPLATE
+from config import STORAGE_DIR, METADATA_FILE, LD_CONTEXT_TEMPLATE
+from services.graph_store import graph_store
+from services.profiling import phase
+from services.search_index import INDEXED_FIELDS, field_values
+from services.pagination import paginate, InvalidCursor
 
 logger = logging.getLogger("storage")
 
 # auxiliary graph manipulation subroutines for JSON-LD graphs
 
-def get_ld_graph():
-    """Loads and returns the whole graph framework from the JSON-LD database."""
+def get_ld_snapshot():
+    """Returns the current in-memory snapshot (graph data plus version) of the JSON-LD database."""
+    try:
+        with phase("load"):
+            return graph_store.get()
+    except FileNotFoundError as e:
+        logger.critical("JSON-LD database not found", {"path": graph_store.path, "error": str(e)})
+        raise
+    except json.JSONDecodeError as e:
+        logger.critical("Error decoding JSON-LD database", {"path": graph_store.path, "error": str(e)})
+        raise
+
+async def aget_ld_snapshot():
+    """Async variant of get_ld_snapshot (no thread hop while the snapshot is current)."""
     try:
-        with open(LD_DATABASE, 'r', encoding='utf-8') as f:
-            wholeGraph = json.load(f)
-        logger.info("JSON-LD database loaded", {"path": LD_DATABASE})
-        return wholeGraph
+        with phase("load"):
+            return await graph_store.aget()
     except FileNotFoundError as e:
-        logger.critical("JSON-LD database not found", {"path": LD_DATABASE, "error": str(e)})
+        logger.critical("JSON-LD database not found", {"path": graph_store.path, "error": str(e)})
         raise
     except json.JSONDecodeError as e:
-        logger.critical("Error decoding JSON-LD database", {"path": LD_DATABASE, "error": str(e)})
+        logger.critical("Error decoding JSON-LD database", {"path": graph_store.path, "error": str(e)})
         raise
 
-def init_ld_graph():
+def get_ld_graph():
+    """Returns the whole graph framework from the JSON-LD database (read-only, shared)."""
+    return get_ld_snapshot().data
+
+def init_ld_graph(snapshot=None):
     """Returns an empty JSON-LD graph framework."""
     graph = {}
     add_ld_context(graph)
-    add_ld_metadata(graph)
+    add_ld_metadata(graph, snapshot=snapshot)
     graph["@graph"] = []
     return graph
 
-def get_ld_exercise_node(uuid: str):
-    """Get the list element with the given uuid from the JSON-LD database."""
-    db = get_ld_graph()
-    for ex in db["@graph"]:
-        if ex["@id"] == uuid:
-            return ex
-    return error_notFound("uuid", uuid)
+def get_ld_exercise_node(uuid: str, snapshot=None):
+    """Get the list element with the given uuid from the JSON-LD database (or the given snapshot)."""
+    ex = (snapshot or get_ld_snapshot()).index.get(uuid)
+    if ex is None:
+        return error_notFound("uuid", uuid)
+    return ex
 
 def get_ld_exercises_by_tag(field: str, search: str, subfield: str = None, match: str = "exact", lowercase: bool = True):
     """
@@ -49,128 +67,290 @@ def get_ld_exercises_by_tag(field: str, search: str, subfield: str = None, match
     - match: "exact" or "partial"
     - lowercase: normalize values to lowercase if True
     """
+    snapshot = get_ld_snapshot()
+    exTagged = init_ld_graph(snapshot)
+    if lowercase and INDEXED_FIELDS.get(field) == (field, subfield):
+        exTagged["@graph"] = snapshot.search.filter([(field, search, match)])
+        return exTagged
+    # nicht indizierte Felder: linearer Scan
     if lowercase:
         search = search.lower()
-    exTagged = init_ld_graph()
-    db = get_ld_graph()
-    for ex in db["@graph"]:
-        if ex.get(field) is not None:
-            field_values = ex[field]
-            if isinstance(field_values, str) or isinstance(field_values, dict):
-                field_values = [field_values]
-            for val in field_values:
-                if isinstance(val, dict) and subfield:
-                    val = val.get(subfield)
-                if val is None:
-                    continue
-                if isinstance(val, str) and lowercase:
-                    valCmp = val.lower()
-                else:
-                    valCmp = val
-                if match == "exact" and search == valCmp:
-                    exTagged["@graph"].append(ex)
-                    break
-                elif match == "partial" and isinstance(valCmp, str) and search in valCmp:
-                    exTagged["@graph"].append(ex)
-                    break
+    for ex in snapshot.data["@graph"]:
+        for val in field_values(ex, field, subfield):
+            if isinstance(val, str) and lowercase:
+                valCmp = val.lower()
+            else:
+                valCmp = val
+            if match == "exact" and search == valCmp:
+                exTagged["@graph"].append(ex)
+                break
+            elif match == "partial" and isinstance(valCmp, str) and search in valCmp:
+                exTagged["@graph"].append(ex)
+                break
     return exTagged
 
+def get_ld_exercises_filtered(author: str = None, keyword: str = None, topic: str = None, match: str = "exact"):
+    """
+    Returns the exercises matching all given filters (case-insensitive).
+    author / keyword honour `match`, topic is always a substring match on 'teaches'.
+    """
+    return get_ld_snapshot().search.filter(filter_criteria(author, keyword, topic, match))
+
+def filter_criteria(author: str = None, keyword: str = None, topic: str = None, match: str = "exact"):
+    """Returns the SearchIndex criteria for the given filters."""
+    criteria = []
+    if author:
+        criteria.append(("author", author, match))
+    if keyword:
+        criteria.append(("keywords", keyword, match))
+    if topic:
+        criteria.append(("teaches", topic, "partial"))
+    return criteria
+
+def get_ld_exercises_page(author: str = None, keyword: str = None, topic: str = None, match: str = "exact",
+                          limit: int = None, cursor: str = None):
+    """
+    Returns (JSON-LD graph, next cursor) with one page of the filtered exercises
+    ordered by @id, or a 400 JSONResponse for an invalid cursor.
+    """
+    try:
+        nodes, next_cursor = paginate(get_ld_snapshot().search, filter_criteria(author, keyword, topic, match),
+                                      limit, cursor)
+    except InvalidCursor as e:
+        return error_badRequest(str(e)), None
+    return {"@graph": nodes}, next_cursor
+
+def get_ld_exercises_batch(uuids, snapshot=None):
+    """
+    Returns (JSON-LD graph, missing ids): the exercises with the given ids in request
+    order (duplicates once), resolved against the id index of one graph version.
+    Ids not in the database are listed under 'missing' instead of failing the batch.
+    """
+    snapshot = snapshot or get_ld_snapshot()
+    by_id = snapshot.index.by_id
+    batch = init_ld_graph(snapshot)
+    missing = []
+    for uuid in dict.fromkeys(uuids):
+        node = by_id.get(uuid)
+        if node is None:
+            missing.append(uuid)
+        else:
+            batch["@graph"].append(node)
+    if missing:
+        batch["missing"] = missing
+    return batch, missing
+
+def get_ld_subgraph(root: str = None, keyword: str = None, match: str = "exact", up: int = 0, down: int = 0):
+    """
+    Returns a graph in JSON-LD format with the neighbourhood of the root exercise and/or
+    all exercises with the keyword: prerequisites up to `up` steps above, dependents up
+    to `down` steps below, in topological order.
+    """
+    snapshot = get_ld_snapshot()
+    seeds = []
+    if root is not None:
+        if snapshot.index.get(root) is None:
+            return error_notFound("uuid", root)
+        seeds.append(root)
+    if keyword is not None:
+        seeds.extend(ex["@id"] for ex in snapshot.search.filter([("keywords", keyword, match)]))
+    ids = snapshot.index.neighbourhood(seeds, up, down)
+    # Nummerierung aus der Build-Analyse, ohne die transitive Hülle aufzubauen
+    position = snapshot.position
+    unnumbered = len(position)
+    ids.sort(key=lambda ex_id: position.get(ex_id, unnumbered))
+    subgraph = init_ld_graph(snapshot)
+    subgraph["@graph"] = [snapshot.index.by_id[ex_id] for ex_id in ids]
+    return subgraph
+
 def get_ld_path_to_exercise(uuid: str):
     """Returns a graph in JSON-LD format with all nodes leading to the given one."""
-    path = init_ld_graph()
-    path["@graph"].append(get_ld_exercise_node(uuid))
-    if not isinstance(path, JSONResponse) and path.get("@graph"):
-        visited = None
-        expand_ld_dependencies(path, path["@graph"][0], visited)
+    snapshot = get_ld_snapshot()
+    index = snapshot.index
+    if index.get(uuid) is None:
+        return error_notFound("uuid", uuid)
+    path = init_ld_graph(snapshot)
+    path["@graph"] = index.ancestors(uuid)
     return path
 
-def expand_ld_dependencies(data, curEx, visited):
-    """Add the current exercise's dependencies to the JSON-LD graph."""
-    if visited is None:
-        visited = set()
-    if curEx.get("dependsOn") is not None:
-        for dep in curEx["dependsOn"]:
-            if isinstance(dep, str):
-                add_ld_exercise(data, dep, visited)
-            elif isinstance(dep, dict) and dep.get("oneOf"):
-                for alt in dep["oneOf"]:
-                    add_ld_exercise(data, alt, visited)
-            else:
-                print("unexpected dependency structure in ", curEx["@id"], ": ", dep)
+def get_ld_dependents(uuid: str):
+    """Returns a graph in JSON-LD format with the exercises directly depending on the given one."""
+    snapshot = get_ld_snapshot()
+    index = snapshot.index
+    if index.get(uuid) is None:
+        return error_notFound("uuid", uuid)
+    dependents = init_ld_graph(snapshot)
+    dependents["@graph"] = [index.by_id[ex_id] for ex_id in index.dependents.get(uuid, ())]
+    return dependents
 
-def add_ld_exercise(data, uuid, visited):
-    """Adds an exercise to the JSON-LD data structure."""
-    if uuid not in visited:
-        visited.add(uuid)
-        ex = get_ld_exercise_node(uuid)
-        if not isinstance(ex, JSONResponse):
-            data["@graph"].append(ex)
-            expand_ld_dependencies(data, ex, visited)
+def get_ld_descendants(uuid: str, depth: int = None):
+    """
+    Returns a graph in JSON-LD format with all exercises (transitively) depending on
+    the given one, at most `depth` steps away, in topological order.
+    """
+    snapshot = get_ld_snapshot()
+    if snapshot.index.get(uuid) is None:
+        return error_notFound("uuid", uuid)
+    descendants = init_ld_graph(snapshot)
+    descendants["@graph"] = [snapshot.index.by_id[ex_id] for ex_id in snapshot.reachability.descendants(uuid, depth)]
+    return descendants
+
+def get_ld_learning_plan(targets, completed=()):
+    """
+    Returns a graph in JSON-LD format with the exercises still to learn for all
+    targets in topological order (prerequisites first), one alternative chosen
+    per oneOf group. Referenced ids missing in the database are listed under
+    'unresolved'.
+    """
+    snapshot = get_ld_snapshot()
+    for uuid in targets:
+        if snapshot.index.get(uuid) is None:
+            return error_notFound("uuid", uuid)
+    order, unresolved = snapshot.planner.plan(targets, completed)
+    plan = init_ld_graph(snapshot)
+    plan["@graph"] = [snapshot.index.by_id[ex_id] for ex_id in order]
+    if unresolved:
+        plan["unresolved"] = unresolved
+    return plan
 
 def get_ld_end_nodes():
     """Returns all nodes that are not referenced by others (end points / final lessons)."""
-    referenced_ids = set()
-    db = get_ld_graph()
-    for ex in db["@graph"]:
-        if ex.get("dependsOn"):
-            for dep in ex["dependsOn"]:
-                if isinstance(dep, str):
-                    referenced_ids.add(dep)
-                elif isinstance(dep, dict):
-                    if dep.get("@id"):
-                        referenced_ids.add(dep["@id"])
-                    if dep.get("oneOf"):
-                        for alt in dep["oneOf"]:
-                            referenced_ids.add(alt)
-    ends = init_ld_graph()
-    for ex in db["@graph"]:
-        if ex["@id"] not in referenced_ids:
-            ends["@graph"].append(ex)
+    snapshot = get_ld_snapshot()
+    ends = init_ld_graph(snapshot)
+    ends["@graph"] = snapshot.index.end_nodes()
     return ends
 
 def get_ld_start_nodes():
     """Returns all nodes that have no dependencies (entry points / starting lessons)."""
-    starts = init_ld_graph()
-    db = get_ld_graph()
-    for ex in db["@graph"]:
-        deps = ex.get("dependsOn", [])
-        if not deps or len(deps) == 0:
-            starts["@graph"].append(ex)
+    snapshot = get_ld_snapshot()
+    starts = init_ld_graph(snapshot)
+    starts["@graph"] = snapshot.index.start_nodes()
     return starts
 
 # routines to create the json-ld-database from the challenge-metadata files
 
-def createdb_jsonld():
-    """Creates challenges-ld.json from challenges' metadata."""
+def createdb_jsonld(changed_files=None, removed_ids=(), meta=None):
+    """
+    Creates the JSON-LD database from challenges' metadata.
+    - changed_files: optional snapshot files written since the last build; if given and a
+      database exists, only these are parsed and patched into the current graph
+    - removed_ids: exercise ids to drop during an incremental build (e.g. renamed challenges)
+    - meta: the updater's metadata (default: read from METADATA_FILE), names the current
+      snapshot file of each repository for a full rebuild
+    Without changed_files all snapshot files in STORAGE_DIR are read (full rebuild).
+    """
+    current = None
+    if changed_files is not None:
+        try:
+            current = graph_store.get()
+        except (FileNotFoundError, ValueError):
+            logger.warning("No JSON-LD database to patch, doing full rebuild", {"path": graph_store.path})
+    if current is None:
+        nodes = {}
+        for file in collect_challenge_files(meta):
+            node = load_challenge_node(file)
+            if node["@id"] in nodes:
+                logger.warning("Duplicate exercise id", {"id": node["@id"], "file": file})
+                continue
+            nodes[node["@id"]] = node
+    else:
+        # dict behält die bisherige Reihenfolge, neue Knoten werden angehängt
+        nodes = {ex["@id"]: ex for ex in current.index.nodes}
+        for ex_id in removed_ids:
+            nodes.pop(ex_id, None)
+        for file in changed_files:
+            node = load_challenge_node(file)
+            nodes[node["@id"]] = node
     db_jsonld = {}
     add_ld_context(db_jsonld)
-    add_ld_metadata(db_jsonld)
-    nodes = []
+    add_ld_metadata(db_jsonld, now())
+    db_jsonld["@graph"] = list(nodes.values())
+    snapshot = graph_store.publish(db_jsonld)
+    logger.info("JSON-LD database built", {"nodes": len(nodes), "incremental": current is not None})
+    report_analysis(snapshot.analysis)
+
+def report_analysis(analysis):
+    """Logs the problems found by the structural analysis of a new database version."""
+    for cycle in analysis["cycles"]:
+        logger.error("Dependency cycle", {"exercises": cycle})
+    for ref in analysis["dangling"]:
+        logger.warning("Dangling dependency", ref)
+    for ref in analysis["invalidDependencies"]:
+        logger.warning("Unexpected dependency structure", ref)
+
+def load_challenge_node(file):
+    """Reads one challenge snapshot file and returns its JSON-LD node."""
+    with open(file, encoding='utf-8') as f:
+        challenge_metadata = json.load(f)
+    return transform_challenge_metadata_to_ld(challenge_metadata)
+
+def load_metadata():
+    """Returns the updater's metadata (repository -> entry with the snapshot 'path'), {} if there is none."""
+    try:
+        with open(METADATA_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def collect_challenge_files(meta=None):
+    """
+    Returns the current snapshot file ('{repo}__{sha}.json') of each repository in STORAGE_DIR,
+    sorted by repository name. The current file is the one recorded in the metadata; other
+    snapshots of such a repository are superseded and deleted. Repositories without a
+    matching metadata entry keep all files and their newest one (by mtime) is used.
+    """
+    meta = load_metadata() if meta is None else meta
+    files = {}
     for fname in os.listdir(STORAGE_DIR):
-        if fname != 'metadata.json':
-            file = os.path.join(STORAGE_DIR, fname)
-            with open(file) as f:
-                challenge_metadata= json.load(f)
-            node = transform_challenge_metadata_to_ld(challenge_metadata) 
-            nodes.append(node)
-    db_jsonld["@graph"] = nodes
-    with open(LD_DATABASE, 'w', encoding='utf-8') as f:
-        json.dump(db_jsonld, f, ensure_ascii=False, indent=2)
+        if fname == 'metadata.json' or not fname.endswith('.json') or '__' not in fname:
+            continue
+        files.setdefault(fname.rsplit('__', 1)[0], []).append(fname)
+    current = []
+    for repo in sorted(files):
+        names = files[repo]
+        recorded = os.path.basename(meta.get(repo, {}).get('path') or '')
+        if recorded in names:
+            for fname in names:
+                if fname != recorded:
+                    remove_stale_snapshot(os.path.join(STORAGE_DIR, fname))
+            current.append(os.path.join(STORAGE_DIR, recorded))
+        else:
+            # ohne Metadaten nichts löschen: die Änderungszeit ist kein sicherer Hinweis
+            paths = [os.path.join(STORAGE_DIR, fname) for fname in names]
+            current.append(max(paths, key=lambda path: (os.stat(path).st_mtime_ns, path)))
+    return current
+
+def remove_stale_snapshot(file):
+    """Deletes a superseded challenge snapshot file."""
+    try:
+        os.remove(file)
+        logger.info("Removed stale snapshot", {"file": file})
+    except FileNotFoundError:
+        pass
 
 def add_ld_context(db_jsonld):
     """Gets context data from local context file."""
-    with open(LD_CONTEXT_TEMPLATE) as context_file:
+    db_jsonld["@context"] = load_ld_context(LD_CONTEXT_TEMPLATE)
+
+@lru_cache(maxsize=None)
+def load_ld_context(path):
+    """Reads the context template once per process (read-only, shared)."""
+    with open(path) as context_file:
         context = json.load(context_file)
-    db_jsonld["@context"] = context["@context"]
+    return context["@context"]
 
-def add_ld_metadata(db_jsonld):
-    """Creates metadata (url, created at & by)."""
+def add_ld_metadata(db_jsonld, generated_at=None, snapshot=None):
+    """
+    Creates metadata (url, created at & by).
+    Without generated_at the generation time of the given snapshot (or the current
+    database) is used, so responses of one graph version are byte-identical.
+    """
     db_jsonld["@id"] = "https://stemgraph-api.boekelmann.net/"
     db_jsonld["generatedBy"] = {}
     db_jsonld["generatedBy"]["@type"] = "schema:Organization"
     db_jsonld["generatedBy"]["schema:name"] = "STEMgraph"
     db_jsonld["generatedBy"]["schema:url"] = "https://github.com/STEMgraph/"
-    db_jsonld["generatedAt"] = now()
+    db_jsonld["generatedAt"] = generated_at or graph_generated_at(snapshot)
 
 def transform_challenge_metadata_to_ld(md_json):
     """Transforms challenge metadata into a json-ld node."""
@@ -203,6 +383,20 @@ def now():
     """Gets the current timestamp."""
     return datetime.utcnow().isoformat() + "Z"
 
+def graph_generated_at(snapshot=None):
+    """Gets the generation timestamp of the snapshot or current database (now if there is none yet)."""
+    try:
+        return (snapshot or graph_store.get()).data.get("generatedAt") or now()
+    except (FileNotFoundError, ValueError):
+        return now()
+
+def error_badRequest(message):
+    """Returns an error message for invalid request parameters."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"error": message}
+    )
+
 def error_notFound(field, value):
     """Returns a customized error message for searches with no result."""
     return JSONResponse(
@@ -0,0 +1,320 @@
+# Prozessweiter In-Memory-Store für die JSON-LD Datenbank
+
+import gc, hashlib, json, os, re, threading, logging
+from contextlib import contextmanager
+from anyio import to_thread
+from config import LD_DATABASE, LD_BINARY_SNAPSHOT, GRAPH_KEEP_VERSIONS, GRAPH_WATCH_INTERVAL_S, GRAPH_CLOSURE_MAX_NODES
+from services.binary_snapshot import write_snapshot, load_snapshot
+from services.graph_index import GraphIndex
+from services.path_planner import PathPlanner
+from services.reachability import Reachability
+from services.search_index import SearchIndex
+from services.facets import build_facets
+from services.analysis import analyze_graph
+from services.metrics import GRAPH_LOADS, GRAPH_PUBLISHES
+
+logger = logging.getLogger("storage")
+
+
+class GraphSnapshot:
+    """
+    One published version of the JSON-LD database.
+    Snapshots are never modified after creation, readers must treat
+    `data` as read-only. The id index is built before the snapshot is
+    published, the search index, path planner and transitive closure on first use.
+    Facets and the structural analysis come from their sidecars if they belong
+    to this version, otherwise they are computed.
+    """
+
+    def __init__(self, data: dict, version: str, stamp: tuple, facets: dict = None, analysis: dict = None):
+        self.data = data
+        self.version = version
+        self.stamp = stamp
+        self.index = GraphIndex(data)
+        self._search = None
+        self._planner = None
+        self._reachability = None
+        self._position = None
+        self._lazy_lock = threading.Lock()
+        if facets is None or facets.get("version") != version:
+            facets = build_facets(self.index, version)
+        self.facets = facets
+        if analysis is None or analysis.get("version") != version:
+            analysis = analyze_graph(self.index, version)
+        self.analysis = analysis
+
+    @property
+    def search(self) -> SearchIndex:
+        if self._search is None:
+            with self._lazy_lock:
+                if self._search is None:
+                    self._search = SearchIndex(self.index.nodes)
+        return self._search
+
+    @property
+    def planner(self) -> PathPlanner:
+        if self._planner is None:
+            with self._lazy_lock:
+                if self._planner is None:
+                    self._planner = PathPlanner(self.index)
+        return self._planner
+
+    @property
+    def position(self) -> dict:
+        """Exercise id -> number in topological order (from the analysis; exercises on cycles are missing)."""
+        if self._position is None:
+            with self._lazy_lock:
+                if self._position is None:
+                    self._position = {ex_id: i for i, ex_id in enumerate(self.analysis["order"])}
+        return self._position
+
+    @property
+    def reachability(self) -> Reachability:
+        if self._reachability is None:
+            position = self.position
+            with self._lazy_lock:
+                if self._reachability is None:
+                    self._reachability = Reachability(self.index, GRAPH_CLOSURE_MAX_NODES,
+                                                      self.analysis["order"], position)
+        return self._reachability
+
+
+class GraphStore:
+    """
+    Holds the parsed JSON-LD database in memory and swaps it atomically.
+
+    Every published version lives in its own immutable files
+    ('<db>.<version>.json' plus sidecars for facets and the binary snapshot);
+    `path` is a symlink pointing to the current version. Publishing flips the
+    symlink with a single rename, so all workers see either the old or the new
+    version with matching sidecars. A reload only happens when the file behind
+    `path` was replaced or modified (inode / mtime / size), otherwise the
+    cached snapshot is returned.
+    """
+
+    def __init__(self, path: str = LD_DATABASE):
+        self.path = path
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def version_path(self, version: str):
+        """Path of the database file of one published version."""
+        return os.path.splitext(self.path)[0] + f'.{version}.json'
+
+    def sidecar_path(self, name: str, ext: str = '.json', db_file: str = None):
+        """Path of a sidecar file (e.g. 'facets') of a database file (default: the current one)."""
+        return os.path.splitext(db_file or os.path.realpath(self.path))[0] + f'.{name}{ext}'
+
+    def _resolve(self):
+        """Returns the current database file and its stamp."""
+        db_file = os.path.realpath(self.path)
+        return db_file, file_stamp(db_file)
+
+    def _read_sidecar(self, name: str, db_file: str):
+        try:
+            with open(self.sidecar_path(name, db_file=db_file), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _read_binary(self, db_file, stamp):
+        """Returns (data, version) from the binary sidecar if it belongs to the file, else None."""
+        if not LD_BINARY_SNAPSHOT:
+            return None
+        try:
+            return load_snapshot(self.sidecar_path('snapshot', '.bin', db_file), stamp)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.warning("Binary snapshot unreadable, loading JSON", {"path": db_file, "error": str(e)})
+            return None
+
+    def _load(self, db_file, stamp):
+        with gc_paused():
+            loaded = self._read_binary(db_file, stamp)
+            source = 'binary'
+            if loaded is None:
+                with open(db_file, 'rb') as f:
+                    raw = f.read()
+                loaded = json.loads(raw), content_version(raw)
+                source = 'json'
+            data, version = loaded
+            snapshot = GraphSnapshot(data, version, stamp, self._read_sidecar('facets', db_file),
+                                     self._read_sidecar('analysis', db_file))
+        GRAPH_LOADS.inc()
+        logger.info("JSON-LD database loaded", {"path": db_file, "version": snapshot.version, "source": source})
+        return snapshot
+
+    def get(self) -> GraphSnapshot:
+        """Returns the current snapshot, reloading it if the file has changed."""
+        snapshot = self._snapshot
+        try:
+            db_file, stamp = self._resolve()
+        except FileNotFoundError:
+            if snapshot is not None:
+                return snapshot
+            raise
+        if snapshot is not None and snapshot.stamp == stamp:
+            return snapshot
+        with self._lock:
+            # ein anderer Thread kann inzwischen neu geladen haben
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.stamp != stamp:
+                snapshot = self._load(db_file, stamp)
+                self._snapshot = snapshot
+        return snapshot
+
+    async def aget(self) -> GraphSnapshot:
+        """
+        Like get() for the event loop: an unchanged snapshot is returned directly
+        from memory, loading a new version runs in a worker thread.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            try:
+                if snapshot.stamp == self._resolve()[1]:
+                    return snapshot
+            except FileNotFoundError:
+                return snapshot
+        return await to_thread.run_sync(self.get)
+
+    def publish(self, data: dict) -> GraphSnapshot:
+        """
+        Writes a freshly built database version with its sidecars, points `path`
+        to it and installs it without re-reading it from disk.
+        """
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        snapshot = GraphSnapshot(data, content_version(raw), None)
+        db_file = self.version_path(snapshot.version)
+        with self._lock:
+            # erst alle Dateien der Version, dann der Zeiger: Leser sehen nie eine halbe Version
+            for name, content in (('facets', snapshot.facets), ('analysis', snapshot.analysis)):
+                write_atomic(self.sidecar_path(name, db_file=db_file),
+                             json.dumps(content, ensure_ascii=False).encode('utf-8'))
+            write_atomic(db_file, raw)
+            snapshot.stamp = file_stamp(db_file)
+            if LD_BINARY_SNAPSHOT:
+                try:
+                    write_snapshot(self.sidecar_path('snapshot', '.bin', db_file), data, snapshot.version, snapshot.stamp)
+                except (OSError, ValueError) as e:
+                    logger.warning("Binary snapshot not written", {"path": db_file, "error": str(e)})
+            point_to(self.path, db_file)
+            self._snapshot = snapshot
+        self.remove_old_versions()
+        GRAPH_PUBLISHES.inc()
+        logger.info("JSON-LD database published", {"path": db_file, "version": snapshot.version})
+        return snapshot
+
+    def remove_old_versions(self, keep: int = GRAPH_KEEP_VERSIONS):
+        """
+        Deletes the files of superseded versions. The newest `keep` versions (including
+        the current one) stay, so workers still loading the previous version are not cut off.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        base = os.path.basename(os.path.splitext(self.path)[0])
+        pattern = re.compile(re.escape(base) + r'\.([0-9a-f]{16})\.json$')
+        current = os.path.realpath(self.path)
+        versions = []
+        for fname in os.listdir(directory):
+            match = pattern.match(fname)
+            file = os.path.join(directory, fname)
+            if match and file != current:
+                try:
+                    versions.append((os.stat(file).st_mtime_ns, match.group(1)))
+                except FileNotFoundError:
+                    continue
+        versions.sort(reverse=True)
+        for _, version in versions[max(keep - 1, 0):]:
+            prefix = f'{base}.{version}.'
+            for fname in os.listdir(directory):
+                if fname.startswith(prefix):
+                    try:
+                        os.remove(os.path.join(directory, fname))
+                    except FileNotFoundError:
+                        pass
+
+    def clear(self):
+        """Drops the cached snapshot (next access reloads from disk)."""
+        with self._lock:
+            self._snapshot = None
+
+
+class ReloadWatcher:
+    """
+    Checks the database pointer periodically in a background thread and loads a
+    newly published version, so requests of this worker never pay for the reload.
+    """
+
+    def __init__(self, store: GraphStore, interval_s: float = GRAPH_WATCH_INTERVAL_S):
+        self.store = store
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.store.get()
+            except (FileNotFoundError, ValueError):
+                # noch keine Datenbank, oder Fehler wird beim nächsten Request geloggt
+                pass
+
+    def start(self):
+        if self.interval_s <= 0:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="graph-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def content_version(raw: bytes) -> str:
+    """Derives a stable version identifier from the serialized database."""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pauses the cyclic garbage collector while a graph is decoded: the many new
+    containers would otherwise trigger repeated full collections.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def file_stamp(path: str):
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def point_to(link: str, target: str):
+    """Atomically (re)points the symlink `link` to `target` (same directory)."""
+    tmp = link + '.link'
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(os.path.basename(target), tmp)
+    os.replace(tmp, link)
+
+
+def write_atomic(path: str, raw: bytes):
+    """Writes a file via temp file and rename, readers see either the old or the new content."""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(raw)
+    os.replace(tmp, path)
+
+
+graph_store = GraphStore()
+reload_watcher = ReloadWatcher(graph_store)
@@ -0,0 +1,159 @@
+# Prozessinterne Metriken im Prometheus-Textformat
+
+import threading
+from bisect import bisect_left
+
+# Latenz-Buckets in Sekunden
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ""
+    escaped = ((k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: one metric family with a fixed set of label names."""
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self.labelnames, key, (), value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for name, labelnames, key, extra, value in self.samples():
+            pairs = list(zip(labelnames, key)) + list(extra)
+            lines.append(f"{name}{format_labels(pairs)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        super().__init__(name, help, labelnames)
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Zähler pro Bucket (nicht kumuliert), Summe, Anzahl
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            states = [(key, list(s[0]), s[1], s[2]) for key, s in self._values.items()]
+        samples = []
+        for key, counts, total, count in states:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                samples.append((f"{self.name}_bucket", self.labelnames, key, (("le", format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", self.labelnames, key, (), total))
+            samples.append((f"{self.name}_count", self.labelnames, key, (), count))
+        return samples
+
+
+class Registry:
+    """
+    Holds all metrics of the process. Values owned by other components
+    (e.g. cache statistics) are read by collector callbacks at scrape time,
+    so they cost nothing on the request path.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """collect: function without arguments that updates gauges/counters before rendering."""
+        self.collectors.append(collect)
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.histogram(
+    "stemgraph_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "format", "status"))
+GRAPH_LOADS = registry.counter(
+    "stemgraph_graph_loads_total", "JSON-LD database loads (parses) from disk")
+GRAPH_PUBLISHES = registry.counter(
+    "stemgraph_graph_publishes_total", "JSON-LD database versions published by a rebuild")
+EXPORT_BYTES = registry.counter(
+    "stemgraph_export_serialized_bytes_total", "Bytes produced by graph serialization", ("format",))
+EXPORT_CACHE = registry.counter(
+    "stemgraph_export_cache_requests_total", "Export cache lookups", ("result",))
+EXPORT_CACHE_SIZE = registry.gauge(
+    "stemgraph_export_cache_bytes", "Bytes held by the export cache")
+UPDATER_API_CALLS = registry.counter(
+    "stemgraph_updater_api_calls_total", "GitHub API requests sent by the updater", ("status",))
+RATE_LIMIT_REMAINING = registry.gauge(
+    "stemgraph_github_rate_limit_remaining", "Last seen X-RateLimit-Remaining of the GitHub API")
@@ -0,0 +1,32 @@
+# Cursor-Paginierung über Übungslisten (stabil sortiert nach @id)
+
+import base64, binascii
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(ex_id: str) -> str:
+    """Opaque cursor pointing after the exercise with the given id."""
+    return base64.urlsafe_b64encode(ex_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(f"Invalid cursor '{cursor}'")
+
+
+def paginate(search, criteria: list, limit: int = None, cursor: str = None):
+    """
+    Returns (page, next cursor) of the exercises matching the criteria, ordered by
+    @id (bisecting into the per-version order of the SearchIndex `search`). The
+    order does not depend on the database order, so a cursor stays valid across
+    graph versions (exercises added before the cursor position are not returned).
+    next cursor is None on the last page. Raises InvalidCursor.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    page, more = search.page(criteria, after, limit)
+    return page, encode_cursor(page[-1]["@id"]) if more else None
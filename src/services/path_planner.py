@@ -0,0 +1,119 @@
+# Lernpfad-Planung über mehrere Ziele mit Auswahl der oneOf-Alternativen
+
+import logging
+from services.graph_index import GraphIndex
+
+logger = logging.getLogger("storage")
+
+INFINITE = float("inf")
+
+
+def requirement_groups(ex: dict):
+    """
+    Returns the `dependsOn` entries of a node as groups of alternatives:
+    a plain id (or {"@id": ...}) is a group with one alternative, a oneOf
+    block a group with several. One alternative per group must be learned.
+    """
+    groups = []
+    for dep in ex.get("dependsOn") or []:
+        if isinstance(dep, str):
+            groups.append((dep,))
+        elif isinstance(dep, dict):
+            if dep.get("@id"):
+                groups.append((dep["@id"],))
+            alternatives = tuple(alt for alt in dep.get("oneOf") or [] if isinstance(alt, str))
+            if alternatives:
+                groups.append(alternatives)
+    return groups
+
+
+class PathPlanner:
+    """
+    Plans learning paths on one graph version. The requirement groups of all
+    nodes are computed once; a plan visits every node reachable from the
+    targets at most twice (cost estimate and selection), i.e. linear in the
+    size of the relevant subgraph.
+    """
+
+    def __init__(self, index: GraphIndex):
+        self.index = index
+        self.groups = {ex_id: requirement_groups(ex) for ex_id, ex in index.by_id.items()}
+
+    def remaining_costs(self, roots, completed):
+        """
+        Estimates for every node reachable from roots the number of exercises still
+        to learn for it (itself plus the cheapest alternative of each group).
+        Shared prerequisites are counted once per path, unknown ids cost infinity.
+        """
+        cost = {}
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if node in cost and not expanded:
+                    continue
+                if node in completed:
+                    cost[node] = 0
+                    continue
+                if node not in self.groups:
+                    cost[node] = INFINITE
+                    continue
+                if not expanded:
+                    # vorläufig unendlich: schützt vor Zyklen
+                    cost[node] = INFINITE
+                    stack.append((node, True))
+                    stack.extend((alt, False) for group in self.groups[node] for alt in group if alt not in cost)
+                    continue
+                total = 1
+                for group in self.groups[node]:
+                    total += min(cost.get(alt, INFINITE) for alt in group)
+                cost[node] = total
+        return cost
+
+    def choose(self, group, cost, completed, planned):
+        """Picks one alternative of a group: an already completed or planned one, else the cheapest."""
+        for alt in group:
+            if alt in completed or alt in planned:
+                return alt
+        known = [alt for alt in group if alt in self.groups]
+        if not known:
+            return None
+        return min(known, key=lambda alt: cost.get(alt, INFINITE))
+
+    def plan(self, targets, completed=()):
+        """
+        Returns (ordered ids, unresolved ids): the exercises still to learn for all
+        targets, every exercise after its prerequisites, and the referenced ids that
+        do not exist in the graph. Completed exercises and their prerequisites are
+        not planned again.
+        """
+        completed = set(completed)
+        cost = self.remaining_costs(targets, completed)
+        order, planned, on_path, unresolved = [], set(), set(), []
+
+        for target in targets:
+            if target in completed or target in planned:
+                continue
+            stack = [(target, iter(self.groups.get(target, ())))]
+            on_path.add(target)
+            while stack:
+                node, groups = stack[-1]
+                group = next(groups, None)
+                if group is None:
+                    stack.pop()
+                    on_path.discard(node)
+                    planned.add(node)
+                    order.append(node)
+                    continue
+                dep = self.choose(group, cost, completed, planned)
+                if dep is None:
+                    unresolved.extend(alt for alt in group if alt not in unresolved)
+                    continue
+                if dep in completed or dep in planned:
+                    continue
+                if dep in on_path:
+                    logger.warning("Dependency cycle while planning", {"exercise": node, "dependency": dep})
+                    continue
+                on_path.add(dep)
+                stack.append((dep, iter(self.groups[dep])))
+        return order, unresolved
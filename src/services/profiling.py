@@ -0,0 +1,187 @@
+# Phasen-Timing pro Request (Server-Timing) und Sampling-Profiler auf Abruf
+
+import random, sys, threading, time, uuid
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config import SERVER_TIMING, PROFILE_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS, PROFILE_HISTORY
+
+_current_timer = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """
+    Collects exclusive phase durations of one request: time spent in a nested
+    phase is not counted again for the enclosing one.
+    """
+
+    def __init__(self):
+        self.phases = defaultdict(float)
+        self.thread_ids = {threading.get_ident()}
+        self._stack = []
+        self._lock = threading.Lock()
+
+    def enter(self, name: str):
+        now = time.perf_counter()
+        with self._lock:
+            self.thread_ids.add(threading.get_ident())
+            if self._stack:
+                parent, started = self._stack[-1]
+                self.phases[parent] += now - started
+            self._stack.append((name, now))
+
+    def leave(self):
+        now = time.perf_counter()
+        with self._lock:
+            name, started = self._stack.pop()
+            self.phases[name] += now - started
+            if self._stack:
+                parent, _ = self._stack[-1]
+                self._stack[-1] = (parent, now)
+
+    def server_timing(self, total_s: float):
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        parts.append(f"total;dur={total_s * 1000:.2f}")
+        return ", ".join(parts)
+
+
+@contextmanager
+def phase(name: str):
+    """Measures a phase (e.g. 'load', 'filter', 'export', 'serialize') of the current request."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    timer.enter(name)
+    try:
+        yield
+    finally:
+        timer.leave()
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: samples the stacks of the threads serving one request
+    (event loop and thread pool workers) in a background thread. Unlike cProfile it
+    also sees work done in other threads and adds no overhead to the profiled code.
+    """
+
+    def __init__(self, timer: RequestTimer, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.timer = timer
+        self.interval = interval_ms / 1000
+        self.samples = 0
+        self.self_counts = defaultdict(int)
+        self.total_counts = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self.timer._lock:
+                thread_ids = set(self.timer.thread_ids)
+            for tid, frame in sys._current_frames().items():
+                if tid == own or tid not in thread_ids:
+                    continue
+                self.samples += 1
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    func = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if leaf:
+                        self.self_counts[func] += 1
+                        leaf = False
+                    if func not in seen:
+                        self.total_counts[func] += 1
+                        seen.add(func)
+                    frame = frame.f_back
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self, limit: int = 40):
+        """Returns the hottest functions (by cumulative samples) with estimated times."""
+        ms = self.interval * 1000
+        rows = []
+        for func, total in sorted(self.total_counts.items(), key=lambda kv: kv[1], reverse=True)[:limit]:
+            filename, line, name = func
+            rows.append({
+                "function": f"{filename}:{line}({name})",
+                "self_samples": self.self_counts.get(func, 0),
+                "total_samples": total,
+                "self_ms": round(self.self_counts.get(func, 0) * ms, 2),
+                "total_ms": round(total * ms, 2),
+            })
+        return {"samples": self.samples, "interval_ms": ms, "functions": rows}
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles for later inspection."""
+
+    def __init__(self, size: int = PROFILE_HISTORY):
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self):
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != "profile"} for p in reversed(self._profiles)]
+
+    def get(self, profile_id: str):
+        with self._lock:
+            for p in self._profiles:
+                if p["id"] == profile_id:
+                    return p
+        return None
+
+
+profile_store = ProfileStore()
+
+
+def profiling_requested(request):
+    """True if the request carries the admin profiling header or is picked by sampling."""
+    if PROFILE_TOKEN and request.headers.get("x-profile") == PROFILE_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+async def timing_middleware(request, call_next):
+    timer = RequestTimer()
+    token = _current_timer.set(timer)
+    profiler = SamplingProfiler(timer) if profiling_requested(request) else None
+    if profiler:
+        profiler.start()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        total = time.perf_counter() - start
+        if profiler:
+            profiler.stop()
+        _current_timer.reset(token)
+
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = timer.server_timing(total)
+    if profiler:
+        profile_id = uuid.uuid4().hex[:12]
+        profile_store.add({
+            "id": profile_id,
+            "method": request.method,
+            "path": request.url.path,
+            "query": request.url.query,
+            "status": response.status_code,
+            "timestamp": time.time(),
+            "duration_ms": round(total * 1000, 2),
+            "phases_ms": {name: round(s * 1000, 2) for name, s in timer.phases.items()},
+            "profile": profiler.report(),
+        })
+        response.headers["X-Profile-Id"] = profile_id
+    return response
@@ -0,0 +1,104 @@
+# Transitive Hülle der Abhängigkeiten als Bitsets (Python-Ganzzahlen)
+#
+# Die Übungen werden topologisch nummeriert (Voraussetzungen zuerst). Bit i im
+# Bitset einer Übung ist gesetzt, wenn die Übung mit Nummer i (transitiv) von ihr
+# abhängt. Da Nachfahren immer eine höhere Nummer haben, liefert ein aufsteigender
+# Durchlauf der Bits die Nachfahren bereits in topologischer Reihenfolge.
+
+from collections import deque
+from services.graph_index import GraphIndex
+
+
+class Reachability:
+    """
+    Topological numbering and (up to max_nodes exercises) the transitive closure
+    of one graph version. Exercises on or above a dependency cycle get no bitset
+    (and those on a cycle no number); queries for them fall back to a
+    breadth-first search.
+    """
+
+    def __init__(self, index: GraphIndex, max_nodes: int, order: list = None, position: dict = None):
+        self.index = index
+        # order: topologische Reihenfolge aus der Build-Analyse (sonst hier berechnet)
+        self.order = order if order is not None else topological_order(index)
+        if position is None:
+            position = {ex_id: i for i, ex_id in enumerate(self.order)}
+        self.position = position
+        self.closure = None
+        if 0 < len(index.by_id) <= max_nodes:
+            self.closure = self._build_closure()
+
+    def _build_closure(self):
+        closure = {}
+        # rückwärts: alle Nachfolger einer Übung sind bereits berechnet
+        for ex_id in reversed(self.order):
+            bits = 0
+            for dep_id in self.index.dependents.get(ex_id, ()):
+                pos = self.position.get(dep_id)
+                if pos is None or closure[dep_id] is None:
+                    # Nachfahre auf einem Zyklus: keine vollständige Hülle
+                    bits = None
+                    break
+                bits |= closure[dep_id] | (1 << pos)
+            closure[ex_id] = bits
+        return closure
+
+    def reaches(self, uuid: str, other: str) -> bool:
+        """True if `other` (transitively) depends on `uuid`."""
+        bits = self.closure.get(uuid) if self.closure is not None else None
+        pos = self.position.get(other)
+        if bits is not None and pos is not None:
+            return bool(bits >> pos & 1)
+        return other in self._search(uuid, None)
+
+    def descendants(self, uuid: str, depth: int = None):
+        """
+        Returns the ids of all exercises (transitively) depending on uuid, at most
+        `depth` dependency steps away, in topological order.
+        """
+        bits = self.closure.get(uuid) if self.closure is not None and depth is None else None
+        if bits is not None:
+            # gesetzte Bits über die Binärdarstellung finden (läuft in C)
+            digits = bin(bits)[:1:-1]
+            return [self.order[i] for i, digit in enumerate(digits) if digit == "1"]
+        found = self._search(uuid, depth)
+        unnumbered = len(self.order)
+        return sorted(found, key=lambda ex_id: self.position.get(ex_id, unnumbered))
+
+    def _search(self, uuid: str, depth):
+        """Breadth-first search along the reverse edges, limited to `depth` levels."""
+        seen = {uuid}
+        found = []
+        level = [uuid]
+        steps = 0
+        while level and (depth is None or steps < depth):
+            steps += 1
+            next_level = []
+            for ex_id in level:
+                for dep_id in self.index.dependents.get(ex_id, ()):
+                    if dep_id not in seen:
+                        seen.add(dep_id)
+                        found.append(dep_id)
+                        next_level.append(dep_id)
+            level = next_level
+        return found
+
+
+def topological_order(index: GraphIndex):
+    """
+    Returns the exercise ids with every exercise after its prerequisites (Kahn).
+    References to unknown ids are ignored, exercises on cycles are left out.
+    """
+    pending = {ex_id: sum(1 for dep in deps if dep in index.by_id)
+               for ex_id, deps in index.depends_on.items()}
+    queue = deque(ex_id for ex_id, count in pending.items() if count == 0)
+    order = []
+    while queue:
+        ex_id = queue.popleft()
+        order.append(ex_id)
+        for dep_id in index.dependents.get(ex_id, ()):
+            if dep_id in pending:
+                pending[dep_id] -= 1
+                if pending[dep_id] == 0:
+                    queue.append(dep_id)
+    return order
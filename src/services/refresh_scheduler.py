@@ -0,0 +1,188 @@
+# Geplanter Datenbank-Refresh mit Status, Deduplizierung und Verlauf
+#
+# Status und Verlauf liegen in einer Datei unter DATABASE_DIR, damit alle Worker
+# (WEB_CONCURRENCY > 1) denselben Stand sehen. Geschrieben wird sie nur vom Lauf,
+# der die Refresh-Sperre hält.
+
+import os, json, asyncio, logging, time
+from datetime import datetime, timezone
+from config import REFRESH_INTERVAL_S, REFRESH_HISTORY, REFRESH_PROGRESS_INTERVAL_S, REFRESH_STATUS_FILE, \
+    UPDATER_WORKERS
+from services.updater import RefreshRun, refresh_challenge_db_task, refresh_locked
+
+logger = logging.getLogger("updater")
+
+
+def read_status(path: str):
+    """Returns the shared refresh status {current, history} (empty if there is none yet)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"current": None, "history": []}
+
+
+def write_status(path: str, status: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+class RefreshScheduler:
+    """
+    Starts database refreshes on the event loop, periodically and on demand.
+    A trigger while a run is in progress (in this or, according to the status
+    file and the refresh lock, another worker) joins that run instead of starting
+    a second crawl. Overlapping starts are still excluded by the refresh lock.
+    """
+
+    def __init__(self, interval_s: float = REFRESH_INTERVAL_S, history: int = REFRESH_HISTORY,
+                 workers: int = UPDATER_WORKERS, status_file: str = None):
+        self.interval_s = interval_s
+        self.workers = workers
+        self.current = None
+        self.history = history
+        self.next_run_at = None
+        self._status_file = status_file
+        self._runs = 0
+        self._run_task = None
+        self._loop_task = None
+        self._progress_task = None
+
+    @property
+    def status_file(self):
+        return self._status_file or REFRESH_STATUS_FILE
+
+    def trigger(self, trigger: str = "manual", client=None):
+        """
+        Starts a refresh unless one is running. Returns (run, started); must be
+        called on the event loop.
+        """
+        if self.current is not None:
+            return self.current, False
+        recorded = read_status(self.status_file)
+        if recorded["current"] is not None and refresh_locked():
+            # Lauf eines anderen Workers (ohne Sperre wäre der Eintrag verwaist)
+            return RefreshRun.from_dict(recorded["current"]), False
+        # Nummern über alle Worker fortlaufend
+        latest = [run["id"] for run in [recorded["current"]] + recorded["history"] if run]
+        self._runs = max([self._runs] + latest) + 1
+        run = self.current = RefreshRun(self._runs, trigger)
+        self._run_task = asyncio.get_running_loop().create_task(self._execute(run, client))
+        return run, True
+
+    async def _execute(self, run: RefreshRun, client):
+        try:
+            ran = await refresh_challenge_db_task(client=client, workers=self.workers, run=run, report=self._report)
+            run.finish("finished" if ran else "skipped")
+        except asyncio.CancelledError:
+            run.finish("failed", "cancelled")
+            raise
+        except Exception as e:
+            logger.error("Database refresh failed", {"run": run.id, "error": str(e)})
+            run.finish("failed", str(e))
+        finally:
+            self.current = None
+            logger.info("Database refresh run completed", run.as_dict())
+
+    def _report(self, run: RefreshRun):
+        """Writes the run into the status file; called while the run holds the refresh lock."""
+        status = read_status(self.status_file)
+        history = status["history"]
+        stale = status["current"]
+        if stale is not None and stale["id"] != run.id:
+            # Lauf eines beendeten Workers: die Sperre ist frei, er läuft nicht mehr
+            history.insert(0, dict(stale, state="failed", error="interrupted"))
+        if run.state == "running":
+            current = run.as_dict()
+            if self._progress_task is None:
+                self._progress_task = asyncio.get_running_loop().create_task(self._progress(run))
+        else:
+            current = None
+            history.insert(0, run.as_dict())
+            if self._progress_task is not None:
+                self._progress_task.cancel()
+                self._progress_task = None
+        write_status(self.status_file, {"current": current, "history": history[:self.history]})
+
+    async def _progress(self, run: RefreshRun):
+        """Writes the counters of the running run every REFRESH_PROGRESS_INTERVAL_S."""
+        while True:
+            await asyncio.sleep(REFRESH_PROGRESS_INTERVAL_S)
+            status = read_status(self.status_file)
+            status["current"] = run.as_dict()
+            write_status(self.status_file, status)
+
+    async def wait(self):
+        """Waits for the current run (if any) to complete."""
+        task = self._run_task
+        if task is not None and not task.done():
+            await asyncio.shield(task)
+
+    def last_finished(self):
+        """Returns the end time (epoch seconds) of the newest recorded run of any worker, or None."""
+        history = read_status(self.status_file)["history"]
+        finished_at = history[0].get("finished_at") if history else None
+        if not finished_at:
+            return None
+        try:
+            return datetime.fromisoformat(finished_at.rstrip("Z")).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            return None
+
+    async def _schedule(self):
+        delay = self.interval_s
+        while True:
+            self.next_run_at = time.time() + delay
+            await asyncio.sleep(delay)
+            self.next_run_at = None
+            finished = self.last_finished()
+            if finished is not None and time.time() - finished < self.interval_s:
+                # ein anderer Worker hat innerhalb des Intervalls aktualisiert
+                delay = finished + self.interval_s - time.time()
+                continue
+            self.trigger("schedule")
+            await self.wait()
+            delay = self.interval_s
+
+    def start(self):
+        """Starts the periodic refresh (no-op if the interval is 0); call on the event loop."""
+        if self.interval_s <= 0:
+            return
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._schedule())
+
+    async def stop(self):
+        """Stops the periodic refresh and cancels a running one."""
+        for task in (self._loop_task, self._run_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = self._run_task = None
+        self.next_run_at = None
+
+    def status(self):
+        """Returns the shared refresh status plus the schedule of this worker."""
+        recorded = read_status(self.status_file)
+        history = recorded["history"]
+        next_run = None
+        if self.next_run_at is not None:
+            next_run = datetime.fromtimestamp(self.next_run_at, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+        last_error = next((run["error"] for run in history if run["error"]), None)
+        return {
+            "state": "running" if recorded["current"] is not None else "idle",
+            "interval_s": self.interval_s,
+            "next_run_at": next_run,
+            "current": recorded["current"],
+            "last": history[0] if history else None,
+            "last_error": last_error,
+            "history": history,
+        }
+
+
+refresh_scheduler = RefreshScheduler()
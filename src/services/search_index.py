@@ -0,0 +1,140 @@
+# Invertierte Indizes für die Filter auf author / keywords / teaches
+
+from bisect import bisect_left, bisect_right
+
+NGRAM_SIZE = 3
+
+# indizierte Felder: Name -> (Feld, Subfeld)
+INDEXED_FIELDS = {
+    "author": ("author", "name"),
+    "keywords": ("keywords", None),
+    "teaches": ("teaches", None),
+}
+
+
+def field_values(ex: dict, field: str, subfield: str = None):
+    """Returns the raw values of a (possibly list-valued) field of one exercise."""
+    field_values = ex.get(field)
+    if field_values is None:
+        return []
+    if isinstance(field_values, str) or isinstance(field_values, dict):
+        field_values = [field_values]
+    values = []
+    for value in field_values:
+        if isinstance(value, dict) and subfield:
+            value = value.get(subfield)
+        if value is not None:
+            values.append(value)
+    return values
+
+
+def ngrams(value: str):
+    """Returns the set of character n-grams of a string."""
+    return {value[i:i + NGRAM_SIZE] for i in range(len(value) - NGRAM_SIZE + 1)}
+
+
+class TagIndex:
+    """
+    Inverted index for one field, all values lowercased.
+    - exact: value -> positions of the exercises in '@graph' (ascending)
+    - grams: n-gram -> distinct values containing it (for substring search)
+    """
+
+    def __init__(self, nodes: list, field: str, subfield: str = None):
+        self.exact = {}
+        for pos, ex in enumerate(nodes):
+            for value in field_values(ex, field, subfield):
+                if not isinstance(value, str):
+                    continue
+                positions = self.exact.setdefault(value.lower(), [])
+                if not positions or positions[-1] != pos:
+                    positions.append(pos)
+        self.grams = {}
+        for value in self.exact:
+            for gram in ngrams(value):
+                self.grams.setdefault(gram, set()).add(value)
+
+    def matching_values(self, search: str, match: str = "exact"):
+        """Returns the indexed values matching the (lowercased) search term."""
+        if match == "exact":
+            return [search] if search in self.exact else []
+        if len(search) < NGRAM_SIZE:
+            candidates = self.exact.keys()
+        else:
+            grams = sorted(ngrams(search), key=lambda g: len(self.grams.get(g, ())))
+            candidates = set(self.grams.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidates:
+                    break
+                candidates &= self.grams.get(gram, set())
+        return [value for value in candidates if search in value]
+
+    def lookup(self, search: str, match: str = "exact"):
+        """Returns the set of exercise positions whose field matches the search term."""
+        search = search.lower()
+        positions = set()
+        for value in self.matching_values(search, match):
+            positions.update(self.exact[value])
+        return positions
+
+
+class SearchIndex:
+    """
+    All tag indexes of one graph version, plus the exercise positions ordered
+    by @id (id_order / sorted_ids, rank: position -> index in id_order) for
+    cursor pagination.
+    """
+
+    def __init__(self, nodes: list):
+        self.nodes = nodes
+        self.fields = {
+            name: TagIndex(nodes, field, subfield)
+            for name, (field, subfield) in INDEXED_FIELDS.items()
+        }
+        self.id_order = sorted(range(len(nodes)), key=lambda pos: nodes[pos]["@id"])
+        self.sorted_ids = [nodes[pos]["@id"] for pos in self.id_order]
+        self.rank = [0] * len(nodes)
+        for i, pos in enumerate(self.id_order):
+            self.rank[pos] = i
+
+    def positions(self, criteria: list):
+        """Returns the set of positions matching all criteria, None without criteria."""
+        result = None
+        for name, search, match in criteria:
+            positions = self.fields[name].lookup(search, match)
+            result = positions if result is None else result & positions
+            if not result:
+                return set()
+        return result
+
+    def filter(self, criteria: list):
+        """
+        Returns the exercises matching all criteria, in database order.
+        criteria: list of (indexed field name, search term, match)
+        """
+        result = self.positions(criteria)
+        if result is None:
+            return list(self.nodes)
+        return [self.nodes[pos] for pos in sorted(result)]
+
+    def page(self, criteria: list, after: str = None, limit: int = None):
+        """
+        Returns (exercises, more): the exercises matching all criteria ordered by
+        @id, starting after the id `after` (which need not exist in this version),
+        at most `limit` of them; more is True if further exercises follow.
+        """
+        start = bisect_right(self.sorted_ids, after) if after is not None else 0
+        result = self.positions(criteria)
+        if result is None:
+            # ohne Filter: direkt in die sortierte Reihenfolge springen
+            end = len(self.id_order) if limit is None else min(start + limit, len(self.id_order))
+            selected = self.id_order[start:end]
+            more = end < len(self.id_order)
+        else:
+            # nur die Treffer nach ihrem vorberechneten Rang sortieren
+            ranks = sorted(self.rank[pos] for pos in result)
+            first = bisect_left(ranks, start)
+            end = len(ranks) if limit is None else min(first + limit, len(ranks))
+            selected = [self.id_order[rank] for rank in ranks[first:end]]
+            more = end < len(ranks)
+        return [self.nodes[pos] for pos in selected], more
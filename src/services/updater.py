@@ -1,35 +1,42 @@
-import os, re, json, time, base64, requests, logging
-from config import GITHUB_PAT, ORG, STORAGE_DIR, METADATA_FILE
-from services.graph_ld import createdb_jsonld
+import os, re, json, time, base64, fcntl, asyncio, logging
+from contextlib import contextmanager
+from anyio import to_thread
+from config import GITHUB_PAT, ORG, STORAGE_DIR, METADATA_FILE, UPDATER_WORKERS, UPDATER_INCREMENTAL, REFRESH_LOCK_FILE
+from services.graph_ld import createdb_jsonld, remove_stale_snapshot, now
+from services.github_client import GitHubClient
 
 logger=logging.getLogger("updater")
 
+UUID_PATTERN = re.compile(
+    r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+)
+
 # auxiliary functions to build / update the database cache
 
 def get_pat():
     return GITHUB_PAT
 
-def list_org_repos(token):
-    url = f'https://api.github.com/orgs/{ORG}/repos?per_page=100'
-    headers = {'Authorization': f'token {token}', 'Accept': 'application/vnd.github.v3+json'}
+async def list_org_repos(client):
+    url = f'/orgs/{ORG}/repos?per_page=100'
     repos = []
     while url:
-        r = requests.get(url, headers=headers)
+        r = await client.get(url)
         r.raise_for_status()
         repos.extend(r.json())
         url = r.links.get('next', {}).get('url')
     return repos
 
-def latest_commit_sha(token, owner, repo, branch):
-    url = f'https://api.github.com/repos/{owner}/{repo}/commits/{branch}'
-    headers = {'Authorization': f'token {token}', 'Accept': 'application/vnd.github.v3+json'}
-    r = requests.get(url, headers=headers); r.raise_for_status()
-    return r.json()['sha']
+async def latest_commit_sha(client, owner, repo, branch, etag=None):
+    """Returns (sha, etag) of the branch head; sha is None if the stored etag is still valid (304)."""
+    headers = {'If-None-Match': etag} if etag else None
+    r = await client.get(f'/repos/{owner}/{repo}/commits/{branch}', headers=headers)
+    if r.status_code == 304:
+        return None, etag
+    r.raise_for_status()
+    return r.json()['sha'], r.headers.get('ETag')
 
-def fetch_readme_text(token, owner, repo):
-    url = f'https://api.github.com/repos/{owner}/{repo}/readme'
-    headers = {'Authorization': f'token {token}', 'Accept': 'application/vnd.github.v3+json'}
-    r = requests.get(url, headers=headers)
+async def fetch_readme_text(client, owner, repo):
+    r = await client.get(f'/repos/{owner}/{repo}/readme')
     if r.status_code == 404:
         return None
     r.raise_for_status()
@@ -58,49 +65,224 @@ def save_metadata(m):
     with open(METADATA_FILE, 'w', encoding='utf-8') as f:
         json.dump(m, f, ensure_ascii=False, indent=2)
 
-def refresh_challenge_db_task():
+def save_challenge(filename, json_obj, previous=None):
+    """Writes a challenge snapshot file atomically and removes the superseded one."""
+    tmp = filename + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(json_obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, filename)
+    if previous and previous != filename:
+        remove_stale_snapshot(previous)
+
+async def process_repo(client, r, known, incremental=UPDATER_INCREMENTAL):
+    """
+    Checks one UUID repository and stores its challenge metadata if it changed.
+    Returns (metadata entry, has the challenge changed); the entry is None if nothing needs saving.
+    In incremental mode an unchanged `pushed_at` skips the repo without any API call, otherwise
+    the commit lookup is sent with the stored ETag (a 304 does not count against the rate limit).
+    """
+    name = r['name']
+    owner, branch = r['owner']['login'], r['default_branch']
+    pushed_at = r.get('pushed_at')
+    if incremental and known.get('sha') and pushed_at and known.get('pushed_at') == pushed_at:
+        return None, False
+    sha, etag = await latest_commit_sha(client, owner, name, branch, known.get('etag') if incremental else None)
+    logger.debug("Checking repo", {"repo": name, "sha": sha or known.get('sha')})
+    if sha is None or known.get('sha') == sha:
+        # nur Push auf anderen Branch o.ä.: Zustand merken, nichts herunterladen
+        return dict(known, pushed_at=pushed_at, etag=etag), False
+    readme_text = await fetch_readme_text(client, owner, name)
+    if not readme_text:
+        logger.info("Skipped: no README", {"repo": name})
+        return None, False
+    json_obj = extract_json_from_readme(readme_text)
+    if not json_obj:
+        logger.info("Skipped: invalid JSON block", {"repo": name})
+        return None, False
+    filename = os.path.join(STORAGE_DIR, f'{name}__{sha}.json')
+    await to_thread.run_sync(save_challenge, filename, json_obj, known.get('path'))
+    logger.info("Saved JSON metadata", {"repo": name})
+    return {
+        'sha': sha,
+        'downloaded_at': int(time.time()),
+        'path': filename,
+        'id': json_obj.get('id'),
+        'pushed_at': pushed_at,
+        'etag': etag
+    }, True
+
+class RefreshRun:
+    """Progress and result of one database refresh."""
+
+    def __init__(self, run_id: int = 0, trigger: str = "manual"):
+        self.id = run_id
+        self.trigger = trigger
+        self.state = "running"  # running | finished | skipped | failed
+        self.started_at = now()
+        self.finished_at = None
+        self.duration_s = None
+        self.repos_total = 0
+        self.repos_scanned = 0
+        self.repos_changed = 0
+        self.repos_failed = 0
+        self.api_calls = 0
+        self.error = None
+        self._start = time.monotonic()
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Rebuilds a run from its as_dict() form (e.g. a run of another worker)."""
+        run = cls(data["id"], data.get("trigger", "manual"))
+        for key, value in data.items():
+            if hasattr(run, key):
+                setattr(run, key, value)
+        run._start = time.monotonic() - (data.get("duration_s") or 0)
+        return run
+
+    def finish(self, state: str, error: str = None):
+        """Records the result; no-op once the run has finished."""
+        if self.state != "running":
+            return
+        self.state = state
+        self.error = error
+        self.finished_at = now()
+        self.duration_s = round(time.monotonic() - self._start, 3)
+
+    def as_dict(self):
+        duration = self.duration_s if self.duration_s is not None else round(time.monotonic() - self._start, 3)
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "state": self.state,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_s": duration,
+            "repos_total": self.repos_total,
+            "repos_scanned": self.repos_scanned,
+            "repos_changed": self.repos_changed,
+            "repos_failed": self.repos_failed,
+            "api_calls": self.api_calls,
+            "error": self.error,
+        }
+
+@contextmanager
+def refresh_lock(path=None):
+    """
+    Cross-process lock (flock) around a refresh, shared by all workers using the same
+    database directory. Yields True if acquired, False if another refresh is running.
+    """
+    path = path or REFRESH_LOCK_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def refresh_locked(path=None):
+    """True if a refresh (in this or another worker) holds the refresh lock."""
+    with refresh_lock(path) as acquired:
+        return not acquired
+
+async def refresh_challenge_db_task(client=None, workers=UPDATER_WORKERS, run=None, report=None):
+    """
+    Runs a refresh unless one is already running (in this or another worker).
+    Returns False if it was skipped. report(run) is called while the refresh lock
+    is held: once after acquiring it and once the run has finished.
+    """
+    run = run or RefreshRun()
+    with refresh_lock() as acquired:
+        if not acquired:
+            logger.info("Database refresh already running, skipped")
+            return False
+        if report:
+            report(run)
+        try:
+            await refresh_challenge_db(client, workers, run)
+            run.finish("finished")
+        except asyncio.CancelledError:
+            run.finish("failed", "cancelled")
+            raise
+        except Exception as e:
+            run.finish("failed", str(e))
+            raise
+        finally:
+            if report:
+                report(run)
+        return True
+
+async def refresh_challenge_db(client=None, workers=UPDATER_WORKERS, run=None):
+    """
+    Crawls the organisation on the event loop with at most `workers` repositories
+    in flight. Only file writes and the database build run in worker threads.
+    run: optional RefreshRun that receives the progress counters.
+    """
     logger.info("Starting database refresh task...")
+    run = run or RefreshRun()
 
-    token = get_pat()
-    repos = list_org_repos(token)
-    logger.debug("Fetched repository list", {"count": len(repos)})
-    meta = ensure_metadata()
-    uuid_pattern = re.compile(
-        r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-    )
-    has_db_changed = False
-    for r in repos:
-        name = r['name']
-        owner, branch = r['owner']['login'], r['default_branch']
-        sha = latest_commit_sha(token, owner, name, branch)
-        logger.debug("Checking repo", {"repo": name, "sha": sha})
-        if not uuid_pattern.match(name.lower()):
-            logger.info("Skipped: not UUID", {"repo": name})
-            continue
-        if meta.get(name, {}).get('sha') != sha:
-            readme_text = fetch_readme_text(token, owner, name)
-            if readme_text:
-                json_obj = extract_json_from_readme(readme_text)
-                if json_obj:
-                    filename = os.path.join(STORAGE_DIR, f'{name}__{sha}.json')
-                    tmp = filename + '.tmp'
-                    with open(tmp, 'w', encoding='utf-8') as f:
-                        json.dump(json_obj, f, ensure_ascii=False, indent=2)
-                    os.replace(tmp, filename)
-                    meta[name] = {
-                        'sha': sha,
-                        'downloaded_at': int(time.time()),
-                        'path': filename
-                    }
-                    has_db_changed = True
-            if not readme_text:
-                logger.info("Skipped: no README", {"repo": name})
-            elif not json_obj:
-                logger.info("Skipped: invalid JSON block", {"repo": name})
+    own_client = client is None
+    if own_client:
+        client = GitHubClient(get_pat(), pool_size=workers)
+    try:
+        repos = await list_org_repos(client)
+        logger.debug("Fetched repository list", {"count": len(repos)})
+        meta = await to_thread.run_sync(ensure_metadata)
+        has_meta_changed = False
+        changed_files, removed_ids = [], set()
+        challenge_repos = []
+        for r in repos:
+            if UUID_PATTERN.match(r['name'].lower()):
+                challenge_repos.append(r)
             else:
-                logger.info("Saved JSON metadata", {"repo": name})
-    if has_db_changed:
-        save_metadata(meta)
+                logger.info("Skipped: not UUID", {"repo": r['name']})
+        run.repos_total = len(challenge_repos)
+        run.api_calls = client.calls
+
+        # Repositories nebenläufig prüfen, Metadaten danach in Listen-Reihenfolge zusammenführen
+        semaphore = asyncio.Semaphore(max(workers, 1))
+
+        async def check(r):
+            async with semaphore:
+                try:
+                    return await process_repo(client, r, meta.get(r['name'], {}))
+                finally:
+                    run.repos_scanned += 1
+                    run.api_calls = client.calls
+
+        results = await asyncio.gather(*(check(r) for r in challenge_repos), return_exceptions=True)
+        for r, result in zip(challenge_repos, results):
+            name = r['name']
+            if isinstance(result, Exception):
+                logger.error("Failed to refresh repo", {"repo": name, "error": str(result)})
+                run.repos_failed += 1
+                continue
+            entry, changed = result
+            if entry and entry != meta.get(name):
+                previous_id = meta.get(name, {}).get('id')
+                if changed:
+                    run.repos_changed += 1
+                    changed_files.append(entry['path'])
+                    if previous_id and previous_id != entry['id']:
+                        removed_ids.add(previous_id)
+                meta[name] = entry
+                has_meta_changed = True
+        logger.info("Repositories checked", {"count": len(challenge_repos), "api_calls": client.calls,
+                                             "not_modified": client.not_modified,
+                                             "rate_limit_remaining": client.rate_limit_remaining})
+        run.api_calls = client.calls
+    finally:
+        if own_client:
+            await client.close()
+    if changed_files:
         logger.info("All metadata from STEMgraph challenges fetched.")
-        createdb_jsonld()
+        await to_thread.run_sync(createdb_jsonld, changed_files, removed_ids, meta)
         logger.info("Database created as JSON-LD.")
+    # erst nach erfolgreichem Build: schlägt er fehl, gelten die Repos beim nächsten Lauf
+    # weiter als geändert und ihre Dateien werden erneut übernommen
+    if has_meta_changed:
+        await to_thread.run_sync(save_metadata, meta)
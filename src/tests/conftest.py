@@ -0,0 +1,157 @@
+import os
+import sys
+import tempfile
+
+# Pflicht-Umgebungsvariablen aus config.py für Tests vorbelegen
+os.environ.setdefault("GITHUB_ORG", "STEMgraph-test")
+os.environ.setdefault("GITHUB_PAT", "test-token")
+os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "stemgraph-test-logs"))
+
+# System-Pfad anpassen für Importe
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from unittest.mock import patch
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ---------------------------------------------------------
+# Beispiel-Challenges (Format der README-Metadaten)
+#   a <- b <- d,  a <- c,  d hängt von oneOf(b, c) ab
+# ---------------------------------------------------------
+SAMPLE_CHALLENGES = [
+    {"id": "a", "teaches": "Variables", "author": "Ada Lovelace",
+     "keywords": ["Python", "Basics"], "first_used": "2024-01-01"},
+    {"id": "b", "teaches": "Loops", "author": ["Ada Lovelace", "Alan Turing"],
+     "keywords": ["Python", "Control Flow"], "depends_on": ["a"]},
+    {"id": "c", "teaches": "Functions", "author": "Grace Hopper",
+     "keywords": ["python"], "depends_on": ["a"]},
+    {"id": "d", "teaches": "Recursion", "author": "Alan Turing",
+     "keywords": ["Algorithms"], "depends_on": [{"oneOf": ["b", "c"]}]},
+]
+
+
+def write_challenges(storage_dir, challenges, sha="0" * 7):
+    """Schreibt Challenge-Metadaten so, wie der Updater sie ablegt."""
+    os.makedirs(storage_dir, exist_ok=True)
+    for challenge in challenges:
+        path = os.path.join(storage_dir, f"{challenge['id']}__{sha}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(challenge, f)
+
+
+# ---------------------------------------------------------
+# FIXTURE: Temporäre JSON-LD Datenbank
+# ---------------------------------------------------------
+@pytest.fixture(scope="function")
+def ld_db(tmp_path):
+    """Baut eine JSON-LD Datenbank aus SAMPLE_CHALLENGES in einem Temp-Verzeichnis."""
+    from services import graph_ld
+    from services.graph_store import graph_store
+
+    storage_dir = str(tmp_path / "repos")
+    db_path = str(tmp_path / "ld-database.json")
+    write_challenges(storage_dir, SAMPLE_CHALLENGES)
+
+    with patch.object(graph_store, "path", db_path), \
+         patch("services.graph_ld.STORAGE_DIR", storage_dir), \
+         patch("services.graph_ld.METADATA_FILE", os.path.join(storage_dir, "metadata.json")), \
+         patch("services.graph_ld.LD_CONTEXT_TEMPLATE", os.path.join(SRC_DIR, "ld-context.json")):
+        graph_store.clear()
+        graph_ld.createdb_jsonld()
+        yield db_path
+        graph_store.clear()
+
+
+# ---------------------------------------------------------
+# Lokaler Stub für die GitHub REST API
+# ---------------------------------------------------------
+class StubGitHub:
+    """Minimaler GitHub-Ersatz: Repositories mit README-Metadaten und Commit-SHAs."""
+
+    def __init__(self):
+        self.repos = {}
+        self.requests = []
+        self.throttle = {}  # Pfad -> Anzahl 429-Antworten vor Erfolg
+        self.lock = threading.Lock()
+
+    def add_repo(self, name, sha, metadata=None, pushed_at="2024-01-01T00:00:00Z"):
+        self.repos[name] = {"sha": sha, "metadata": metadata, "pushed_at": pushed_at}
+
+    def route(self, path, request_headers=None):
+        request_headers = request_headers or {}
+        with self.lock:
+            self.requests.append(path)
+            if self.throttle.get(path):
+                self.throttle[path] -= 1
+                return 429, {"Retry-After": "0"}, {"message": "slow down"}
+        headers = {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": "0"}
+        if path.startswith("/orgs/"):
+            listing = [{"name": n, "owner": {"login": "STEMgraph"}, "default_branch": "main",
+                        "pushed_at": repo["pushed_at"]} for n, repo in self.repos.items()]
+            return 200, headers, listing
+        parts = path.split("/")
+        repo = self.repos.get(parts[3]) if len(parts) > 3 else None
+        if repo is None:
+            return 404, headers, {"message": "Not Found"}
+        if parts[4] == "commits":
+            etag = f'"{repo["sha"]}"'
+            if request_headers.get("If-None-Match") == etag:
+                return 304, headers, None
+            return 200, dict(headers, ETag=etag), {"sha": repo["sha"]}
+        if parts[4] == "readme" and repo["metadata"] is not None:
+            readme = f"# Challenge\n<!---\n{json.dumps(repo['metadata'])}\n--->\n"
+            return 200, headers, {"content": base64.b64encode(readme.encode()).decode()}
+        return 404, headers, {"message": "Not Found"}
+
+
+@pytest.fixture
+def github():
+    stub = StubGitHub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, headers, body = stub.route(self.path, dict(self.headers))
+            raw = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Leitet Storage, Metadaten und Datenbank in ein Temp-Verzeichnis um."""
+    from services.graph_store import graph_store
+
+    storage_dir = str(tmp_path / "repos")
+    with patch("services.updater.STORAGE_DIR", storage_dir), \
+         patch("services.updater.METADATA_FILE", os.path.join(storage_dir, "metadata.json")), \
+         patch("services.updater.REFRESH_LOCK_FILE", str(tmp_path / "refresh.lock")), \
+         patch("services.refresh_scheduler.REFRESH_STATUS_FILE", str(tmp_path / "refresh-status.json")), \
+         patch("services.graph_ld.STORAGE_DIR", storage_dir), \
+         patch("services.graph_ld.METADATA_FILE", os.path.join(storage_dir, "metadata.json")), \
+         patch("services.graph_ld.LD_CONTEXT_TEMPLATE", os.path.join(SRC_DIR, "ld-context.json")), \
+         patch.object(graph_store, "path", str(tmp_path / "ld-database.json")):
+        graph_store.clear()
+        yield storage_dir
+        graph_store.clear()
@@ -0,0 +1,91 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.analysis import analyze_graph
+from services.graph_index import GraphIndex
+from services.graph_store import GraphStore
+
+
+def node(ex_id, *depends_on):
+    ex = {"@id": ex_id, "@type": "Exercise"}
+    if depends_on:
+        ex["dependsOn"] = list(depends_on)
+    return ex
+
+
+# ---------------------------------------------------------
+# Graph: Kette a <- b <- c, Zyklus x <-> y mit z darüber,
+#   einzelne Übung s, hängende und ungültige Referenzen in c
+# ---------------------------------------------------------
+GRAPH = {"@graph": [
+    node("a"),
+    node("b", "a"),
+    node("c", "b", {"oneOf": ["a", "gone"]}, 42),
+    node("x", "y"),
+    node("y", "x"),
+    node("z", "y"),
+    node("s"),
+]}
+
+
+# ---------------------------------------------------------
+# TEST 1: Zyklen, hängende Referenzen, Tiefe und Komponenten
+# ---------------------------------------------------------
+def test_analysis_findings():
+    """Alle Befunde der Analyse in einem Durchlauf"""
+    analysis = analyze_graph(GraphIndex(GRAPH), "v1")
+    assert analysis["cycles"] == [["x", "y"]]
+    assert analysis["dangling"] == [{"exercise": "c", "dependency": "gone"}]
+    assert analysis["invalidDependencies"] == [{"exercise": "c", "dependency": 42}]
+    assert analysis["depth"]["a"] == 0 and analysis["depth"]["c"] == 2 and analysis["depth"]["z"] == 1
+    assert analysis["longestChain"] == ["a", "b", "c"]
+    # Reihenfolge ohne Zyklus-Mitglieder, Voraussetzungen zuerst
+    order = analysis["order"]
+    assert "x" not in order and order.index("a") < order.index("b") < order.index("c")
+    assert analysis["statistics"] == {
+        "maxDepth": 2,
+        "longestChainLength": 3,
+        "componentCount": 3,
+        "largestComponentSize": 3,
+        "cycleCount": 1,
+        "danglingReferenceCount": 1,
+        "invalidDependencyCount": 1,
+    }
+
+
+# ---------------------------------------------------------
+# TEST 2: Analyse wird als Sidecar geschrieben und wiederverwendet
+# ---------------------------------------------------------
+def test_analysis_sidecar(tmp_path, monkeypatch):
+    """Beim Laden wird die Analyse aus dem Sidecar übernommen statt neu berechnet"""
+    store = GraphStore(str(tmp_path / "ld-database.json"))
+    published = store.publish(GRAPH)
+    sidecar = store.sidecar_path("analysis")
+    assert os.path.exists(sidecar)
+    with open(sidecar, encoding="utf-8") as f:
+        assert json.load(f)["version"] == published.version
+
+    def fail(*args):
+        raise AssertionError("analysis recomputed")
+    monkeypatch.setattr("services.graph_store.analyze_graph", fail)
+    store.clear()
+    assert store.get().analysis["cycles"] == [["x", "y"]]
+
+
+# ---------------------------------------------------------
+# TEST 3: Kennzahlen in /graph/statistics und Befunde in /graph/analysis
+# ---------------------------------------------------------
+def test_statistics_and_analysis_endpoints(ld_db):
+    """Statistik enthält die Analyse-Kennzahlen, /graph/analysis die Befunde"""
+    client = TestClient(app)
+    stats = client.get("/graph/statistics").json()
+    assert stats["maxDepth"] == 2
+    assert stats["componentCount"] == 1
+    assert stats["cycleCount"] == 0
+    analysis = client.get("/graph/analysis").json()
+    assert analysis["@type"] == "Analysis"
+    assert analysis["longestChain"] in (["a", "b", "d"], ["a", "c", "d"])
+    assert analysis["cycles"] == [] and analysis["dangling"] == []
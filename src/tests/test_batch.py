@@ -0,0 +1,55 @@
+import json
+
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------
+# TEST 1: Viele Übungen in einem Request
+# ---------------------------------------------------------
+def test_batch_lookup(ld_db):
+    """Reihenfolge der Anfrage, Duplikate einmal, fehlende ids gemeldet statt Fehler"""
+    r = client.post("/exercises/batch", json={"ids": ["d", "a", "missing", "a"]})
+    assert r.status_code == 200
+    data = r.json()
+    assert [n["@id"] for n in data["@graph"]] == ["d", "a"]
+    assert data["missing"] == ["missing"]
+    assert r.headers["x-missing-count"] == "1"
+
+    r = client.post("/exercises/batch?format=ndjson", json={"ids": ["b", "c"]})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert len(r.text.splitlines()) == 2
+    assert r.headers["x-missing-count"] == "0"
+
+
+# ---------------------------------------------------------
+# TEST 2: Fehlende ids in allen Formaten
+# ---------------------------------------------------------
+def test_batch_reports_missing_in_every_format(ld_db):
+    """Node-Link behält den missing-Schlüssel, NDJSON meldet die ids in einer letzten Zeile"""
+    r = client.post("/exercises/batch?format=nodelink", json={"ids": ["a", "zzz", "yyy"]})
+    assert [n["id"] for n in r.json()["nodes"]] == ["a"]
+    assert r.json()["missing"] == ["zzz", "yyy"]
+
+    # auch ids, die nicht latin-1-kodierbar sind
+    r = client.post("/exercises/batch?format=ndjson", json={"ids": ["a", "x€y"]})
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line.get("@id") for line in lines[:-1]] == ["a"]
+    assert lines[-1] == {"missing": ["x€y"]}
+    assert r.headers["x-missing-count"] == "1"
+    assert "x-missing-ids" not in r.headers
+
+
+# ---------------------------------------------------------
+# TEST 3: Obergrenze und ungültige Anfragen
+# ---------------------------------------------------------
+def test_batch_limits(ld_db):
+    """Zu große Batches liefern 400, fehlende ids-Liste 422"""
+    with patch("api.exercises.BATCH_MAX_IDS", 2):
+        assert client.post("/exercises/batch", json={"ids": ["a", "b", "c"]}).status_code == 400
+    assert client.post("/exercises/batch", json={}).status_code == 422
@@ -0,0 +1,38 @@
+from benchmarks.run import compare
+from benchmarks.synthetic import generate_challenges, build_ld_database, exercise_id
+from services.graph_index import GraphIndex
+
+
+# ---------------------------------------------------------
+# TEST 1: Synthetischer Graph hat die geforderte Struktur
+# ---------------------------------------------------------
+def test_synthetic_graph_shape():
+    """Eindeutige IDs, tiefe Kette, oneOf-Alternativen, nur Kanten zu existierenden Knoten"""
+    challenges = generate_challenges(300, seed=1, deep_chain=120)
+    db = build_ld_database(challenges)
+    index = GraphIndex(db)
+
+    assert len(index.by_id) == 300
+    assert any(isinstance(dep, dict) and "oneOf" in dep
+               for ex in db["@graph"] for dep in ex.get("dependsOn", []))
+    assert all(dep_id in index.by_id for targets in index.depends_on.values() for dep_id in targets)
+    # das letzte Element der tiefen Kette erreicht alle Vorgänger
+    assert len(list(index.ancestors(exercise_id(119)))) >= 120
+    assert generate_challenges(300, seed=1, deep_chain=120) == challenges
+
+
+# ---------------------------------------------------------
+# TEST 2: Vergleich mit der Baseline
+# ---------------------------------------------------------
+def test_compare_against_baseline():
+    """Nur Verschlechterungen über Toleranz und Rauschschwelle gelten als Regression"""
+    def result(p50, memory=10.0):
+        stats = {"cold_ms": 5.0, "p50_ms": p50, "p95_ms": p50}
+        return {"sizes": {"1000": {"load_ms": 10.0, "peak_memory_mb": memory, "endpoints": {"graph.jsonld": stats}}}}
+
+    baseline = result(4.0)
+    assert compare(result(4.6), baseline, 0.25) == []      # innerhalb der Toleranz
+    assert compare(result(1.0), baseline, 0.25) == []      # schneller
+    regressions = compare(result(8.0, memory=30.0), baseline, 0.25)
+    assert any("p50_ms" in r for r in regressions)
+    assert any("peak memory" in r for r in regressions)
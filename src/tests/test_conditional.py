@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services import graph_ld
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------
+# TEST 1: ETag, Last-Modified und Cache-Control
+# ---------------------------------------------------------
+def test_read_endpoints_send_validators(ld_db):
+    """Alle lesenden Router liefern ETag, Last-Modified und Cache-Control"""
+    for path in ["/graph/", "/graph/statistics", "/exercises/?author=ada lovelace",
+                 "/exercises/a", "/authors/", "/keywords/count"]:
+        response = client.get(path, headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200, path
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["last-modified"].endswith("GMT")
+        assert response.headers["cache-control"] == "no-cache"
+
+
+# ---------------------------------------------------------
+# TEST 2: If-None-Match führt ohne Graph-Arbeit zu 304
+# ---------------------------------------------------------
+def test_if_none_match_short_circuits(ld_db):
+    """Passendes ETag -> 304 ohne Aufruf des Endpoints"""
+    etag = client.get("/exercises/?keyword=python").headers["etag"]
+    with patch("services.graph_ld.get_ld_exercises_filtered") as filtered:
+        response = client.get("/exercises/?keyword=python", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        filtered.assert_not_called()
+
+    # andere Parameter -> anderes ETag
+    other = client.get("/exercises/?keyword=basics")
+    assert other.headers["etag"] != etag
+
+
+# ---------------------------------------------------------
+# TEST 3: Neue Graph-Version ändert das ETag
+# ---------------------------------------------------------
+def test_new_version_changes_etag(ld_db):
+    """Nach einem Rebuild liefert das alte ETag wieder den vollen Inhalt"""
+    etag = client.get("/keywords/").headers["etag"]
+    graph_ld.createdb_jsonld()
+    response = client.get("/keywords/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+# ---------------------------------------------------------
+# TEST 4: Komprimierte Varianten und If-Modified-Since
+# ---------------------------------------------------------
+def test_encoded_etag_and_if_modified_since(ld_db):
+    """gzip-Repräsentation hat ein eigenes ETag, das ebenfalls revalidiert"""
+    zipped = client.get("/graph/", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["etag"].endswith('-gzip"')
+    response = client.get("/graph/", headers={"If-None-Match": zipped.headers["etag"]})
+    assert response.status_code == 304
+
+    modified = zipped.headers["last-modified"]
+    assert client.get("/authors/", headers={"If-Modified-Since": modified}).status_code == 304
+    assert client.get("/authors/", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+
+
+# ---------------------------------------------------------
+# TEST 5: Antworten einer Version sind byte-identisch
+# ---------------------------------------------------------
+def test_responses_are_stable_per_version(ld_db):
+    """generatedAt stammt aus der Datenbank, nicht aus der Request-Zeit"""
+    first = client.get("/authors/count").json()
+    second = client.get("/authors/count").json()
+    assert first == second
+    assert first["generatedAt"] == graph_ld.get_ld_graph()["generatedAt"]
+
+
+# ---------------------------------------------------------
+# TEST 6: If-None-Match: * passt nur auf vorhandene Ressourcen
+# ---------------------------------------------------------
+def test_if_none_match_star(ld_db):
+    """'*' liefert 304 nur nach einer erfolgreichen Antwort, Fehler bleiben erhalten"""
+    star = {"If-None-Match": "*"}
+    assert client.get("/exercises/a", headers=star).status_code == 304
+    assert client.get("/exercises/nope", headers=star).status_code == 404
+    assert client.get("/exercises/?limit=0", headers=star).status_code == 422
+
+
+# ---------------------------------------------------------
+# TEST 7: If-Modified-Since ersetzt keine Fehlerantworten
+# ---------------------------------------------------------
+def test_if_modified_since_keeps_errors(ld_db):
+    """Auch mit künftigem If-Modified-Since bleiben 404 und 400 erhalten"""
+    future = {"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    assert client.get("/exercises/a", headers=future).status_code == 304
+    assert client.get("/exercises/nope", headers=future).status_code == 404
+    assert client.get("/graph/?format=bogus", headers=future).status_code == 400
+
+
+# ---------------------------------------------------------
+# TEST 8: generatedAt stammt aus demselben Snapshot wie '@graph'
+# ---------------------------------------------------------
+def test_helpers_read_one_snapshot(ld_db):
+    """Jede Antwort liest die Graph-Version genau einmal (kein zweiter Zugriff für generatedAt)"""
+    from services.graph_store import graph_store
+    calls = [
+        lambda: graph_ld.get_ld_subgraph("b", up=1, down=1),
+        lambda: graph_ld.get_ld_path_to_exercise("d"),
+        lambda: graph_ld.get_ld_dependents("a"),
+        lambda: graph_ld.get_ld_descendants("a"),
+        lambda: graph_ld.get_ld_learning_plan(["d"]),
+        graph_ld.get_ld_start_nodes,
+        graph_ld.get_ld_end_nodes,
+        lambda: graph_ld.get_ld_exercises_by_tag("keywords", "python"),
+    ]
+    for call in calls:
+        with patch.object(graph_store, "get", wraps=graph_store.get) as get:
+            assert call()["@graph"]
+            assert get.call_count == 1
@@ -0,0 +1,81 @@
+import json
+import os
+from unittest.mock import patch
+
+from conftest import write_challenges
+from services import graph_ld
+from services.graph_store import graph_store
+
+
+def graph_ids():
+    return [n["@id"] for n in graph_store.get().data["@graph"]]
+
+
+# ---------------------------------------------------------
+# TEST 1: Veraltete Snapshots werden aufgeräumt
+# ---------------------------------------------------------
+def test_full_rebuild_removes_stale_snapshots(ld_db):
+    """Der Snapshot aus metadata.json gilt, andere werden gelöscht – auch wenn sie neuer aussehen"""
+    storage_dir = graph_ld.STORAGE_DIR
+    write_challenges(storage_dir, [{"id": "a", "teaches": "Variables v2"}], sha="1111111")
+    old_file = os.path.join(storage_dir, "a__0000000.json")
+    new_file = os.path.join(storage_dir, "a__1111111.json")
+
+    # ohne Metadaten: neuester Snapshot wird gelesen, aber nichts gelöscht
+    os.utime(old_file, ns=(0, 0))
+    graph_ld.createdb_jsonld()
+    assert os.path.exists(old_file)
+    assert graph_ld.get_ld_exercise_node("a")["teaches"] == "Variables v2"
+
+    # Metadaten entscheiden, nicht die Änderungszeit (z.B. kopiertes Volume)
+    os.utime(new_file, ns=(0, 0))
+    os.utime(old_file, None)
+    graph_ld.createdb_jsonld(meta={"a": {"path": new_file}})
+
+    assert not os.path.exists(old_file)
+    assert graph_ids().count("a") == 1
+    assert graph_ld.get_ld_exercise_node("a")["teaches"] == "Variables v2"
+
+
+# ---------------------------------------------------------
+# TEST 2: Doppelte Exercise-IDs
+# ---------------------------------------------------------
+def test_duplicate_ids_are_skipped(ld_db):
+    """Zwei Repositories mit derselben Exercise-ID ergeben nur einen Knoten"""
+    path = os.path.join(graph_ld.STORAGE_DIR, "copy-of-a__2222222.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"id": "a", "teaches": "Copy"}, f)
+
+    graph_ld.createdb_jsonld()
+
+    assert sorted(graph_ids()) == ["a", "b", "c", "d"]
+
+
+# ---------------------------------------------------------
+# TEST 3: Inkrementeller Build liest nur geänderte Dateien
+# ---------------------------------------------------------
+def test_incremental_build_parses_only_changed_files(ld_db):
+    """Nur die übergebenen Snapshots werden geparst und in den Graph gepatcht"""
+    storage_dir = graph_ld.STORAGE_DIR
+    write_challenges(storage_dir, [{"id": "c", "teaches": "Closures"},
+                                   {"id": "e", "depends_on": ["d"]}], sha="3333333")
+    changed = [os.path.join(storage_dir, "c__3333333.json"), os.path.join(storage_dir, "e__3333333.json")]
+
+    with patch("services.graph_ld.load_challenge_node", wraps=graph_ld.load_challenge_node) as load:
+        graph_ld.createdb_jsonld(changed, removed_ids={"a"})
+
+    assert load.call_count == 2
+    assert graph_ids() == ["b", "c", "d", "e"]
+    assert graph_ld.get_ld_exercise_node("c")["teaches"] == "Closures"
+    assert graph_store.get().index.dependents["d"] == ["e"]
+
+
+# ---------------------------------------------------------
+# TEST 4: Ohne bestehende Datenbank wird voll gebaut
+# ---------------------------------------------------------
+def test_incremental_build_without_database(ld_db):
+    """Fehlt die Datenbank, fällt der inkrementelle Build auf einen vollen Build zurück"""
+    os.remove(ld_db)
+    graph_store.clear()
+    graph_ld.createdb_jsonld([])
+    assert sorted(graph_ids()) == ["a", "b", "c", "d"]
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from main import app
+from services import graph_ld
+from services.export_cache import CachedExport, ExportCache, export_cache, negotiate_encoding
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    export_cache.clear()
+    yield
+    export_cache.clear()
+
+
+# ---------------------------------------------------------
+# TEST 1: Wiederholte Exporte kommen aus dem Cache
+# ---------------------------------------------------------
+def test_graph_export_is_cached(ld_db):
+    """Der zweite Abruf desselben Formats serialisiert nicht erneut"""
+    first = client.get("/graph/?format=nodelink")
+    hits = export_cache.hits
+    second = client.get("/graph/?format=nodelink")
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert export_cache.hits == hits + 1
+    assert len(second.json()["nodes"]) == 4
+
+
+# ---------------------------------------------------------
+# TEST 2: Content-Encoding Aushandlung
+# ---------------------------------------------------------
+def test_gzip_negotiation(ld_db):
+    """gzip wird nur auf Anfrage und ab der Mindestgröße geliefert"""
+    plain = client.get("/graph/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    zipped = client.get("/graph/", headers={"Accept-Encoding": "gzip, deflate"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.content == plain.content  # TestClient dekomprimiert transparent
+    assert zipped.headers["content-type"] == "application/ld+json"
+
+    assert negotiate_encoding("gzip;q=0, identity", 10_000) is None
+    assert negotiate_encoding("*", 10_000) in ("br", "gzip")
+    assert negotiate_encoding("gzip", 10) is None
+
+
+# ---------------------------------------------------------
+# TEST 3: Neue Graph-Version invalidiert
+# ---------------------------------------------------------
+def test_new_version_bypasses_old_entries(ld_db):
+    """Nach einem Rebuild wird unter dem neuen Versionsschlüssel neu serialisiert"""
+    before = client.get("/exercises/?keyword=python").json()
+    misses = export_cache.misses
+    graph_ld.createdb_jsonld()
+    after = client.get("/exercises/?keyword=python").json()
+    assert export_cache.misses == misses + 1
+    assert [n["@id"] for n in after["@graph"]] == [n["@id"] for n in before["@graph"]]
+
+
+# ---------------------------------------------------------
+# TEST 4: LRU-Begrenzung nach Bytes
+# ---------------------------------------------------------
+def test_lru_eviction_by_size():
+    """Älteste Einträge fallen heraus, sobald die Byte-Grenze überschritten ist"""
+    cache = ExportCache(max_bytes=250)
+    cache.put("a", CachedExport(b"x" * 100, "application/json"))
+    cache.put("b", CachedExport(b"x" * 100, "application/json"))
+    cache.get("a")
+    cache.put("c", CachedExport(b"x" * 100, "application/json"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size == 200
+
+    cache.put("huge", CachedExport(b"x" * 1000, "application/json"))
+    assert cache.get("huge") is None
+
+
+# ---------------------------------------------------------
+# TEST 5: Cache-Treffer ohne Threadpool
+# ---------------------------------------------------------
+def test_cache_hit_served_on_event_loop(ld_db):
+    """Nur der Cache-Miss serialisiert im Threadpool, Treffer werden auf dem Event-Loop beantwortet"""
+    first = client.get("/exercises/?keyword=Python", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+
+    def no_threads(*args, **kwargs):
+        raise AssertionError("threadpool used")
+
+    with patch("services.exporter.run_in_threadpool", side_effect=no_threads), \
+         patch("services.graph_store.to_thread.run_sync", side_effect=no_threads), \
+         patch("fastapi.routing.run_in_threadpool", side_effect=no_threads):
+        second = client.get("/exercises/?keyword=Python", headers={"Accept-Encoding": "gzip"})
+    assert second.status_code == 200
+    assert second.content == first.content
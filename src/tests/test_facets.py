@@ -0,0 +1,69 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services import filters, graph_ld
+from services.graph_store import graph_store
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------
+# TEST 1: Aggregate werden beim Build als Sidecar gespeichert
+# ---------------------------------------------------------
+def test_facets_sidecar_written(ld_db):
+    """createdb_jsonld legt die Facetten passend zur Version neben der Datenbank ab"""
+    snapshot = graph_ld.get_ld_snapshot()
+    with open(graph_store.sidecar_path("facets"), encoding="utf-8") as f:
+        facets = json.load(f)
+    assert facets["version"] == snapshot.version
+    assert facets["keywords"]["python"] == 3
+    assert facets["authors"]["Ada Lovelace"] == 2
+    assert facets["statistics"] == {
+        "nodeCount": 4,
+        "edgeCount": 4,
+        "startNodeCount": 1,
+        "endNodeCount": 1,
+        "keywordCountDistinct": 4,
+        "keywordCountTotal": 6,
+        "authorCountDistinct": 3,
+    }
+
+
+# ---------------------------------------------------------
+# TEST 2: Listen und Zählungen aus dem Speicher
+# ---------------------------------------------------------
+def test_lists_and_counts(ld_db):
+    """get_list / get_count liefern dieselben Werte wie der frühere Scan"""
+    assert filters.get_list("keywords") == ["algorithms", "basics", "control flow", "python"]
+    assert filters.get_count("author", subfield="name", lowercase=False) == {
+        "Ada Lovelace": 2, "Alan Turing": 2, "Grace Hopper": 1,
+    }
+    # nicht vorberechnete Felder werden weiterhin gezählt
+    assert filters.get_list("teaches") == ["functions", "loops", "recursion", "variables"]
+
+
+# ---------------------------------------------------------
+# TEST 3: Veraltetes Sidecar wird ignoriert
+# ---------------------------------------------------------
+def test_stale_sidecar_is_recomputed(ld_db):
+    """Passt die Version nicht, werden die Facetten beim Laden neu berechnet"""
+    with open(graph_store.sidecar_path("facets"), "w", encoding="utf-8") as f:
+        json.dump({"version": "stale", "keywords": {}, "authors": {}, "statistics": {}}, f)
+    graph_store.clear()
+    assert graph_ld.get_ld_snapshot().facets["statistics"]["nodeCount"] == 4
+
+
+# ---------------------------------------------------------
+# TEST 4: /graph/statistics Endpoint
+# ---------------------------------------------------------
+def test_statistics_endpoint(ld_db):
+    """Statistik-Endpoint liefert alle Kennzahlen ohne erneutes Parsen"""
+    response = client.get("/graph/statistics")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["@type"] == "Statistics"
+    assert stats["nodeCount"] == 4
+    assert stats["keywordCountTotal"] == 6
+    assert stats["edgeCount"] == 4
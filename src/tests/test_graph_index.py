@@ -0,0 +1,55 @@
+from fastapi.responses import JSONResponse
+
+from services import graph_ld
+from services.graph_index import GraphIndex
+
+
+def ids(nodes):
+    return [n["@id"] for n in nodes]
+
+
+# ---------------------------------------------------------
+# TEST 1: Adjazenzlisten inkl. oneOf-Alternativen
+# ---------------------------------------------------------
+def test_adjacency_lists(ld_db):
+    """Vorwärts- und Rückwärtskanten werden einmal pro Version berechnet"""
+    index = graph_ld.get_ld_snapshot().index
+    assert index.depends_on["d"] == ["b", "c"]
+    assert index.depends_on["a"] == []
+    assert sorted(index.dependents["a"]) == ["b", "c"]
+    assert index.dependents["b"] == ["d"]
+    assert "d" not in index.dependents
+
+
+# ---------------------------------------------------------
+# TEST 2: Pfad, Start- und Endknoten
+# ---------------------------------------------------------
+def test_path_start_and_end_nodes(ld_db):
+    """Pfad enthält Ziel und alle Voraussetzungen genau einmal"""
+    path = graph_ld.get_ld_path_to_exercise("d")
+    assert ids(path["@graph"]) == ["d", "b", "a", "c"]
+    assert ids(graph_ld.get_ld_start_nodes()["@graph"]) == ["a"]
+    assert ids(graph_ld.get_ld_end_nodes()["@graph"]) == ["d"]
+
+
+# ---------------------------------------------------------
+# TEST 3: Unbekannte und hängende Referenzen
+# ---------------------------------------------------------
+def test_unknown_and_dangling_ids(ld_db):
+    """Unbekannte Ziele liefern 404, hängende Abhängigkeiten werden übersprungen"""
+    assert isinstance(graph_ld.get_ld_exercise_node("missing"), JSONResponse)
+    assert isinstance(graph_ld.get_ld_path_to_exercise("missing"), JSONResponse)
+
+    index = GraphIndex({"@graph": [{"@id": "x", "dependsOn": ["ghost"]}]})
+    assert ids(index.ancestors("x")) == ["x"]
+
+
+# ---------------------------------------------------------
+# TEST 4: Tiefe Ketten ohne Rekursionslimit
+# ---------------------------------------------------------
+def test_deep_chain_without_recursion():
+    """Eine Kette mit 20000 Gliedern wird iterativ traversiert"""
+    n = 20000
+    nodes = [{"@id": "n0"}] + [{"@id": f"n{i}", "dependsOn": [f"n{i-1}"]} for i in range(1, n)]
+    index = GraphIndex({"@graph": nodes})
+    assert len(index.ancestors(f"n{n-1}")) == n
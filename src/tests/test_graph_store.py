@@ -0,0 +1,119 @@
+import json
+import os
+
+from services import graph_ld
+from unittest.mock import patch
+
+from services.graph_store import GraphStore, graph_store
+
+
+# ---------------------------------------------------------
+# TEST 1: Graph wird nur einmal geparst
+# ---------------------------------------------------------
+def test_graph_is_cached_between_calls(ld_db):
+    """Solange die Datei unverändert ist, liefert der Store denselben Snapshot"""
+    first = graph_ld.get_ld_snapshot()
+    second = graph_ld.get_ld_snapshot()
+    assert first is second
+    assert graph_ld.get_ld_graph() is first.data
+    assert len(first.data["@graph"]) == 4
+
+
+# ---------------------------------------------------------
+# TEST 2: createdb_jsonld veröffentlicht eine neue Version
+# ---------------------------------------------------------
+def test_createdb_publishes_new_version(ld_db):
+    """Ein Rebuild tauscht den Snapshot ohne erneutes Einlesen aus"""
+    before = graph_ld.get_ld_snapshot()
+    graph_ld.createdb_jsonld()
+    after = graph_ld.get_ld_snapshot()
+    assert after is not before
+    assert after.version != before.version  # generatedAt hat sich geändert
+    assert not os.path.exists(ld_db + ".tmp")
+
+
+# ---------------------------------------------------------
+# TEST 3: Externe Änderung der Datei wird erkannt
+# ---------------------------------------------------------
+def test_reload_on_external_change(ld_db):
+    """Wird die Datei ersetzt, lädt der Store beim nächsten Zugriff neu"""
+    before = graph_ld.get_ld_snapshot()
+    data = dict(before.data)
+    data["@graph"] = before.data["@graph"][:1]
+    tmp = ld_db + ".new"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, ld_db)
+
+    after = graph_ld.get_ld_snapshot()
+    assert after is not before
+    assert len(after.data["@graph"]) == 1
+
+
+# ---------------------------------------------------------
+# TEST 4: Fehlende Datei
+# ---------------------------------------------------------
+def test_missing_database_raises(tmp_path):
+    """Ohne Datenbank und ohne Snapshot wird FileNotFoundError geworfen"""
+    store = GraphStore(str(tmp_path / "missing.json"))
+    try:
+        store.get()
+        assert False, "FileNotFoundError erwartet"
+    except FileNotFoundError:
+        pass
+
+
+# ---------------------------------------------------------
+# TEST 5: Binärer Snapshot wird geschrieben und bevorzugt geladen
+# ---------------------------------------------------------
+def test_binary_snapshot_roundtrip(ld_db):
+    """Neustart lädt den Binär-Snapshot mit gleicher Version, ohne JSON zu parsen"""
+    published = graph_ld.get_ld_snapshot()
+    assert os.path.exists(graph_store.sidecar_path("snapshot", ".bin"))
+
+    graph_store.clear()
+    with patch("services.graph_store.content_version", side_effect=AssertionError("JSON parsed")):
+        loaded = graph_store.get()
+    assert loaded.version == published.version
+    assert loaded.data == published.data
+    # gleiche Strings teilen sich nach dem Laden ein Objekt
+    b = loaded.index.get("b")
+    assert b["dependsOn"][0] is loaded.index.get("a")["@id"]
+
+
+# ---------------------------------------------------------
+# TEST 6: Veralteter Binär-Snapshot wird ignoriert
+# ---------------------------------------------------------
+def test_stale_binary_snapshot_ignored(ld_db):
+    """Passt der Stempel nicht zur JSON-Datei, wird die JSON-Datei geladen"""
+    data = dict(graph_ld.get_ld_graph())
+    data["@graph"] = data["@graph"][:2]
+    with open(ld_db, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    graph_store.clear()
+    assert len(graph_store.get().data["@graph"]) == 2
+
+
+# ---------------------------------------------------------
+# TEST 7: Versionierte Veröffentlichung über einen Symlink
+# ---------------------------------------------------------
+def test_versioned_publication(ld_db):
+    """Jede Version hat eigene Dateien, der Zeiger wird atomar umgesetzt, alte Versionen aufgeräumt"""
+    first = graph_ld.get_ld_snapshot()
+    assert os.path.islink(ld_db)
+    assert os.path.realpath(ld_db) == graph_store.version_path(first.version)
+
+    versions = [first.version]
+    for _ in range(3):
+        graph_ld.createdb_jsonld()
+        versions.append(graph_ld.get_ld_snapshot().version)
+    assert os.path.realpath(ld_db) == graph_store.version_path(versions[-1])
+    remaining = sorted(f for f in os.listdir(os.path.dirname(ld_db)) if f.startswith("ld-database."))
+    # aktuelle und vorherige Version, jeweils Datenbank, Facetten, Analyse und Binär-Snapshot
+    assert len(remaining) == 2 * 4 + 1
+    assert not any(versions[0] in f for f in remaining)
+
+    # ein zweiter Worker (eigener Store) lädt über den Zeiger dieselbe Version
+    other = GraphStore(ld_db)
+    assert other.get().version == versions[-1]
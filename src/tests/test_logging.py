@@ -39,6 +39,9 @@ def temp_log_db():
 # HILFSFUNKTION: Log-Einträge aus DB lesen
 # ---------------------------------------------------------
 def read_logs(db_path):
+    # Handler schreibt asynchron: Warteschlange zuerst leeren
+    for handler in logging.getLogger().handlers:
+        handler.flush()
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     rows = cur.execute("SELECT level, component, message, details FROM logs").fetchall()
@@ -139,3 +142,155 @@ def test_log_rotation(temp_log_db):
     assert final_count < initial_count, "Rotation sollte Logs löschen"
     assert final_count > 0, "Nicht alle Logs sollten gelöscht werden"
     print(f"Rotation: {initial_count} → {final_count} Logs")
+
+
+# ---------------------------------------------------------
+# TEST 5: Handler blockiert nicht und schreibt gebündelt
+# ---------------------------------------------------------
+def test_handler_batches_inserts(temp_log_db):
+    """Einträge werden im Writer-Thread gesammelt und per flush() geschrieben"""
+    from log_handling.sqlite_handler import SQLiteHandler
+
+    handler = SQLiteHandler(batch_size=50, flush_interval_ms=60_000)
+    record_logger = logging.getLogger("batch_test")
+    record_logger.propagate = False
+    record_logger.addHandler(handler)
+    try:
+        for i in range(120):
+            record_logger.info(f"Entry {i}")
+        handler.flush()
+        rows = [row for row in read_logs(temp_log_db) if row[1] == "batch_test"]
+        assert len(rows) == 120
+        assert rows[0][2] == "Entry 0" and rows[-1][2] == "Entry 119"
+    finally:
+        record_logger.removeHandler(handler)
+        record_logger.propagate = True
+        handler.close()
+
+
+# ---------------------------------------------------------
+# TEST 6: Volle Warteschlange verwirft Einträge und meldet das
+# ---------------------------------------------------------
+def test_handler_drops_on_full_queue(temp_log_db):
+    """Bei overflow='drop' wird gezählt statt blockiert"""
+    import threading
+    import time
+    from log_handling.sqlite_handler import SQLiteHandler
+
+    gate = threading.Event()
+
+    class SlowHandler(SQLiteHandler):
+        def _write(self, conn, batch):
+            gate.wait()
+            super()._write(conn, batch)
+
+    handler = SlowHandler(queue_size=1, batch_size=1, overflow="drop")
+
+    def record(i):
+        return logging.LogRecord("drop_test", logging.INFO, __file__, 0, f"Entry {i}", None, None)
+
+    handler.emit(record(0))
+    while handler.queue.qsize():  # Writer hängt jetzt in _write
+        time.sleep(0.01)
+    handler.emit(record(1))  # füllt die Queue
+    handler.emit(record(2))  # wird verworfen
+    assert handler.dropped == 1
+
+    gate.set()
+    handler.close()
+    rows = read_logs(temp_log_db)
+    assert any(row[1] == "logging" and '"dropped": 1' in row[3] for row in rows)
+
+
+# ---------------------------------------------------------
+# TEST 7: close() schreibt ausstehende Einträge
+# ---------------------------------------------------------
+def test_handler_flushes_on_close(temp_log_db):
+    """Beim Schließen gehen keine Einträge verloren"""
+    from log_handling.sqlite_handler import SQLiteHandler
+
+    handler = SQLiteHandler(batch_size=1000, flush_interval_ms=60_000)
+    for i in range(10):
+        handler.emit(logging.LogRecord("close_test", logging.INFO, __file__, 0, f"Entry {i}", None, None))
+    handler.close()
+
+    conn = sqlite3.connect(temp_log_db)
+    count = conn.execute("SELECT COUNT(*) FROM logs WHERE component = 'close_test'").fetchone()[0]
+    mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.close()
+    assert count == 10
+    assert mode == "wal"
+
+
+# ---------------------------------------------------------
+# HILFSFUNKTION: Viele Log-Zeilen direkt einfügen
+# ---------------------------------------------------------
+def bulk_insert(db_path, count, timestamp="2099-01-01T00:00:00Z", payload=200):
+    conn = sqlite3.connect(db_path)
+    details = '{"pad": "' + "x" * payload + '"}'
+    conn.executemany(
+        "INSERT INTO logs (timestamp, level, component, message, details) VALUES (?, ?, ?, ?, ?)",
+        ((timestamp, "INFO", "bulk", f"Entry {i}", details) for i in range(count))
+    )
+    conn.commit()
+    conn.close()
+
+
+# ---------------------------------------------------------
+# TEST 8: Große Datenmenge wird bis unter das Limit gekürzt
+# ---------------------------------------------------------
+def test_size_rotation_meets_target_and_shrinks_file(temp_log_db):
+    """Rotation löscht in Chunks, bis das Größenziel erreicht ist, und verkleinert die Datei"""
+    bulk_insert(temp_log_db, 200_000)
+    size_before = os.path.getsize(temp_log_db)
+    assert size_before > 40 * 1024 * 1024
+
+    with patch('log_handling.log_db.MAX_LOG_SIZE_MB', 5):
+        rotate_logs()
+
+    conn = sqlite3.connect(temp_log_db)
+    remaining = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    newest = conn.execute("SELECT message FROM logs ORDER BY id DESC LIMIT 1").fetchone()[0]
+    conn.close()
+    assert os.path.getsize(temp_log_db) <= 5 * 1024 * 1024
+    assert 1000 < remaining < 200_000
+    assert newest == "Entry 199999"
+
+
+# ---------------------------------------------------------
+# TEST 9: Altersbasierte Rotation nutzt den Timestamp-Index
+# ---------------------------------------------------------
+def test_age_rotation_uses_index(temp_log_db):
+    """Alte Einträge werden über idx_logs_timestamp gefunden und gelöscht"""
+    bulk_insert(temp_log_db, 12_000, timestamp="2000-01-01T00:00:00Z", payload=10)
+    bulk_insert(temp_log_db, 10, payload=10)
+
+    conn = sqlite3.connect(temp_log_db)
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM logs WHERE timestamp < ? LIMIT 10", ("2001",)))
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    conn.close()
+    assert "idx_logs_timestamp" in plan
+    assert auto_vacuum == 2  # INCREMENTAL
+
+    rotate_logs()
+    conn = sqlite3.connect(temp_log_db)
+    rows = conn.execute("SELECT COUNT(*) FROM logs WHERE component = 'bulk'").fetchone()[0]
+    conn.close()
+    assert rows == 10
+
+
+# ---------------------------------------------------------
+# TEST 10: Periodischer Retention-Job
+# ---------------------------------------------------------
+def test_retention_job_runs_periodically(temp_log_db):
+    """Der Hintergrund-Job ruft rotate_logs im Intervall auf und stoppt sauber"""
+    import threading
+    from log_handling.log_db import RetentionJob
+
+    ran = threading.Event()
+    with patch('log_handling.log_db.rotate_logs', side_effect=lambda: ran.set()):
+        job = RetentionJob(interval_s=0.01)
+        job.start()
+        assert ran.wait(2)
+        job.stop()
@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from services.metrics import Histogram, Registry
+
+client = TestClient(app)
+
+
+def sample(text, prefix):
+    """Liest den Wert der ersten Zeile, die mit prefix beginnt."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+# ---------------------------------------------------------
+# TEST 1: Histogramm im Prometheus-Format
+# ---------------------------------------------------------
+def test_histogram_rendering():
+    """Buckets sind kumuliert, Summe und Anzahl werden mitgeliefert"""
+    registry = Registry()
+    hist = registry.register(Histogram("latency_seconds", "test", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        hist.observe(value, route="/x")
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    assert sample(text, 'latency_seconds_bucket{route="/x",le="0.1"}') == 1
+    assert sample(text, 'latency_seconds_bucket{route="/x",le="1.0"}') == 3
+    assert sample(text, 'latency_seconds_bucket{route="/x",le="+Inf"}') == 4
+    assert sample(text, 'latency_seconds_count{route="/x"}') == 4
+    assert abs(sample(text, 'latency_seconds_sum{route="/x"}') - 4.25) < 1e-9
+
+
+# ---------------------------------------------------------
+# TEST 2: /admin/metrics erfasst Routen, Formate und Cache
+# ---------------------------------------------------------
+def test_metrics_endpoint(ld_db):
+    """Requests werden pro Route-Template und Format gezählt"""
+    client.get("/exercises/a?format=yaml")
+    client.get("/graph/?format=nodelink")
+    client.get("/graph/?format=nodelink")
+
+    response = client.get("/admin/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    route = 'stemgraph_http_request_duration_seconds_count{method="GET",route="/exercises/{uuid}",format="yaml",status="200"}'
+    assert sample(text, route) >= 1
+    assert sample(text, 'stemgraph_export_cache_requests_total{result="hit"}') >= 1
+    assert sample(text, 'stemgraph_export_serialized_bytes_total{format="nodelink"}') > 0
+    assert sample(text, "stemgraph_graph_publishes_total") >= 1
+    assert sample(text, "stemgraph_export_cache_bytes") > 0
+
+    # unbekannte Formate landen in einer gemeinsamen Serie
+    client.get("/graph/?format=junk0")
+    client.get("/graph/?format=junk1")
+    text = client.get("/admin/metrics").text
+    assert "junk" not in text
+    assert sample(text, 'stemgraph_http_request_duration_seconds_count{method="GET",route="/graph/",format="other",status="400"}') >= 2
@@ -0,0 +1,70 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from services.graph_index import GraphIndex
+from services.path_planner import PathPlanner
+
+
+def node(ex_id, *depends_on):
+    ex = {"@id": ex_id, "@type": "Exercise"}
+    if depends_on:
+        ex["dependsOn"] = list(depends_on)
+    return ex
+
+
+# ---------------------------------------------------------
+# Graph: e hängt von oneOf(long, short) ab, f von oneOf(long, a)
+#   long <- l1 <- l2,  short <- a,  g hängt von einer fehlenden Übung ab
+# ---------------------------------------------------------
+GRAPH = {"@graph": [
+    node("a"),
+    node("l2"),
+    node("l1", "l2"),
+    node("long", {"@id": "l1"}),
+    node("short", "a"),
+    node("e", {"oneOf": ["long", "short"]}),
+    node("f", {"oneOf": ["long", "a"]}),
+    node("g", "a", "missing"),
+]}
+
+
+def plan(targets, completed=()):
+    return PathPlanner(GraphIndex(GRAPH)).plan(targets, completed)
+
+
+# ---------------------------------------------------------
+# TEST 1: Kürzeste Alternative, topologisch sortiert
+# ---------------------------------------------------------
+def test_shortest_alternative_in_topological_order():
+    """Pro oneOf-Gruppe wird die Alternative mit den wenigsten offenen Übungen gewählt"""
+    assert plan(["e"]) == (["a", "short", "e"], [])
+    # l1 und l2 bereits gelernt: long fehlt nur noch selbst, short braucht zwei Übungen
+    assert plan(["e"], completed=["l2", "l1"]) == (["long", "e"], [])
+
+
+# ---------------------------------------------------------
+# TEST 2: Mehrere Ziele teilen sich Voraussetzungen
+# ---------------------------------------------------------
+def test_multiple_targets_reuse_planned_exercises():
+    """Bereits geplante Übungen werden bei späteren Zielen bevorzugt und nicht wiederholt"""
+    order, unresolved = plan(["e", "f", "g"])
+    assert order == ["a", "short", "e", "f", "g"]
+    assert unresolved == ["missing"]
+    assert plan(["e"], completed=["e"]) == ([], [])
+
+
+# ---------------------------------------------------------
+# TEST 3: POST /paths
+# ---------------------------------------------------------
+def test_paths_endpoint(ld_db):
+    """Plan über die API, inkl. abgeschlossener Übungen, Formaten und unbekannten Zielen"""
+    client = TestClient(app)
+    r = client.post("/paths", json={"targets": ["d"]})
+    assert r.status_code == 200
+    assert [n["@id"] for n in r.json()["@graph"]] == ["a", "b", "d"]
+
+    r = client.post("/paths?format=nodelink", json={"targets": ["d", "c"], "completed": ["a", "c"]})
+    assert [n["id"] for n in r.json()["nodes"]] == ["d"]
+
+    r = client.post("/paths", json={"targets": ["d", "nope"]})
+    assert r.status_code == 404
@@ -0,0 +1,73 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import services.profiling as profiling
+from main import app
+from services.profiling import RequestTimer, _current_timer, phase
+
+client = TestClient(app)
+
+
+def timing_phases(header):
+    """Zerlegt einen Server-Timing Header in {name: dauer_ms}."""
+    phases = {}
+    for part in header.split(","):
+        name, dur = part.strip().split(";dur=")
+        phases[name] = float(dur)
+    return phases
+
+
+# ---------------------------------------------------------
+# TEST 1: Verschachtelte Phasen werden exklusiv gezählt
+# ---------------------------------------------------------
+def test_nested_phases_are_exclusive():
+    """Die Zeit der inneren Phase wird der äußeren nicht angerechnet"""
+    timer = RequestTimer()
+    token = _current_timer.set(timer)
+    try:
+        with phase("filter"):
+            with phase("load"):
+                time.sleep(0.05)
+    finally:
+        _current_timer.reset(token)
+    assert timer.phases["load"] >= 0.05
+    assert timer.phases["filter"] < 0.04
+
+
+# ---------------------------------------------------------
+# TEST 2: Server-Timing Header mit den Phasen eines Exports
+# ---------------------------------------------------------
+def test_server_timing_header(ld_db):
+    """Ein Cache-Miss meldet load, filter, export und serialize"""
+    response = client.get("/exercises/?keyword=Python&format=nodelink")
+    assert response.status_code == 200
+    phases = timing_phases(response.headers["server-timing"])
+    assert {"load", "filter", "export", "serialize", "total"} <= set(phases)
+    assert "x-profile-id" not in response.headers
+
+
+# ---------------------------------------------------------
+# TEST 3: Profil auf Abruf per Admin-Header
+# ---------------------------------------------------------
+def test_profile_on_demand(ld_db, monkeypatch):
+    """Mit passendem X-Profile Header wird ein Profil gespeichert und ist abrufbar"""
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+
+    response = client.get("/graph/?format=yaml", headers={"X-Profile": "wrong"})
+    assert "x-profile-id" not in response.headers
+
+    response = client.get("/graph/?format=yaml", headers={"X-Profile": "secret"})
+    profile_id = response.headers["x-profile-id"]
+
+    listed = client.get("/admin/profiles").json()
+    assert listed[0]["id"] == profile_id
+    assert listed[0]["path"] == "/graph/"
+    assert "profile" not in listed[0]
+
+    profile = client.get(f"/admin/profiles/{profile_id}").json()
+    assert profile["status"] == 200
+    assert "load" in profile["phases_ms"]
+    assert set(profile["profile"]) == {"samples", "interval_ms", "functions"}
+
+    assert client.get("/admin/profiles/unknown").status_code == 404
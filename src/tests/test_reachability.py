@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from benchmarks.synthetic import generate_challenges, build_ld_database
+from main import app
+from services.graph_index import GraphIndex
+from services.reachability import Reachability
+
+
+# ---------------------------------------------------------
+# TEST 1: Transitive Hülle entspricht der Breitensuche
+# ---------------------------------------------------------
+def test_closure_matches_search():
+    """Bitsets und Breitensuche liefern dieselben Nachfahren in topologischer Reihenfolge"""
+    index = GraphIndex(build_ld_database(generate_challenges(300, seed=1, deep_chain=50)))
+    with_closure = Reachability(index, max_nodes=1000)
+    without = Reachability(index, max_nodes=0)
+    assert with_closure.closure is not None and without.closure is None
+
+    for ex_id in list(index.by_id)[::7]:
+        expected = without.descendants(ex_id)
+        assert with_closure.descendants(ex_id) == expected
+        position = with_closure.position
+        assert all(position[a] < position[b] for a, b in zip(expected, expected[1:]))
+        for other in expected[:5]:
+            assert with_closure.reaches(ex_id, other) and not with_closure.reaches(other, ex_id)
+
+
+# ---------------------------------------------------------
+# TEST 2: Zyklen und Tiefenbegrenzung
+# ---------------------------------------------------------
+def test_cycles_and_depth():
+    """Übungen auf Zyklen werden per Suche beantwortet, depth begrenzt die Schritte"""
+    index = GraphIndex({"@graph": [
+        {"@id": "a"},
+        {"@id": "x", "dependsOn": ["a", "y"]},
+        {"@id": "y", "dependsOn": ["x"]},
+        {"@id": "z", "dependsOn": ["y"]},
+    ]})
+    reach = Reachability(index, max_nodes=100)
+    assert reach.order == ["a"]
+    assert sorted(reach.descendants("a")) == ["x", "y", "z"]
+    assert reach.descendants("a", depth=1) == ["x"]
+    assert sorted(reach.descendants("x")) == ["y", "z"]
+    assert reach.reaches("y", "x")
+
+
+# ---------------------------------------------------------
+# TEST 3: Endpunkte dependents und descendants
+# ---------------------------------------------------------
+def test_dependents_and_descendants_endpoints(ld_db):
+    """Direkte und transitive Nachfolger über die API"""
+    client = TestClient(app)
+    ids = lambda r: [n["@id"] for n in r.json()["@graph"]]
+    assert sorted(ids(client.get("/exercises/a/dependents"))) == ["b", "c"]
+    assert ids(client.get("/exercises/d/dependents")) == []
+    assert ids(client.get("/exercises/a/descendants"))[-1] == "d"
+    assert sorted(ids(client.get("/exercises/a/descendants?depth=1"))) == ["b", "c"]
+    assert client.get("/exercises/nope/descendants").status_code == 404
+    assert client.get("/exercises/a/descendants?depth=0").status_code == 422
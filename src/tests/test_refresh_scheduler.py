@@ -0,0 +1,180 @@
+import asyncio
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from config import ORG
+from main import app
+from services.github_client import GitHubClient
+from services.refresh_scheduler import RefreshScheduler, refresh_scheduler
+
+UUIDS = [f"00000000-0000-0000-0000-{i:012d}" for i in range(5)]
+
+
+def run_scheduler(github, triggers=2, history=10):
+    """Löst `triggers` Refreshes gleichzeitig aus und wartet auf den Lauf."""
+    async def run():
+        scheduler = RefreshScheduler(interval_s=0, history=history, workers=4)
+        client = GitHubClient("token", base_url=github.url, pool_size=4, max_retries=0)
+        try:
+            results = [scheduler.trigger("manual", client) for _ in range(triggers)]
+            await scheduler.wait()
+        finally:
+            await client.close()
+        return scheduler, results
+    return asyncio.run(run())
+
+
+# ---------------------------------------------------------
+# TEST 1: Gleichzeitige Trigger werden zu einem Lauf zusammengeführt
+# ---------------------------------------------------------
+def test_concurrent_triggers_share_one_run(github, storage):
+    """Der zweite Trigger startet keinen eigenen Crawl, der Lauf meldet seinen Fortschritt"""
+    for name in UUIDS:
+        github.add_repo(name, "sha1", {"id": name, "teaches": name})
+
+    scheduler, results = run_scheduler(github, triggers=3)
+
+    (first, started), *others = results
+    assert started
+    assert all(run is first and not s for run, s in others)
+    assert sum(path.startswith("/orgs/") for path in github.requests) == 1
+
+    status = scheduler.status()
+    assert status["state"] == "idle"
+    assert len(status["history"]) == 1
+    last = status["last"]
+    assert last["state"] == "finished"
+    assert last["repos_total"] == last["repos_scanned"] == last["repos_changed"] == len(UUIDS)
+    assert last["api_calls"] == len(github.requests)
+    assert last["duration_s"] >= 0 and last["error"] is None
+
+
+# ---------------------------------------------------------
+# TEST 2: Fehlgeschlagene Läufe landen mit Fehler im Verlauf
+# ---------------------------------------------------------
+def test_failed_run_is_recorded(github, storage):
+    """Ein Fehler beim Listen der Repositories beendet den Lauf als 'failed', der Verlauf ist begrenzt"""
+    github.throttle[f"/orgs/{ORG}/repos?per_page=100"] = 10
+
+    async def run():
+        scheduler = RefreshScheduler(interval_s=0, history=2, workers=4)
+        client = GitHubClient("token", base_url=github.url, pool_size=4, max_retries=0)
+        try:
+            for _ in range(3):
+                scheduler.trigger("manual", client)
+                await scheduler.wait()
+        finally:
+            await client.close()
+        return scheduler
+    scheduler = asyncio.run(run())
+
+    status = scheduler.status()
+    assert [run["id"] for run in status["history"]] == [3, 2]
+    assert status["last"]["state"] == "failed"
+    assert "429" in status["last_error"]
+
+
+# ---------------------------------------------------------
+# TEST 3: Admin-Endpunkte für Trigger und Status
+# ---------------------------------------------------------
+def test_refresh_endpoints(storage):
+    """POST /admin/refresh-db dedupliziert, GET /admin/refresh-db/status zeigt den Lauf"""
+    release = None
+
+    async def slow_refresh(client=None, workers=None, run=None, report=None):
+        run.repos_total = 3
+        report(run)
+        await release.wait()
+        run.finish("finished")
+        report(run)
+        return True
+
+    async def make_event():
+        nonlocal release
+        release = asyncio.Event()
+
+    with patch("services.refresh_scheduler.refresh_challenge_db_task", slow_refresh), \
+         TestClient(app) as client:
+        client.portal.call(make_event)
+        first = client.post("/admin/refresh-db").json()
+        second = client.post("/admin/refresh-db").json()
+        assert first["status"] == "Database refresh task started."
+        assert second["status"] == "Database refresh already running."
+        assert second["run"]["id"] == first["run"]["id"]
+
+        status = client.get("/admin/refresh-db/status").json()
+        assert status["state"] == "running"
+        assert status["current"]["repos_total"] == 3
+
+        client.portal.call(release.set)
+        client.portal.call(refresh_scheduler.wait)
+        status = client.get("/admin/refresh-db/status").json()
+        assert status["state"] == "idle"
+        assert status["last"]["id"] == first["run"]["id"]
+        assert status["last"]["state"] == "finished"
+
+
+# ---------------------------------------------------------
+# TEST 4: Status wird über die Worker geteilt
+# ---------------------------------------------------------
+def test_status_is_shared_between_workers(github, storage):
+    """Ein zweiter Scheduler (anderer Worker) sieht den Lauf; ein verwaister Lauf gilt als abgebrochen"""
+    from services import refresh_scheduler as scheduler_module
+    github.add_repo(UUIDS[0], "sha1", {"id": UUIDS[0], "teaches": "x"})
+    path = scheduler_module.REFRESH_STATUS_FILE
+    # Worker, der während eines Laufs beendet wurde
+    scheduler_module.write_status(path, {"current": {"id": 7, "state": "running", "error": None},
+                                         "history": []})
+
+    run_scheduler(github, triggers=1)
+
+    other = RefreshScheduler(interval_s=0)
+    status = other.status()
+    assert status["state"] == "idle"
+    assert [(run["id"], run["state"]) for run in status["history"]] == [(8, "finished"), (7, "failed")]
+    assert status["last_error"] == "interrupted"
+
+
+# ---------------------------------------------------------
+# TEST 5: Trigger schließt sich dem Lauf eines anderen Workers an
+# ---------------------------------------------------------
+def test_trigger_joins_run_of_other_worker(storage):
+    """Hält ein anderer Worker die Sperre, meldet POST /admin/refresh-db dessen Lauf"""
+    from services import refresh_scheduler as scheduler_module
+    from services.updater import refresh_lock
+    running = {"id": 4, "trigger": "schedule", "state": "running", "repos_scanned": 2, "error": None}
+    scheduler_module.write_status(scheduler_module.REFRESH_STATUS_FILE, {"current": running, "history": []})
+
+    with refresh_lock() as acquired, TestClient(app) as client:
+        assert acquired
+        response = client.post("/admin/refresh-db").json()
+        assert response["status"] == "Database refresh already running."
+        assert response["run"]["id"] == 4 and response["run"]["repos_scanned"] == 2
+        assert refresh_scheduler.current is None
+        assert client.get("/admin/refresh-db/status").json()["current"]["id"] == 4
+
+
+# ---------------------------------------------------------
+# TEST 6: Geplante Läufe berücksichtigen Läufe anderer Worker
+# ---------------------------------------------------------
+def test_schedule_skips_recent_run_of_other_worker(storage):
+    """Liegt der letzte Lauf weniger als ein Intervall zurück, startet der Zeitplan keinen neuen"""
+    from services import refresh_scheduler as scheduler_module
+    from services.updater import now
+
+    async def run():
+        scheduler = RefreshScheduler(interval_s=0.2)
+        with patch.object(scheduler, "trigger") as trigger:
+            scheduler.start()
+            await asyncio.sleep(0.15)
+            # Lauf eines anderen Workers kurz vor dem eigenen Termin
+            recent = {"id": 1, "state": "finished", "finished_at": now(), "error": None}
+            scheduler_module.write_status(scheduler_module.REFRESH_STATUS_FILE,
+                                          {"current": None, "history": [recent]})
+            await asyncio.sleep(0.15)
+            await scheduler.stop()
+        return scheduler, trigger
+    scheduler, trigger = asyncio.run(run())
+    trigger.assert_not_called()
+    assert scheduler.last_finished() is not None
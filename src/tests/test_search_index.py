@@ -0,0 +1,59 @@
+import random
+import string
+
+from services import graph_ld
+from services.search_index import SearchIndex
+
+
+def ids(nodes):
+    return [n["@id"] for n in nodes]
+
+
+# ---------------------------------------------------------
+# TEST 1: Exakte und partielle Filter
+# ---------------------------------------------------------
+def test_exact_and_partial_filters(ld_db):
+    """Filter sind case-insensitive und liefern die Datenbank-Reihenfolge"""
+    assert ids(graph_ld.get_ld_exercises_filtered(author="ada lovelace")) == ["a", "b"]
+    assert ids(graph_ld.get_ld_exercises_filtered(author="TURING", match="partial")) == ["b", "d"]
+    assert ids(graph_ld.get_ld_exercises_filtered(keyword="python")) == ["a", "b", "c"]
+    assert ids(graph_ld.get_ld_exercises_filtered(keyword="py", match="partial")) == ["a", "b", "c"]
+    assert ids(graph_ld.get_ld_exercises_filtered(topic="cur")) == ["d"]
+    assert len(graph_ld.get_ld_exercises_filtered()) == 4
+
+
+# ---------------------------------------------------------
+# TEST 2: Mehrere Filter werden geschnitten
+# ---------------------------------------------------------
+def test_combined_filters(ld_db):
+    """Mehrere Filter ergeben die Schnittmenge"""
+    assert ids(graph_ld.get_ld_exercises_filtered(author="alan turing", keyword="python")) == ["b"]
+    assert graph_ld.get_ld_exercises_filtered(author="grace hopper", topic="loops") == []
+
+
+# ---------------------------------------------------------
+# TEST 3: get_ld_exercises_by_tag nutzt den Index
+# ---------------------------------------------------------
+def test_exercises_by_tag(ld_db):
+    """Indizierte und nicht indizierte Felder liefern dieselben Ergebnisse wie zuvor"""
+    tagged = graph_ld.get_ld_exercises_by_tag("keywords", "control", match="partial")
+    assert ids(tagged["@graph"]) == ["b"]
+    tagged = graph_ld.get_ld_exercises_by_tag("publishedAt", "2024-01-01")
+    assert ids(tagged["@graph"]) == ["a"]
+
+
+# ---------------------------------------------------------
+# TEST 4: Index entspricht einem linearen Scan
+# ---------------------------------------------------------
+def test_index_matches_linear_scan():
+    """Zufällige Teilstrings liefern dieselben Treffer wie die bisherige Suche"""
+    rnd = random.Random(42)
+    words = ["".join(rnd.choices(string.ascii_lowercase[:6], k=rnd.randint(2, 8))) for _ in range(50)]
+    nodes = [{"@id": str(i), "keywords": rnd.sample(words, 3)} for i in range(300)]
+    index = SearchIndex(nodes)
+    for _ in range(200):
+        word = rnd.choice(words)
+        start = rnd.randint(0, len(word) - 1)
+        search = word[start:start + rnd.randint(1, 4)]
+        expected = [n for n in nodes if any(search in k for k in n["keywords"])]
+        assert index.filter([("keywords", search, "partial")]) == expected
@@ -0,0 +1,47 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.exporter import chunked, iter_jsonld, encode_json
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------
+# TEST 1: Gestreamte Exporte sind byte-identisch zu gepufferten
+# ---------------------------------------------------------
+def test_streamed_equals_buffered(ld_db):
+    """JSON-LD und Node-Link liefern gestreamt dieselben Bytes"""
+    for url in ("/graph/?format=jsonld", "/graph/?format=nodelink",
+                "/exercises/?keyword=Python&format=nodelink", "/exercises/d/path"):
+        buffered = client.get(url)
+        streamed = client.get(url + "&stream=true" if "?" in url else url + "?stream=true")
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"] == buffered.headers["content-type"]
+        assert streamed.content == buffered.content
+
+
+# ---------------------------------------------------------
+# TEST 2: NDJSON, ein Knoten pro Zeile
+# ---------------------------------------------------------
+def test_ndjson(ld_db):
+    """Jede Zeile ist ein JSON-LD Knoten, gepuffert und gestreamt gleich"""
+    response = client.get("/graph/?format=ndjson&stream=true")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.content.decode("utf-8").splitlines()
+    assert [json.loads(line)["@id"] for line in lines] == ["a", "b", "c", "d"]
+    assert client.get("/graph/?format=ndjson").content == response.content
+    assert client.get("/exercises/?author=Grace Hopper&format=ndjson").text.count("\n") == 1
+
+
+# ---------------------------------------------------------
+# TEST 3: Blockbildung
+# ---------------------------------------------------------
+def test_chunked_parts():
+    """Kleine Teile werden zu Blöcken zusammengefasst, ohne Bytes zu verlieren"""
+    data = {"@context": {"x": 1}, "@graph": [{"@id": str(i), "name": "ä" * 10} for i in range(100)]}
+    chunks = list(chunked(iter_jsonld(data), size=256))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+    assert b"".join(chunks) == encode_json(data)
@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from services import graph_ld
+from services.pagination import encode_cursor
+
+client = TestClient(app)
+
+
+def ids(response):
+    return [n["@id"] for n in response.json()["@graph"]]
+
+
+# ---------------------------------------------------------
+# TEST 1: Nachbarschaft mit begrenzter Tiefe
+# ---------------------------------------------------------
+def test_subgraph_neighbourhood(ld_db):
+    """up/down begrenzen die Schritte, Ergebnis in topologischer Reihenfolge"""
+    assert ids(client.get("/graph/subgraph?root=b&up=0&down=0")) == ["b"]
+    assert ids(client.get("/graph/subgraph?root=b")) == ["a", "b", "d"]
+    assert ids(client.get("/graph/subgraph?root=a&up=0&down=2"))[-1] == "d"
+    assert sorted(ids(client.get("/graph/subgraph?root=a&up=0&down=2"))) == ["a", "b", "c", "d"]
+    # Keyword wählt alle passenden Übungen als Ausgangspunkte
+    assert ids(client.get("/graph/subgraph?keyword=Algorithms&up=1&down=0")) == ["b", "c", "d"]
+    r = client.get("/graph/subgraph?root=b&format=nodelink")
+    assert [n["id"] for n in r.json()["nodes"]] == ["a", "b", "d"]
+    assert client.get("/graph/subgraph?root=nope").status_code == 404
+    # die transitive Hülle wird für Nachbarschaften nicht gebraucht
+    assert graph_ld.get_ld_snapshot()._reachability is None
+    assert client.get("/graph/subgraph").status_code == 400
+
+
+# ---------------------------------------------------------
+# TEST 2: Cursor-Paginierung von /exercises
+# ---------------------------------------------------------
+def test_exercises_pagination(ld_db):
+    """Seiten sind nach @id sortiert, der Cursor der nächsten Seite steht im Header"""
+    seen = []
+    cursor = None
+    for _ in range(3):
+        url = "/exercises/?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        r = client.get(url)
+        assert r.status_code == 200
+        seen.extend(ids(r))
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == ["a", "b", "c", "d"]
+
+    # Header auch bei Cache-Treffer und im Streaming-Modus
+    assert client.get("/exercises/?limit=3").headers["x-next-cursor"] == encode_cursor("c")
+    r = client.get("/exercises/?limit=2&stream=true&format=ndjson")
+    assert r.headers["x-next-cursor"] == encode_cursor("b")
+    assert client.get("/exercises/?limit=2&cursor=%%%").status_code == 400
+    assert client.get("/exercises/?limit=0").status_code == 422
+
+    # mit Filter und mit einem Cursor auf eine nicht (mehr) vorhandene Übung
+    r = client.get(f"/exercises/?keyword=python&limit=2&cursor={encode_cursor('aa')}")
+    assert ids(r) == ["b", "c"]
+    assert "x-next-cursor" not in r.headers
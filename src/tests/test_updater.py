@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+from services import updater
+from services.github_client import GitHubClient
+from services.graph_store import graph_store
+
+UUIDS = [f"00000000-0000-0000-0000-{i:012d}" for i in range(20)]
+
+
+def run_refresh(github, workers=4):
+    async def run():
+        client = GitHubClient("token", base_url=github.url, pool_size=workers, max_retries=3)
+        try:
+            await updater.refresh_challenge_db_task(client=client, workers=workers)
+        finally:
+            await client.close()
+        return client
+    return asyncio.run(run())
+
+
+def load_metadata(storage_dir):
+    with open(os.path.join(storage_dir, "metadata.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ---------------------------------------------------------
+# TEST 1: Paralleler Crawl baut die Datenbank
+# ---------------------------------------------------------
+def test_concurrent_refresh_builds_database(github, storage):
+    """Alle UUID-Repositories werden parallel geholt und in die Datenbank übernommen"""
+    for name in UUIDS:
+        github.add_repo(name, "sha1", {"id": name, "teaches": name})
+    github.add_repo("website", "sha1", {"id": "website"})
+
+    run_refresh(github, workers=8)
+
+    meta = load_metadata(storage)
+    assert sorted(meta) == sorted(UUIDS)
+    graph = graph_store.get().data["@graph"]
+    assert sorted(n["@id"] for n in graph) == sorted(UUIDS)
+
+
+# ---------------------------------------------------------
+# TEST 2: Rate-Limit-Antworten werden wiederholt
+# ---------------------------------------------------------
+def test_retry_after_is_respected(github, storage):
+    """429 mit Retry-After führt zu einem erneuten Versuch statt zum Abbruch"""
+    name = UUIDS[0]
+    github.add_repo(name, "sha1", {"id": name})
+    github.throttle[f"/repos/STEMgraph/{name}/readme"] = 2
+
+    client = run_refresh(github)
+
+    assert name in load_metadata(storage)
+    assert github.requests.count(f"/repos/STEMgraph/{name}/readme") == 3
+    assert client.rate_limit_remaining == 4000
+
+
+# ---------------------------------------------------------
+# TEST 3: Fehler in einem Repository brechen den Lauf nicht ab
+# ---------------------------------------------------------
+def test_failing_repo_does_not_abort_refresh(github, storage):
+    """Ein dauerhaft fehlerhaftes Repository wird geloggt und übersprungen"""
+    github.add_repo(UUIDS[0], "sha1", {"id": UUIDS[0]})
+    github.add_repo(UUIDS[1], "sha1", {"id": UUIDS[1]})
+    github.throttle[f"/repos/STEMgraph/{UUIDS[1]}/readme"] = 10
+
+    run_refresh(github)
+
+    assert list(load_metadata(storage)) == [UUIDS[0]]
+
+
+# ---------------------------------------------------------
+# TEST 4: Inkrementelle Änderungserkennung
+# ---------------------------------------------------------
+def test_incremental_change_detection(github, storage):
+    """Nicht-UUID-Repos und unveränderte pushed_at-Werte kosten keine API-Calls"""
+    github.add_repo(UUIDS[0], "sha1", {"id": UUIDS[0]})
+    github.add_repo(UUIDS[1], "sha1", {"id": UUIDS[1]})
+    github.add_repo("website", "sha1")
+    run_refresh(github)
+
+    meta = load_metadata(storage)
+    assert meta[UUIDS[0]]["pushed_at"] == "2024-01-01T00:00:00Z"
+    assert meta[UUIDS[0]]["etag"] == '"sha1"'
+    assert not any("website" in path for path in github.requests)
+
+    # 2. Lauf: nichts geändert -> nur das Listing
+    github.requests.clear()
+    run_refresh(github)
+    assert github.requests == [f"/orgs/{updater.ORG}/repos?per_page=100"]
+
+    # 3. Lauf: Push ohne neuen Commit auf dem Default-Branch -> 304
+    github.repos[UUIDS[0]]["pushed_at"] = "2024-02-01T00:00:00Z"
+    github.requests.clear()
+    client = run_refresh(github)
+    assert client.not_modified == 1
+    assert not any(path.endswith("/readme") for path in github.requests)
+    assert load_metadata(storage)[UUIDS[0]]["pushed_at"] == "2024-02-01T00:00:00Z"
+
+    # 4. Lauf: neuer Commit -> README wird geladen
+    github.repos[UUIDS[1]].update(sha="sha2", pushed_at="2024-03-01T00:00:00Z",
+                                  metadata={"id": UUIDS[1], "teaches": "new"})
+    run_refresh(github)
+    assert load_metadata(storage)[UUIDS[1]]["sha"] == "sha2"
+    assert sorted(os.listdir(storage)) == sorted([f"{UUIDS[0]}__sha1.json", f"{UUIDS[1]}__sha2.json", "metadata.json"])
+    assert graph_store.get().index.get(UUIDS[1])["teaches"] == "new"
+
+
+# ---------------------------------------------------------
+# TEST 5: Nur ein Refresh gleichzeitig (prozessübergreifende Sperre)
+# ---------------------------------------------------------
+def test_refresh_lock_skips_concurrent_refresh(github, storage):
+    """Hält ein anderer Worker die Sperre, wird der Refresh übersprungen"""
+    with updater.refresh_lock() as acquired:
+        assert acquired
+        with updater.refresh_lock() as second:
+            assert not second
+        run_refresh(github)
+        assert github.requests == []
+    run_refresh(github)
+    assert github.requests
+
+
+# ---------------------------------------------------------
+# TEST 6: Fehlgeschlagener Build wird beim nächsten Lauf nachgeholt
+# ---------------------------------------------------------
+def test_failed_build_is_retried(github, storage):
+    """Metadaten werden erst nach erfolgreichem Build gespeichert, Änderungen gehen nicht verloren"""
+    github.add_repo(UUIDS[0], "sha1", {"id": UUIDS[0], "teaches": "old"})
+    run_refresh(github)
+    assert graph_store.get().index.get(UUIDS[0])["teaches"] == "old"
+
+    github.repos[UUIDS[0]].update(sha="sha2", pushed_at="2024-03-01T00:00:00Z",
+                                  metadata={"id": UUIDS[0], "teaches": "new"})
+    with patch("services.updater.createdb_jsonld", side_effect=OSError("disk full")):
+        try:
+            run_refresh(github)
+        except OSError:
+            pass
+    assert load_metadata(storage)[UUIDS[0]]["sha"] == "sha1"
+
+    run_refresh(github)
+    assert load_metadata(storage)[UUIDS[0]]["sha"] == "sha2"
+    assert graph_store.get().index.get(UUIDS[0])["teaches"] == "new"
@@ -0,0 +1,54 @@
+import yaml
+from fastapi.testclient import TestClient
+
+from formats.yaml_export import YamlExporter, FragmentCache, Dumper
+from main import app
+from services.exporter import yaml_fragments
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------
+# TEST 1: Knotenweise Ausgabe entspricht yaml.dump
+# ---------------------------------------------------------
+def test_iter_ld_matches_full_dump():
+    """Die zusammengesetzten Fragmente ergeben exakt das Dokument von yaml.dump"""
+    ld = {
+        "generatedAt": "2024-01-01T00:00:00Z",
+        "@context": {"schema": "https://schema.org/"},
+        "@graph": [
+            {"@id": "a", "teaches": "Variablen und Schleifen " * 8, "keywords": ["Python", "ä"]},
+            {"@id": "b", "dependsOn": ["a", {"oneOf": ["a", "c"]}], "author": [{"name": "Ada"}]},
+        ],
+    }
+    expected = yaml.dump(ld, Dumper=Dumper, allow_unicode=True, default_flow_style=False)
+    assert YamlExporter().from_ld(ld) == expected
+    assert YamlExporter().from_ld({"@graph": []}) == yaml.dump({"@graph": []}, Dumper=Dumper)
+
+
+# ---------------------------------------------------------
+# TEST 2: Fragmente nur für Knoten des Graphen cachen
+# ---------------------------------------------------------
+def test_fragment_cache_identity():
+    """Fremde Knoten mit gleicher @id bekommen nicht das gecachte Fragment"""
+    node = {"@id": "a", "teaches": "Loops"}
+    cache = FragmentCache({"a": node})
+    first = cache.get(node)
+    assert cache.get(node) is first
+    assert "Other" in cache.get({"@id": "a", "teaches": "Other"})
+    assert cache.get(node) is first
+
+
+# ---------------------------------------------------------
+# TEST 3: YAML-Endpunkte liefern rohes text/yaml
+# ---------------------------------------------------------
+def test_yaml_endpoint(ld_db):
+    """Kein JSON-String mehr, gestreamt und gepuffert gleich, pro Version gecacht"""
+    response = client.get("/graph/?format=yaml")
+    assert response.headers["content-type"].startswith("text/yaml")
+    assert yaml.safe_load(response.text) == client.get("/graph/").json()
+    assert client.get("/graph/?format=yaml&stream=true").content == response.content
+
+    path = client.get("/exercises/d/path?format=yaml")
+    assert [ex["@id"] for ex in yaml.safe_load(path.text)["@graph"]] == ["d", "b", "a", "c"]
+    assert yaml_fragments() is yaml_fragments()